@@ -0,0 +1,100 @@
+"""
+Times parsing malformed atom calls (wrong numbers of arguments and
+misplaced Inf arguments) with both backends, in this tree and in an
+earlier revision, by default the last one before atom signatures, and
+checks that both give the same error messages. Each run uses a fresh
+interpreter; the earlier revision is exported with git archive into a
+temporary directory.
+Usage: python benchmarks/bench_atom_errors.py [REVISION]
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+REPEAT = 200
+WIDTH = 200
+
+# Argument lists of WIDTH variables, and of nested atoms.
+WIDE = ', '.join('x%d' % i for i in range(WIDTH))
+NESTED = 'square(x0) + max(x1, x2, exp(x3)) - log_sum_exp(x4, 2*x5)'
+
+MALFORMED = {
+    'arity': ['log(x0, x1)', 'kl_div(x0)', 'pow(x0)', 'huber(x0, 1, 2)',
+              'norm(2)', 'sum_largest(3)', 'square(%s)' % WIDE,
+              'exp(%s, %s)' % (NESTED, NESTED)],
+    'Inf':   ['log(Inf)', 'max(x0, Inf)', 'norm(Inf, x0)', 'huber_circ(Inf)',
+              'sum_square_abs(%s, Inf)' % WIDE, 'pow_abs(Inf, 2)',
+              'huber_circ(%s, Inf, 2)' % WIDE, 'geo_mean(%s, Inf)' % NESTED],
+}
+
+SCRIPT = """
+import json, time
+from dcp_parser.parser import Parser
+malformed = json.loads(%(malformed)r)
+times = {}
+messages = {}
+for backend in ['ply', 'pratt']:
+    parser = Parser(backend=backend)
+    for i in range(%(width)d):
+        parser.parse('variable x%%d' %% i)
+    for (kind, texts) in sorted(malformed.items()):
+        for text in texts:
+            try:
+                parser.parse(text)
+                messages[text] = None
+            except Exception as e:
+                messages[text] = str(e)
+        start = time.time()
+        for i in range(%(repeat)d):
+            for text in texts:
+                try:
+                    parser.parse(text)
+                except Exception:
+                    pass
+        times['%%s %%s' %% (backend, kind)] = time.time() - start
+print(json.dumps([times, messages]))
+"""
+
+# Seconds per malformed statement for each backend and kind of error,
+# and the error messages, with the tree at root.
+def measure(root):
+    output = subprocess.check_output([sys.executable, '-B', '-c',
+        SCRIPT % {'malformed': json.dumps(MALFORMED), 'width': WIDTH,
+                  'repeat': REPEAT}], cwd=root)
+    (times, messages) = json.loads(output.decode())
+    for key in times:
+        times[key] /= REPEAT * len(MALFORMED[key.split()[1]])
+    return (times, messages)
+
+# The parent of the commit that added atom signatures.
+def before_signatures():
+    commits = subprocess.check_output(
+        ['git', 'log', '--format=%H', '-S', 'AtomSignature', '--',
+         'dcp_parser/atomic/atom_registry.py'], cwd=ROOT).split()
+    return commits[-1].decode() + '~1'
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else before_signatures()
+    tmp = tempfile.mkdtemp()
+    try:
+        archive = subprocess.Popen(['git', 'archive', revision, 'dcp_parser'],
+                                   cwd=ROOT, stdout=subprocess.PIPE)
+        subprocess.check_call(['tar', '-x', '-C', tmp], stdin=archive.stdout)
+        if archive.wait() != 0:
+            raise Exception("git archive %s failed." % revision)
+        (before, before_messages) = measure(tmp)
+    finally:
+        shutil.rmtree(tmp)
+    (after, after_messages) = measure(ROOT)
+    if before_messages != after_messages:
+        raise Exception("The error messages differ from %s." % revision)
+    for key in sorted(after):
+        print("%-11s %.1f us before, %.1f us after (%.1fx)" %
+              (key, 1e6 * before[key], 1e6 * after[key], before[key] / after[key]))
+
+if __name__ == '__main__':
+    main()
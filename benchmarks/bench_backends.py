@@ -0,0 +1,51 @@
+"""
+Times the PLY and Pratt backends on the statements parsed in
+dcp_parser/tests/test_parser.py, and checks they give the same results.
+Usage: python benchmarks/bench_backends.py
+"""
+import os
+import sys
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+from dcp_parser.tests.parser_corpus import parser_corpus
+from dcp_parser.tests.test_backends import TestBackends
+
+N = 200
+
+# Parses the whole corpus with a fresh Parser per test.
+def parse_corpus(corpus, backend):
+    for statements in corpus:
+        parser = Parser(backend=backend)
+        for text in statements:
+            try:
+                parser.parse(text)
+            except Exception:
+                pass
+
+# The error, encoded statements and symbols after each statement.
+def corpus_outcomes(corpus, backend):
+    results = []
+    for statements in corpus:
+        parser = Parser(backend=backend)
+        for text in statements:
+            results.append(TestBackends.outcome(parser, text))
+    return results
+
+def main():
+    corpus = parser_corpus()
+    count = sum(len(statements) for statements in corpus)
+    if corpus_outcomes(corpus, 'ply') != corpus_outcomes(corpus, 'pratt'):
+        raise Exception("The backends disagree on the corpus.")
+    times = {}
+    for backend in ('ply', 'pratt'):
+        # Build the shared engine before timing.
+        Parser(backend=backend).grammar
+        times[backend] = min(timeit.repeat(
+            lambda: parse_corpus(corpus, backend), number=N, repeat=5))
+        print("%-6s %d statements x %d: %.3f s (%.1f us/statement)" %
+              (backend, count, N, times[backend], 1e6 * times[backend] / (N * count)))
+    print("pratt speedup: %.2fx" % (times['ply'] / times['pratt']))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Analyzes a question bank of random quiz-style expressions with a loop
+over Parser().parse in this process, and with BatchAnalyzer for 1, 2, 4,
+... workers up to the number of CPUs, and reports the throughput of each
+and its speedup over the loop. The batch results must match the loop's.
+Usage: python benchmarks/bench_batch.py [EXPRESSIONS]
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+from dcp_parser.json.statement_encoder import StatementEncoder
+from dcp_parser.batch import BatchAnalyzer
+from bench_classify import PREAMBLE, expression
+
+N = 20000
+
+# The (encoding, error) of each text, parsed one at a time as before.
+def loop(texts):
+    results = []
+    for text in texts:
+        parser = Parser()
+        try:
+            parser.parse('\n'.join(PREAMBLE))
+            parser.parse(text)
+            results.append((StatementEncoder().encode(parser.statements[-1]), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    rand = random.Random(0)
+    texts = [expression(rand.randint(1, 4), rand) for i in range(count)]
+    start = time.time()
+    expected = loop(texts)
+    loop_time = time.time() - start
+    print("%d expressions on %d CPUs" % (count, os.cpu_count() or 1))
+    print("loop:       %6.2f s %8d expressions/s" % (loop_time, count / loop_time))
+    workers = 1
+    while True:
+        batch = BatchAnalyzer(PREAMBLE, workers)
+        start = time.time()
+        results = batch.analyze(texts)
+        seconds = time.time() - start
+        if results != expected:
+            raise Exception("The batch results differ.")
+        print("%2d workers: %6.2f s %8d expressions/s (%.2fx), %d chunks of up to %d" %
+              (workers, seconds, count / seconds, loop_time / seconds,
+               batch.stats.chunks, batch.chunk_size))
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(2 * workers, os.cpu_count())
+
+if __name__ == '__main__':
+    main()
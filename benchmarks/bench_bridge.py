@@ -0,0 +1,55 @@
+"""
+Times the full path from the analyzer's text box to a JavaScript tree
+for representative expressions, with JSON.parse stood in for by
+json.loads: encoding, decoding to dicts and encoding those again as the
+pages did, against encoding once with dcp_parser.bridge.parse_json.
+Both parse every expression; a ParseCache is timed separately.
+Usage: python benchmarks/bench_bridge.py
+"""
+import json
+import os
+import sys
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser, SymbolTable
+from dcp_parser.cache import ParseCache
+from dcp_parser.bridge import parse_json
+from dcp_parser.json.statement_encoder import StatementEncoder
+
+PREAMBLE = ['variable x y z u v w', 'parameter a b c', 'parameter positive d e f']
+EXPRESSIONS = [
+    'square(x)',
+    'sqrt(x) + log(y) >= exp(z)',
+    'max(square(x - y), abs(z) + d * u, inv_pos(w)) <= sqrt(d)',
+    'log_sum_exp(x, y, z) + quad_over_lin(u, d) + norm(v, w) <= geo_mean(x, y)',
+    ' + '.join('square(x - %d)' % i for i in range(50)) + ' <= d',
+]
+CALLS = 200
+
+# The old bridge: encode, decode and encode again in Python, decode in JS.
+def round_trips(text, symbols):
+    try:
+        parser = Parser(symbols=symbols)
+        parser.parse(text)
+        result = json.loads(StatementEncoder().encode(parser.statements[-1]))
+    except Exception as e:
+        result = {'error': str(e)}
+    return json.loads(json.dumps(result))
+
+def main():
+    symbols = SymbolTable.from_preamble(PREAMBLE)
+    cache = ParseCache()
+    for text in EXPRESSIONS:
+        expected = round_trips(text, symbols)
+        if json.loads(parse_json(text, symbols)) != expected:
+            raise Exception("The bridge encodes '%s' differently." % text)
+        times = [timeit.timeit(call, number=CALLS) / CALLS for call in [
+            lambda: round_trips(text, symbols),
+            lambda: json.loads(parse_json(text, symbols)),
+            lambda: json.loads(parse_json(text, symbols, cache))]]
+        label = text if len(text) < 40 else text[:37] + '...'
+        print("%-40s round trips %8.1f us  once %8.1f us (%.2fx)  cached %8.1f us" % (
+            label, 1e6 * times[0], 1e6 * times[1], times[0] / times[1], 1e6 * times[2]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Grades random quiz-style expressions against the quiz preamble: with
+Parser.parse_many and a walk over each parse tree for its violations,
+and with classify_many, which does not build the trees. Both must agree
+on every expression.
+Usage: python benchmarks/bench_classify.py [EXPRESSIONS]
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser, SymbolTable
+from dcp_parser.classify import classify_many
+
+PREAMBLE = ['variable x y z u v w', 'parameter a b c', 'parameter positive d e f']
+LEAVES = ['x', 'y', 'z', 'u', 'v', 'w', 'a', 'b', 'c', 'd', 'e', 'f', '2', '3', '0.5']
+UNARY = ['square', 'sqrt', 'exp', 'log', 'abs', 'pos', 'inv_pos', 'entr']
+BINARY = ['max', 'min', 'quad_over_lin', 'kl_div', 'geo_mean', 'log_sum_exp']
+N = 20000
+
+# A random expression of depth at most depth, as the quiz generates them.
+def expression(depth, rand):
+    if depth == 0:
+        return rand.choice(LEAVES)
+    kind = rand.random()
+    if kind < 0.3:
+        return '%s(%s)' % (rand.choice(UNARY), expression(depth - 1, rand))
+    elif kind < 0.5:
+        return '%s(%s, %s)' % (rand.choice(BINARY), expression(depth - 1, rand),
+                               expression(depth - 1, rand))
+    elif kind < 0.6:
+        return 'pow(%s, %s)' % (expression(depth - 1, rand), rand.choice(['2', '3', '0.5']))
+    elif kind < 0.65:
+        return '-%s' % expression(depth - 1, rand)
+    return '(%s %s %s)' % (expression(depth - 1, rand), rand.choice('+-*'),
+                           expression(depth - 1, rand))
+
+# The (curvature, sign, dcp, errors) of each text, from full parses.
+def parse_and_walk(texts):
+    classes = []
+    for (statements, error) in Parser().parse_many(texts, preamble=PREAMBLE):
+        if error is not None:
+            classes.append(None)
+            continue
+        statement = statements[-1]
+        violations = 0
+        stack = [statement]
+        while stack:
+            node = stack.pop()
+            violations += len(node.errors)
+            stack.extend(node.subexpressions)
+        classes.append((statement.curvature.index, statement.sign.index,
+                        violations == 0, violations))
+    return classes
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else N
+    rand = random.Random(0)
+    texts = [expression(rand.randint(1, 4), rand) for i in range(count)]
+    symbols = SymbolTable.from_preamble(PREAMBLE)
+    classify_many(texts[:100], symbols)
+    start = time.time()
+    expected = parse_and_walk(texts)
+    parse_time = time.time() - start
+    start = time.time()
+    classes = classify_many(texts, symbols)
+    classify_time = time.time() - start
+    for (i, row) in enumerate(expected):
+        if (row is None) != (i in classes.failures) or \
+           (row is not None and row != classes[i]):
+            raise Exception("The classes of '%s' differ." % texts[i])
+    print("%d expressions, %d do not parse" % (count, len(classes.failures)))
+    print("parse_many and walk: %.2f s (%d expressions/s)" % (parse_time, count / parse_time))
+    print("classify_many:       %.2f s (%d expressions/s, %.1fx)" %
+          (classify_time, count / classify_time, parse_time / classify_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Measures cold start: a fresh interpreter importing dcp_parser and
+parsing the analyzer preamble. Compares loading the shipped parsetab.py
+with regenerating the LALR tables from the grammar.
+Usage: python benchmarks/bench_cold_start.py
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+REPEAT = 10
+
+SCRIPT = """
+import warnings
+warnings.simplefilter('ignore')
+from dcp_parser.parser import Parser, Grammar
+if %r:
+    Grammar.load_tables = lambda self: None
+parser = Parser()
+parser.parse('variable x y z u v w')
+parser.parse('parameter a b c')
+parser.parse('parameter positive d e f')
+parser.parse('square(x) + a*y <= d')
+"""
+
+# Best wall time of REPEAT fresh interpreters running code.
+def cold_start(code):
+    best = None
+    for i in range(REPEAT):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-B', '-c', code], cwd=ROOT)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    # Interpreter start-up alone, to separate out the parser's share.
+    empty = cold_start('pass')
+    regenerated = cold_start(SCRIPT % True)
+    shipped = cold_start(SCRIPT % False)
+    print("empty interpreter:  %.3f s" % empty)
+    print("regenerated tables: %.3f s" % regenerated)
+    print("shipped tables:     %.3f s (%.1fx less parser start-up)" %
+          (shipped, (regenerated - empty) / (shipped - empty)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares the nested JSON of StatementEncoder with the columns of
+ColumnEncoder for large sums: bytes, encoding time and json.loads time.
+Nested JSON of sums deeper than the recursion limit cannot be loaded.
+Usage: python benchmarks/bench_column_encoder.py
+"""
+import json
+import os
+import sys
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+from dcp_parser.json.statement_encoder import StatementEncoder
+from dcp_parser.json.column_encoder import ColumnEncoder
+
+PREAMBLE = ['variable x y z', 'parameter positive a']
+TERMS = ['square(x)', 'a * y', 'max(x, y, z)', 'exp(z)']
+
+# A sum of terms terms, grouped into a balanced tree.
+def balanced_sum(start, terms):
+    if terms == 1:
+        return TERMS[start % len(TERMS)]
+    half = terms // 2
+    return "(%s + %s)" % (balanced_sum(start, half),
+                          balanced_sum(start + half, terms - half))
+
+# A sum of terms terms, nested to the left.
+def left_sum(terms):
+    return ' + '.join(TERMS[i % len(TERMS)] for i in range(terms))
+
+# Seconds per call of f.
+def seconds(f):
+    calls = 3
+    return timeit.timeit(f, number=calls) / calls
+
+# The seconds json.loads takes to read encoded, or None.
+def loads(encoded):
+    try:
+        return seconds(lambda: json.loads(encoded))
+    except RecursionError:
+        return None
+
+def main():
+    cases = [('balanced', 1000, balanced_sum(0, 1000)),
+             ('balanced', 10000, balanced_sum(0, 10000)),
+             ('left', 500, left_sum(500)),
+             ('left', 3000, left_sum(3000))]
+    for (shape, terms, text) in cases:
+        parser = Parser()
+        for line in PREAMBLE:
+            parser.parse(line)
+        parser.parse(text + ' <= 1')
+        statement = parser.statements[-1]
+        print("%s sum of %d terms" % (shape, terms))
+        for (label, encoder) in [('nested', StatementEncoder()), ('columns', ColumnEncoder())]:
+            encoded = encoder.encode(statement)
+            encode_time = seconds(lambda: encoder.encode(statement))
+            load_time = loads(encoded)
+            print("  %-8s %10d bytes  encode %8.2f ms  loads %s" % (
+                label, len(encoded), 1000 * encode_time,
+                "recursion limit" if load_time is None else "%.2f ms" % (1000 * load_time)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Times wide max(...), sum(...) and log_sum_exp(...) calls, whose cost is
+dominated by applying the DCP composition rules to every argument,
+in this tree and in an earlier revision, by default the last one
+before the composition table. Each run uses a fresh interpreter; the
+earlier revision is exported with git archive into a temporary directory.
+Usage: python benchmarks/bench_composition.py [REVISION]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+WIDTH = 1000
+REPEAT = 50
+
+SCRIPT = """
+import time
+from dcp_parser.expression.expression import Expression
+from dcp_parser.expression.curvature import Curvature
+from dcp_parser.expression.sign import Sign
+import dcp_parser.atomic.atom_loader as atom_loader
+atom_dict = atom_loader.generate_atom_dict()
+curvatures = [Curvature.AFFINE, Curvature.CONVEX, Curvature.CONSTANT, Curvature.CONCAVE]
+signs = [Sign.POSITIVE, Sign.UNKNOWN, Sign.NEGATIVE]
+args = [Expression(curvatures[i %% 4], signs[i %% 3], 'x%%d' %% i)
+        for i in range(%(width)d)]
+for name in ['max', 'sum', 'log_sum_exp']:
+    atom = atom_dict[name]
+    start = time.time()
+    for i in range(%(repeat)d):
+        atom(*args)
+    print('%%s %%f' %% (name, time.time() - start))
+"""
+
+# Seconds per atom for each atom name, with the tree at root.
+def measure(root):
+    output = subprocess.check_output([sys.executable, '-B', '-c',
+        SCRIPT % {'width': WIDTH, 'repeat': REPEAT}], cwd=root)
+    times = {}
+    for line in output.decode().splitlines():
+        (name, elapsed) = line.split()
+        times[name] = float(elapsed) / REPEAT
+    return times
+
+# The parent of the commit that added the composition table.
+def before_table():
+    commits = subprocess.check_output(
+        ['git', 'log', '--format=%H', '-S', 'COMPOSITION_TABLE', '--',
+         'dcp_parser/atomic/monotonicity.py'], cwd=ROOT).split()
+    return commits[-1].decode() + '~1'
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else before_table()
+    tmp = tempfile.mkdtemp()
+    try:
+        archive = subprocess.Popen(['git', 'archive', revision, 'dcp_parser'],
+                                   cwd=ROOT, stdout=subprocess.PIPE)
+        subprocess.check_call(['tar', '-x', '-C', tmp], stdin=archive.stdout)
+        if archive.wait() != 0:
+            raise Exception("git archive %s failed." % revision)
+        before = measure(tmp)
+    finally:
+        shutil.rmtree(tmp)
+    after = measure(ROOT)
+    for name in sorted(after):
+        print("%-11s %d args: %.2f ms before, %.2f ms after (%.1fx)" %
+              (name, WIDTH, 1e3 * before[name], 1e3 * after[name],
+               before[name] / after[name]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Parses machine-generated objectives in which a few large subexpressions
+are repeated many times, with the Parser's NodeTable and with a table
+that builds every node. Reports the sharing ratio (nodes in the parse
+tree per node built), parse time and memory held by the result.
+Usage: python benchmarks/bench_hash_consing.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+from dcp_parser.expression.node_table import NodeTable
+
+PREAMBLE = ['variable x y z', 'parameter a b', 'parameter positive c']
+
+TERMS = [
+    'square(2 * x - 3 * y + a)',
+    'c * abs(y + b - 4 * z)',
+    'huber(x - y + 2 * z - a, 1)',
+    'norm(x + y, z - b, 2)',
+]
+
+class UnsharedTable(NodeTable):
+    """ Builds every node, as the Parser did before hash-consing. """
+    def __init__(self):
+        self.built = 0
+
+    def __len__(self):
+        return self.built
+
+    def intern(self, key, build, args):
+        self.built += 1
+        return build(*args)
+
+# Objective with n terms drawn from TERMS.
+def objective(n):
+    return ' + '.join(TERMS[i % len(TERMS)] for i in range(n))
+
+# Number of nodes in the tree below exp, counting repeats.
+def tree_size(exp):
+    return 1 + sum(tree_size(sub) for sub in exp.subexpressions)
+
+# Parses text, returning the statement, nodes built, time and bytes
+# held by the statement and the table.
+def run(backend, text, table):
+    parser = Parser(backend=backend)
+    for line in PREAMBLE:
+        parser.parse(line)
+    parser.nodes = table()
+    tracemalloc.start()
+    start = time.time()
+    parser.parse(text)
+    elapsed = time.time() - start
+    (held, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (parser.statements[0], len(parser.nodes), elapsed, held)
+
+def main():
+    for backend in ('ply', 'pratt'):
+        for n in (100, 1000, 4000):
+            text = objective(n)
+            (exp, built, shared, shared_bytes) = run(backend, text, NodeTable)
+            (_, _, unshared, unshared_bytes) = run(backend, text, UnsharedTable)
+            print("%-5s %5d terms: %6d tree nodes, %5d built (%.1fx sharing), "
+                  "%.3f s vs %.3f s, %5d KB vs %5d KB held" %
+                  (backend, n, tree_size(exp), built, tree_size(exp) / float(built),
+                   shared, unshared, shared_bytes // 1024, unshared_bytes // 1024))
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(100000)
+    main()
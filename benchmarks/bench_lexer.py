@@ -0,0 +1,104 @@
+"""
+Tokenizes 1 MB of generated DCP source with dcp_parser.lexer and with
+a ply.lex lexer built from the per-rule callbacks parser.py used before.
+Usage: python benchmarks/bench_lexer.py
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.lexer import tokenize, RESERVED, TOKENS
+import ply.lex
+
+SIZE = 1 << 20
+
+LINES = [
+    'variable x y z',
+    'parameter positive a b  # nonnegative data',
+    'a * square(x) + max(y, 2.5) - log_sum_exp(x, y, z) <= 3',
+    'norm(x, Inf) + huber(x - y, 1) >= -0.5 * b',
+    'pow(x, 2) / .25 == geo_mean(x, y) + 12',
+]
+
+# Random lines from LINES, about SIZE bytes in total.
+def generate_source(size=SIZE, seed=0):
+    r = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size:
+        line = r.choice(LINES)
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+
+
+class PlyRules(object):
+    """ The ply.lex rules parser.py used before dcp_parser.lexer. """
+    tokens = TOKENS
+    t_PLUS    = r'\+'
+    t_MINUS   = r'-'
+    t_TIMES   = r'\*'
+    t_DIVIDE  = r'/'
+    t_EQUALS  = r'=='
+    t_LEQ     = r'<='
+    t_GEQ     = r'>='
+    t_LPAREN  = r'\('
+    t_RPAREN  = r'\)'
+    t_COMMA   = r','
+
+    def t_ID(self, t):
+        r'[a-zA-Z_][a-zA-Z_0-9]*'
+        t.type = RESERVED.get(t.value,'ID')
+        return t
+
+    def t_FLOAT(self, t):
+        r'\d*\.\d+'
+        t.value = float(t.value)
+        return t
+
+    def t_INT(self, t):
+        r'\d+'
+        t.value = int(t.value)
+        return t
+
+    t_ignore_COMMENT = r'\#.*'
+    t_ignore = " \t"
+
+    def t_newline(self, t):
+        r'\n+'
+        t.lexer.lineno += t.value.count("\n")
+
+    def t_error(self, t):
+        raise Exception("Illegal character '%s'." % t.value[0])
+
+def ply_tokens(lexer, source):
+    lexer.input(source)
+    return [(t.type, t.value) for t in iter(lexer.token, None)]
+
+# Best wall time of three runs of f.
+def best_time(f):
+    best = None
+    for i in range(3):
+        start = time.time()
+        f()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    source = generate_source()
+    lexer = ply.lex.lex(module=PlyRules())
+    tokens = list(tokenize(source))
+    if [token[:2] for token in tokens] != ply_tokens(lexer, source):
+        raise Exception("The lexers disagree on the source.")
+    ply_time = best_time(lambda: ply_tokens(lexer, source))
+    regex_time = best_time(lambda: list(tokenize(source)))
+    megabytes = len(source) / float(1 << 20)
+    print("%.2f MB, %d tokens" % (megabytes, len(tokens)))
+    print("ply.lex:          %.3f s (%.1f MB/s)" % (ply_time, megabytes / ply_time))
+    print("dcp_parser.lexer: %.3f s (%.1f MB/s, %.1fx)" %
+          (regex_time, megabytes / regex_time, ply_time / regex_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Parses sums of n distinct terms and renders their names, for n up to
+10000. Names are rendered once, so the time per term should stay flat
+as n grows rather than growing linearly, as it did when every
+intermediate sum built its own name.
+Usage: python benchmarks/bench_long_sums.py
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+
+SIZES = [1000, 2000, 5000, 10000]
+
+# Sum of n terms, each a different multiple of x or y.
+def long_sum(n):
+    return ' + '.join('%d * %s' % (i + 1, 'xy'[i % 2]) for i in range(n))
+
+# Seconds to parse text and render the name of the result.
+def parse_and_render(backend, text):
+    parser = Parser(backend=backend)
+    parser.parse('variable x y')
+    start = time.time()
+    parser.parse(text)
+    str(parser.statements[0])
+    return time.time() - start
+
+def main():
+    for backend in ('ply', 'pratt'):
+        parse_and_render(backend, long_sum(100))
+        for n in SIZES:
+            elapsed = parse_and_render(backend, long_sum(n))
+            print("%-5s %5d terms: %.3f s (%.1f us per term)" %
+                  (backend, n, elapsed, 1e6 * elapsed / n))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Reports the bytes held per Expression node, for leaves (Constants) and
+for binary operations, in this tree and in an earlier revision, by
+default the last one before nodes were slotted. The earlier revision
+is exported with git archive into a temporary directory.
+Usage: python benchmarks/bench_node_memory.py [REVISION]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+N = 200000
+
+SCRIPT = """
+import tracemalloc
+from dcp_parser.expression.expression import Variable, Constant
+x = Variable('x')
+tracemalloc.start()
+leaves = [None] * %(n)d
+base = tracemalloc.get_traced_memory()[0]
+for i in range(%(n)d):
+    leaves[i] = Constant(i)
+leaf_bytes = tracemalloc.get_traced_memory()[0] - base
+sums = [None] * %(n)d
+base = tracemalloc.get_traced_memory()[0]
+for i in range(%(n)d):
+    sums[i] = x + leaves[i]
+sum_bytes = tracemalloc.get_traced_memory()[0] - base
+print('%%d %%d' %% (leaf_bytes, sum_bytes))
+"""
+
+# Bytes per leaf and per sum node, building nodes from the tree at root.
+def measure(root):
+    output = subprocess.check_output([sys.executable, '-B', '-c',
+                                      SCRIPT % {'n': N}], cwd=root)
+    return [int(size) / float(N) for size in output.split()]
+
+# The parent of the commit that added __slots__ to Statement.
+def before_slots():
+    commits = subprocess.check_output(
+        ['git', 'log', '--format=%H', '-S', '__slots__', '--',
+         'dcp_parser/expression/statement.py'], cwd=ROOT).split()
+    return commits[-1].decode() + '~1'
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else before_slots()
+    tmp = tempfile.mkdtemp()
+    try:
+        archive = subprocess.Popen(['git', 'archive', revision, 'dcp_parser'],
+                                   cwd=ROOT, stdout=subprocess.PIPE)
+        subprocess.check_call(['tar', '-x', '-C', tmp], stdin=archive.stdout)
+        if archive.wait() != 0:
+            raise Exception("git archive %s failed." % revision)
+        (old_leaf, old_sum) = measure(tmp)
+    finally:
+        shutil.rmtree(tmp)
+    (leaf, total) = measure(ROOT)
+    print("%d nodes of each kind, bytes per node:" % N)
+    print("leaf (Constant): %6.1f before, %6.1f after (%.1fx)" %
+          (old_leaf, leaf, old_leaf / leaf))
+    print("x + leaf:        %6.1f before, %6.1f after (%.1fx)" %
+          (old_sum, total, old_sum / total))
+
+if __name__ == '__main__':
+    main()
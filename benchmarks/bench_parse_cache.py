@@ -0,0 +1,78 @@
+"""
+Replays a quiz session, in which every generated expression is parsed
+once when it is generated and again when its parse tree is shown, and
+expressions recur across questions. Times parsing and encoding each
+request with a fresh Parser and preamble, as the pages did, against
+a ParseCache, and prints the cache's counters.
+Usage: python benchmarks/bench_parse_cache.py
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser, SymbolTable
+from dcp_parser.cache import ParseCache
+from dcp_parser.json.statement_encoder import StatementEncoder
+
+PREAMBLE = ['variable x y z u v w', 'parameter a b c', 'parameter positive d e f']
+ATOMS = ['square', 'sqrt', 'exp', 'log', 'abs', 'inv_pos', 'pos']
+LEAVES = ['x', 'y', 'z', 'u', 'v', 'w', 'a', 'd', '2', '0.5']
+QUESTIONS = 5000
+POOL = 300
+
+# A random quiz expression of the given depth.
+def expression(rand, depth):
+    if depth == 0:
+        return rand.choice(LEAVES)
+    kind = rand.random()
+    if kind < 0.4:
+        return '%s(%s)' % (rand.choice(ATOMS), expression(rand, depth - 1))
+    elif kind < 0.6:
+        return 'max(%s, %s)' % (expression(rand, depth - 1), expression(rand, depth - 1))
+    return '%s %s %s' % (expression(rand, depth - 1), rand.choice('+-*'),
+                         expression(rand, depth - 1))
+
+# The texts the quiz parses, in order.
+def session():
+    rand = random.Random(0)
+    pool = [expression(rand, rand.randint(2, 4)) for i in range(POOL)]
+    texts = []
+    for i in range(QUESTIONS):
+        text = rand.choice(pool)
+        texts.extend([text, text])
+    return texts
+
+def uncached(texts):
+    results = []
+    for text in texts:
+        parser = Parser()
+        for line in PREAMBLE:
+            parser.parse(line)
+        parser.parse(text)
+        results.append(StatementEncoder().encode(parser.statements[-1]))
+    return results
+
+def cached(texts, cache):
+    symbols = SymbolTable.from_preamble(PREAMBLE)
+    return [cache.encode(text, symbols) for text in texts]
+
+def main():
+    texts = session()
+    start = time.time()
+    expected = uncached(texts)
+    uncached_time = time.time() - start
+    cache = ParseCache(max_entries=POOL // 2)
+    start = time.time()
+    results = cached(texts, cache)
+    cached_time = time.time() - start
+    if results != expected:
+        raise Exception("The cached encodings differ.")
+    print("%d parses of %d expressions" % (len(texts), POOL))
+    print("uncached: %.3f s (%.1f us/parse)" % (uncached_time, 1e6 * uncached_time / len(texts)))
+    print("cached:   %.3f s (%.1f us/parse, %.1fx)" %
+          (cached_time, 1e6 * cached_time / len(texts), uncached_time / cached_time))
+    print(cache)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Grades a batch of quiz-style answers against the analyzer preamble,
+once with a fresh Parser and preamble per answer (as the pages do)
+and once with Parser.parse_many.
+Usage: python benchmarks/bench_parse_many.py
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+
+PREAMBLE = ['variable x y z u v w', 'parameter a b c', 'parameter positive d e f']
+
+ANSWERS = [
+    'square(x) + d * y',
+    'log_sum_exp(x, y, z) - sqrt(u)',
+    'max(x, y) <= norm(v, 2) + e',
+    'a * x ^ 2',
+    'geo_mean(u, v) >= inv_pos(w)',
+    'huber(x - y, 1) + 2 * f',
+    'pow(z, 3) + exp(-x)',
+    'sum(u, v, w) == 1',
+]
+
+N = 20000
+
+# One fresh Parser per answer, re-parsing the preamble each time.
+def one_by_one(texts, backend):
+    results = []
+    for text in texts:
+        parser = Parser(backend=backend)
+        for line in PREAMBLE:
+            parser.parse(line)
+        try:
+            parser.parse(text)
+            results.append((parser.statements, None))
+        except Exception as e:
+            results.append((parser.statements, e))
+    return results
+
+def batch(texts, backend):
+    return Parser(backend=backend).parse_many(texts, preamble=PREAMBLE)
+
+# Wall time of f(texts, backend), after one warm-up call.
+def timed(f, texts, backend):
+    f(texts[:10], backend)
+    start = time.time()
+    f(texts, backend)
+    return time.time() - start
+
+def main():
+    texts = [ANSWERS[i % len(ANSWERS)] for i in range(N)]
+    for backend in ('ply', 'pratt'):
+        single = timed(one_by_one, texts, backend)
+        many = timed(batch, texts, backend)
+        print("%-5s one by one: %.2f s (%d answers/s)" % (backend, single, N / single))
+        print("%-5s parse_many: %.2f s (%d answers/s, %.1fx)" %
+              (backend, many, N / many, single / many))
+
+if __name__ == '__main__':
+    main()
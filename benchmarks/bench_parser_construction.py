@@ -0,0 +1,22 @@
+"""
+Compares the cost of constructing Parsers with constructing dicts.
+The grammar is built once before timing, as it is on page load.
+Usage: python benchmarks/bench_parser_construction.py
+"""
+import os
+import sys
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser, Grammar
+
+N = 10000
+
+def main():
+    Grammar.get()
+    dict_time = min(timeit.repeat(dict, number=N, repeat=5))
+    parser_time = min(timeit.repeat(Parser, number=N, repeat=5))
+    print("%d dicts:   %.4f s" % (N, dict_time))
+    print("%d Parsers: %.4f s (%.1fx)" % (N, parser_time, parser_time / dict_time))
+
+if __name__ == '__main__':
+    main()
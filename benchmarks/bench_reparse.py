@@ -0,0 +1,75 @@
+"""
+Times editing one leaf of large constraints built as balanced sums,
+the analyzer's edit-one-node workflow: reparsing and encoding the whole
+edited text, against Parser.reparse and encoding only the change.
+Usage: python benchmarks/bench_reparse.py
+"""
+import json
+import os
+import sys
+import timeit
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+from dcp_parser.json.statement_encoder import StatementEncoder
+
+SIZES = [100, 1000, 10000]
+PREAMBLE = ['variable x y z', 'parameter positive a']
+TERMS = ['square(x)', 'a * y', 'max(x, y, z)', 'exp(z)']
+
+# A sum of terms terms, grouped into a balanced tree.
+def balanced_sum(start, terms):
+    if terms == 1:
+        return TERMS[start % len(TERMS)]
+    half = terms // 2
+    return "(%s + %s)" % (balanced_sum(start, half),
+                          balanced_sum(start + half, terms - half))
+
+# The path to the first leaf term.
+def first_leaf(statement):
+    (node, path) = (statement.lhs, [0])
+    while node.monotonicity is None and len(node.subexpressions) > 0:
+        path.append(0)
+        node = node.subexpressions[0]
+    return path
+
+def main():
+    for size in SIZES:
+        parser = Parser()
+        for line in PREAMBLE:
+            parser.parse(line)
+        parser.parse(balanced_sum(0, size) + ' <= a')
+        statement = parser.statements[-1]
+        path = first_leaf(statement)
+        text = str(statement)
+        edited = text.replace(TERMS[0], 'log(z)', 1)
+
+        def full():
+            fresh = Parser()
+            for line in PREAMBLE:
+                fresh.parse(line)
+            fresh.parse(edited)
+            return StatementEncoder().encode(fresh.statements[-1])
+
+        replacements = ['log(z)', TERMS[0]]
+        def incremental():
+            current = parser.statements[-1]
+            (new, change) = parser.reparse(current, replacements[0], path=path)
+            replacements.reverse()
+            return json.dumps(change)
+
+        # Both give the same tree.
+        (new, change) = parser.reparse(statement, 'log(z)', path=path)
+        if StatementEncoder().encode(new) != full():
+            raise Exception("Incremental and full reparses differ.")
+        parser.reparse(new, TERMS[0], path=path)
+
+        number = max(1, 2000 // size)
+        full_time = min(timeit.repeat(full, number=number, repeat=3)) / number
+        incremental_time = min(timeit.repeat(incremental, number=number * 10,
+                                             repeat=3)) / (number * 10)
+        print("%5d terms, depth %2d: full %.2f ms, incremental %.3f ms (%.0fx)" %
+              (size, len(path), 1e3 * full_time, 1e3 * incremental_time,
+               full_time / incremental_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Records every Sign and Curvature operation made while parsing the
+parser test corpus, then replays that operator mix against this tree
+and against an earlier revision, by default the last one before the
+operation tables. Each replay runs in a fresh interpreter; the earlier
+revision is exported with git archive into a temporary directory.
+Usage: python benchmarks/bench_sign_curvature.py [REVISION]
+"""
+import functools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+from dcp_parser.expression.sign import Sign
+from dcp_parser.expression.curvature import Curvature
+from dcp_parser.tests.parser_corpus import parser_corpus
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+OPERATIONS = ['__add__', '__sub__', '__mul__', '__truediv__', '__neg__',
+              '__eq__', '__ne__', '__lt__', '__gt__', '__le__', '__ge__',
+              'sign_mult']
+REPEAT = 200
+
+SCRIPT = """
+import json, time
+from dcp_parser.expression.sign import Sign
+from dcp_parser.expression.curvature import Curvature
+CLASSES = {'Sign': Sign, 'Curvature': Curvature}
+calls = []
+for (kind, method, value, args) in json.load(open(%(path)r)):
+    args = tuple(CLASSES[arg_kind](arg) for (arg_kind, arg) in args)
+    calls.append((getattr(CLASSES[kind](value), method), args))
+start = time.time()
+for i in range(%(repeat)d):
+    for (method, args) in calls:
+        method(*args)
+print(time.time() - start)
+"""
+
+# Parses the corpus, recording the outermost Sign and Curvature calls.
+def record():
+    log = []
+    depth = [0]
+    def traced(kind, method, original):
+        @functools.wraps(original)
+        def wrapper(self, *args):
+            if depth[0] == 0:
+                log.append((kind, method, str(self),
+                            [(arg.__class__.__name__, str(arg)) for arg in args]))
+            depth[0] += 1
+            try:
+                return original(self, *args)
+            finally:
+                depth[0] -= 1
+        return wrapper
+    originals = []
+    for cls in (Sign, Curvature):
+        for method in OPERATIONS:
+            if method in cls.__dict__:
+                originals.append((cls, method, cls.__dict__[method]))
+                setattr(cls, method, traced(cls.__name__, method, cls.__dict__[method]))
+    try:
+        for statements in parser_corpus():
+            parser = Parser()
+            for statement in statements:
+                try:
+                    parser.parse(statement)
+                except Exception:
+                    pass
+    finally:
+        for (cls, method, original) in originals:
+            setattr(cls, method, original)
+    # Comparisons with anything but a Sign or Curvature are not replayed.
+    return [call for call in log
+            if all(kind in ('Sign', 'Curvature') for (kind, _) in call[3])]
+
+# Seconds to replay the calls in path REPEAT times with the tree at root.
+def replay(root, path):
+    output = subprocess.check_output([sys.executable, '-B', '-c',
+        SCRIPT % {'path': path, 'repeat': REPEAT}], cwd=root)
+    return float(output)
+
+# The parent of the commit that added the curvature operation tables.
+def before_tables():
+    commits = subprocess.check_output(
+        ['git', 'log', '--format=%H', '-S', 'SIGN_MULT_TABLE', '--',
+         'dcp_parser/expression/curvature.py'], cwd=ROOT).split()
+    return commits[-1].decode() + '~1'
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else before_tables()
+    calls = record()
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'calls.json')
+        with open(path, 'w') as out:
+            json.dump(calls, out)
+        old = os.path.join(tmp, 'old')
+        os.mkdir(old)
+        archive = subprocess.Popen(['git', 'archive', revision, 'dcp_parser'],
+                                   cwd=ROOT, stdout=subprocess.PIPE)
+        subprocess.check_call(['tar', '-x', '-C', old], stdin=archive.stdout)
+        if archive.wait() != 0:
+            raise Exception("git archive %s failed." % revision)
+        before = replay(old, path)
+        after = replay(ROOT, path)
+    finally:
+        shutil.rmtree(tmp)
+    total = float(len(calls) * REPEAT)
+    print("%d operations recorded from the parser corpus, replayed %d times" %
+          (len(calls), REPEAT))
+    print("before: %.3f s (%.0f ns per operation)" % (before, 1e9 * before / total))
+    print("after:  %.3f s (%.0f ns per operation, %.1fx)" %
+          (after, 1e9 * after / total, before / after))
+
+if __name__ == '__main__':
+    main()
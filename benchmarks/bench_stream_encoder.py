@@ -0,0 +1,76 @@
+"""
+Times encoding large statements as JSON and measures the peak memory
+allocated while encoding: building nested dicts for json.dumps, as
+StatementEncoder did, against writing fragments with a StreamEncoder.
+Left nested sums deeper than the recursion limit can only be streamed.
+Usage: python benchmarks/bench_stream_encoder.py
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from dcp_parser.parser import Parser
+from dcp_parser.json.statement_encoder import StatementEncoder
+from dcp_parser.json.stream_encoder import StreamEncoder
+
+PREAMBLE = ['variable x y z', 'parameter positive a']
+TERMS = ['square(x)', 'a * y', 'max(x, y, z)', 'exp(z)']
+
+# A sum of terms terms, grouped into a balanced tree.
+def balanced_sum(start, terms):
+    if terms == 1:
+        return TERMS[start % len(TERMS)]
+    half = terms // 2
+    return "(%s + %s)" % (balanced_sum(start, half),
+                          balanced_sum(start + half, terms - half))
+
+# A sum of terms terms, nested to the left.
+def left_sum(terms):
+    return ' + '.join(TERMS[i % len(TERMS)] for i in range(terms))
+
+# Returns the seconds per call of encode and the peak bytes it allocates,
+# or None if it exceeds the recursion limit.
+def measure(encode, statement):
+    try:
+        encode(statement)
+    except RecursionError:
+        return None
+    tracemalloc.start()
+    encode(statement)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    calls = 3
+    return (timeit.timeit(lambda: encode(statement), number=calls) / calls, peak)
+
+def dicts(statement):
+    return json.dumps(StatementEncoder().default(statement))
+
+def stream(statement):
+    return StreamEncoder().encode(statement)
+
+def main():
+    cases = [('balanced', 1000, balanced_sum(0, 1000)),
+             ('balanced', 10000, balanced_sum(0, 10000)),
+             ('left', 200, left_sum(200)),
+             ('left', 5000, left_sum(5000))]
+    for (shape, terms, text) in cases:
+        parser = Parser()
+        for line in PREAMBLE:
+            parser.parse(line)
+        parser.parse(text + ' <= 1')
+        statement = parser.statements[-1]
+        # Render the names once, as both encoders reuse them.
+        StreamEncoder().encode(statement)
+        results = [measure(encode, statement) for encode in [dicts, stream]]
+        line = "%-8s %5d terms:" % (shape, terms)
+        for (name, result) in zip(['dicts', 'stream'], results):
+            if result is None:
+                line += "  %s: recursion limit" % name
+            else:
+                line += "  %s: %8.2f ms %8.1f MB peak" % (name, 1000 * result[0], result[1] / 1e6)
+        print(line)
+
+if __name__ == '__main__':
+    main()
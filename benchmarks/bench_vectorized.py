@@ -0,0 +1,102 @@
+"""
+Times the DCP analysis of large machine generated objectives: walking
+the expressions bottom up and applying each operator or atom to the
+analyzed arguments, against FlatTree.analyze, which looks up all the
+nodes of a height at once. Both start from the leaves' codes and must
+agree on every node. Flattening the tree and building its passes is
+timed separately, as it is done once per tree. Requires numpy.
+Usage: python benchmarks/bench_vectorized.py [NODES ...]
+"""
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import numpy
+import dcp_parser.atomic.atom_loader as atom_loader
+from dcp_parser.expression.expression import Variable, Parameter, Constant
+from dcp_parser.expression.sign import Sign
+from dcp_parser.vectorized import FlatTree, PROTOTYPES, code
+
+SIZES = [10 ** 4, 10 ** 5, 10 ** 6]
+UNARY = ['square', 'exp', 'abs', 'pos', 'sqrt', 'log', 'inv_pos', 'entr']
+BINARY = ['+', '-', '*', 'max', 'min', 'kl_div', 'quad_over_lin']
+
+# A random objective with about nodes nodes, built without the parser.
+def objective(nodes, rand):
+    functions = atom_loader.ATOMS.functions
+    signs = [Sign.POSITIVE, Sign.NEGATIVE, Sign.UNKNOWN]
+    terms = []
+    for i in range(nodes // 3):
+        kind = rand.random()
+        if kind < 0.5:
+            terms.append(Variable('x%d' % i, rand.choice(signs)))
+        elif kind < 0.75:
+            terms.append(Parameter('p%d' % i, rand.choice(signs)))
+        else:
+            terms.append(Constant(rand.randint(-9, 9)))
+    while len(terms) > 1:
+        combined = []
+        for i in range(0, len(terms) - 1, 2):
+            (lh, rh) = terms[i:i + 2]
+            if rand.random() < 0.3:
+                lh = functions[rand.choice(UNARY)](lh)
+            op = rand.choice(BINARY)
+            if op == '+':
+                combined.append(lh + rh)
+            elif op == '-':
+                combined.append(lh - rh)
+            elif op == '*':
+                combined.append(lh * rh)
+            else:
+                combined.append(functions[op](lh, rh))
+        if len(terms) % 2:
+            combined.append(terms[-1])
+        terms = combined
+    return terms[0]
+
+# The object walk: rebuilds the expressions bottom up from the leaves'
+# codes with each node's operator or atom, and returns their codes.
+def walk(flat, leaf_codes):
+    built = [None] * len(flat)
+    codes = numpy.empty(len(flat), dtype=numpy.int8)
+    offsets = flat.offsets.tolist()
+    children = flat.children.tolist()
+    for (index, kind) in enumerate(flat.kinds.tolist()):
+        if kind < 0:
+            exp = PROTOTYPES[leaf_codes[index]]
+        else:
+            rule = flat.rules[kind]
+            args = [built[child] for child in children[offsets[index]:offsets[index + 1]]]
+            exp = rule.function(*(args + rule.parameters))
+        built[index] = exp
+        codes[index] = code(exp.curvature, exp.sign)
+    return codes
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    rand = random.Random(0)
+    for size in sizes:
+        statement = objective(size, rand)
+        start = time.time()
+        flat = FlatTree(statement)
+        flatten_time = time.time() - start
+        start = time.time()
+        flat.build_passes()
+        passes_time = time.time() - start
+        leaf_codes = flat.leaf_codes.tolist()
+        start = time.time()
+        expected = walk(flat, leaf_codes)
+        walk_time = time.time() - start
+        start = time.time()
+        codes = flat.analyze()
+        analyze_time = time.time() - start
+        if not (codes == expected).all() or not (codes == flat.node_codes()).all():
+            raise Exception("The analyses differ.")
+        print("%8d nodes, height %3d: flatten %7.1f ms, passes %6.1f ms, "
+              "walk %8.1f ms, analyze %6.1f ms (%.0fx)" %
+              (len(flat), flat.heights.max(), 1000 * flatten_time, 1000 * passes_time,
+               1000 * walk_time, 1000 * analyze_time, walk_time / analyze_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Parses a non-DCP model in which every term has a DCP violation and
+reports the bytes the parsed model holds and the time to encode it as
+JSON, in this tree and in an earlier revision, by default the last one
+before violations became shared records with cached messages. The
+earlier revision is exported with git archive into a temporary directory.
+Usage: python benchmarks/bench_violations.py [REVISION]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TERMS = 5000
+
+SCRIPT = """
+import gc
+import timeit
+import tracemalloc
+from dcp_parser.parser import Parser
+from dcp_parser.json.statement_encoder import StatementEncoder
+terms = ['sqrt(x + %%d) * square(y - %%d)' %% (i, i) if i %% 2 else
+         'square(sqrt(z + %%d)) + x * y * %%d' %% (i, i) for i in range(%(terms)d)]
+# Group the terms into a balanced sum, so names stay short.
+while len(terms) > 1:
+    terms = ['(%%s + %%s)' %% tuple(terms[i:i + 2]) if i + 1 < len(terms) else terms[i]
+             for i in range(0, len(terms), 2)]
+text = terms[0] + ' <= a'
+parser = Parser()
+parser.parse('variable x y z')
+parser.parse('parameter a')
+gc.collect()
+tracemalloc.start()
+base = tracemalloc.get_traced_memory()[0]
+parser.parse(text)
+gc.collect()
+size = tracemalloc.get_traced_memory()[0] - base
+tracemalloc.stop()
+statement = parser.statements[-1]
+errors = 0
+stack = [statement]
+while stack:
+    node = stack.pop()
+    errors += len(node.errors)
+    stack.extend(node.subexpressions)
+StatementEncoder().encode(statement)
+seconds = timeit.timeit(lambda: StatementEncoder().encode(statement), number=5) / 5
+print('%%d %%d %%f' %% (errors, size, seconds))
+"""
+
+# The number of violations, bytes held and seconds to encode in the tree at root.
+def measure(root):
+    output = subprocess.check_output([sys.executable, '-B', '-c',
+                                      SCRIPT % {'terms': TERMS}], cwd=root)
+    (errors, size, seconds) = output.split()
+    return (int(errors), int(size), float(seconds))
+
+# The parent of the commit that cached violation messages.
+def before_records():
+    commits = subprocess.check_output(
+        ['git', 'log', '--format=%H', '-S', 'def render(self)', '--',
+         'dcp_parser/error_messages/dcp_violation.py'], cwd=ROOT).split()
+    if not commits:
+        return 'HEAD'
+    return commits[-1].decode() + '~1'
+
+def main():
+    revision = sys.argv[1] if len(sys.argv) > 1 else before_records()
+    tmp = tempfile.mkdtemp()
+    try:
+        archive = subprocess.Popen(['git', 'archive', revision, 'dcp_parser'],
+                                   cwd=ROOT, stdout=subprocess.PIPE)
+        subprocess.check_call(['tar', '-x', '-C', tmp], stdin=archive.stdout)
+        if archive.wait() != 0:
+            raise Exception("git archive %s failed." % revision)
+        (errors, old_size, old_seconds) = measure(tmp)
+    finally:
+        shutil.rmtree(tmp)
+    (errors, size, seconds) = measure(ROOT)
+    print("%d terms, %d violations:" % (TERMS, errors))
+    print("model bytes: %10d before, %10d after (%.1f bytes less per violation)" %
+          (old_size, size, (old_size - size) / float(errors)))
+    print("encode:      %8.1f ms before, %8.1f ms after (%.2fx)" %
+          (1000 * old_seconds, 1000 * seconds, old_seconds / seconds))
+
+if __name__ == '__main__':
+    main()
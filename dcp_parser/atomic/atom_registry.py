@@ -0,0 +1,251 @@
+from dcp_parser import lexer
+from dcp_parser.expression.expression import Expression
+from collections import ChainMap
+from collections.abc import Mapping
+import inspect
+import types
+
+# For a given atomic class creates a function that takes in arguments,
+# passes them to the class constructor, and returns an Expression
+# based on the class sign and curvature.
+# The function carries the class signature.
+def make_atomic_func(atomic_class):
+    def atomic_func(*args):
+        instance = atomic_class(*args)
+        # The name is rendered lazily from the arguments.
+        name = [instance.name() + "("]
+        for i in range(len(args)):
+            if i > 0:
+                name.append(", ")
+            arg = args[i]
+            name.append(arg if isinstance(arg, Expression) else str(arg))
+        name.append(")")
+
+        result = instance.evaluate()
+        return Expression(result.curvature, result.sign, tuple(name),
+                          instance.arguments(),
+                          errors = result.errors,
+                          monotonicity = result.monotonicity,
+                          short_name = instance.short_name())
+    atomic_func.signature = atomic_class.SIGNATURE
+    return atomic_func
+
+# Raises the parser's error if a call to atom with expression_list
+# has a missing argument or does not fit the atom's signature.
+# The call is only rendered for the error message.
+def check_atom_call(atom_name, atom, expression_list):
+    for arg in expression_list:
+        if isinstance(arg, str) and not arg:
+            raise Exception("Missing arguments in '%s'." %
+                            atom_call_string(atom_name, expression_list))
+    if not atom.signature.accepts(expression_list):
+        raise Exception("Incorrect number of arguments in '%s'." %
+                        atom_call_string(atom_name, expression_list))
+
+# The call to atom_name with expression_list as a string.
+def atom_call_string(atom_name, expression_list):
+    return atom_name + "(" + ", ".join(str(arg) for arg in expression_list) + ")"
+
+
+class AtomSignature(object):
+    """
+    The arguments an atom class accepts, compiled from its constructor so
+    a call can be checked before the atom is built.
+    min_args and max_args bound the number of arguments (max_args is None
+    for variadic atoms). A parameterized atom has a parameter slot: the
+    last positional argument, or for a variadic atom a trailing number or
+    string argument.
+    Every other argument must be an Expression. string_args are the
+    STRING_ARG values, such as 'Inf', that the parameter accepts.
+    The atom's PARAMETER_FIRST says whether it takes its parameter before
+    checking its other arguments.
+    """
+    TRAILING = -1
+
+    def __init__(self, atom_class, parameterized):
+        self.atom_class = atom_class
+        params = list(inspect.signature(atom_class.__init__).parameters.values())[1:]
+        positional = [p for p in params if p.kind in (p.POSITIONAL_ONLY,
+                                                      p.POSITIONAL_OR_KEYWORD)]
+        self.variadic = any(p.kind == p.VAR_POSITIONAL for p in params)
+        # Atom requires at least one argument.
+        self.min_args = max(len([p for p in positional if p.default is p.empty]), 1)
+        self.max_args = None if self.variadic else len(positional)
+        self.defaults = dict((p.name, p.default) for p in positional
+                             if p.default is not p.empty)
+        if 'PARAMETER_DEFAULT' in atom_class.__dict__:
+            self.defaults['parameter'] = atom_class.PARAMETER_DEFAULT
+
+        self.parameter = None
+        self.default = None
+        self.string_args = frozenset()
+        if parameterized:
+            if self.variadic:
+                self.parameter = AtomSignature.TRAILING
+                self.default = getattr(atom_class, 'PARAMETER_DEFAULT', None)
+            else:
+                self.parameter = len(positional) - 1
+                if positional[-1].default is not positional[-1].empty:
+                    self.default = positional[-1].default
+            self.string_args = frozenset(arg for arg in lexer.STRING_ARGS
+                                         if self.valid_parameter(arg))
+        self.parameter_first = atom_class.PARAMETER_FIRST
+
+    # Raises the atom's own error if parameter is invalid.
+    def validate(self, parameter):
+        if not (isinstance(parameter, str) and parameter in self.string_args):
+            instance = object.__new__(self.atom_class)
+            instance.parameter = parameter
+            instance.validate_parameter()
+
+    def valid_parameter(self, parameter):
+        try:
+            self.validate(parameter)
+            return True
+        except Exception:
+            return False
+
+    # Returns whether the atom can be built from args, without building it.
+    # The atom would raise a TypeError for too many or too few arguments,
+    # or for a string where it expects an Expression.
+    # If the atom takes its parameter first and the parameter is invalid,
+    # raises the atom's own error instead, as building it would.
+    def accepts(self, args):
+        count = len(args)
+        if count < self.min_args or \
+           (self.max_args is not None and count > self.max_args):
+            return False
+        if self.parameter is None:
+            return not AtomSignature.has_string(args)
+        elif self.parameter == AtomSignature.TRAILING:
+            # The atom tests the last argument before anything else.
+            parameter = self.atom_class.constant_to_number(args[-1])
+            if isinstance(parameter, Expression):
+                (parameter, expressions) = (self.default, args)
+            else:
+                expressions = args[:-1]
+        else:
+            slot = self.parameter
+            parameter = args[slot] if count > slot else self.default
+            expressions = args[:slot] + args[slot+1:]
+        if expressions and not AtomSignature.has_string(expressions):
+            return True
+        if self.parameter_first:
+            if self.parameter != AtomSignature.TRAILING and count > self.parameter:
+                parameter = self.atom_class.constant_to_number(parameter)
+            self.validate(parameter)
+        return False
+
+    # Returns whether any of args is a string rather than an Expression.
+    @staticmethod
+    def has_string(args):
+        for arg in args:
+            if isinstance(arg, str):
+                return True
+        return False
+
+    def __repr__(self):
+        return "AtomSignature(%s, %s, %s, %s)" % (self.atom_class.__name__.lower(),
+                                                  self.min_args, self.max_args,
+                                                  self.parameter)
+
+
+class AtomInfo(object):
+    """
+    Metadata for an atom class, read from its compiled signature.
+    min_args and max_args bound the number of arguments (max_args is None
+    for variadic atoms). defaults maps optional arguments to their
+    defaults. A variadic parameterized atom declares the default for its
+    trailing parameter as PARAMETER_DEFAULT, which is recorded under
+    'parameter'.
+    """
+    def __init__(self, atom_class):
+        signature = atom_class.SIGNATURE
+        self.atom_class = atom_class
+        self.signature = signature
+        self.name = atom_class.__name__.lower()
+        self.parameterized = signature.parameter is not None
+        self.variadic = signature.variadic
+        self.min_args = signature.min_args
+        self.max_args = signature.max_args
+        self.defaults = signature.defaults
+
+    def __repr__(self):
+        return "AtomInfo(%s, %s, %s, %s)" % (self.name, self.min_args,
+                                             self.max_args, self.defaults)
+
+
+class AtomRegistry(Mapping):
+    """
+    Maps atom names to AtomInfo. Atom classes join ATOMS when they are
+    defined, and atoms.py freezes it once all are defined. functions then
+    maps each name to the function that builds its Expressions, and is
+    shared by every parser.
+    extend and restrict return new frozen registries that share the
+    entries of this one, for parsers with a custom set of atoms.
+    """
+    def __init__(self):
+        self.infos = {}
+        self.functions = None
+
+    # Whether freeze() has been called.
+    @property
+    def frozen(self):
+        return self.functions is not None
+
+    # Adds atom_class under its lowercased class name.
+    def register(self, atom_class):
+        info = AtomInfo(atom_class)
+        if self.frozen:
+            raise Exception("Cannot register '%s'; the atom registry is frozen."
+                            % info.name)
+        self.infos[info.name] = info
+
+    # Builds the atomic functions and stops registration.
+    def freeze(self):
+        functions = dict((name, make_atomic_func(info.atom_class))
+                         for (name, info) in self.infos.items())
+        self.infos = types.MappingProxyType(self.infos)
+        self.functions = types.MappingProxyType(functions)
+
+    # A frozen registry over infos and functions.
+    @staticmethod
+    def derived(infos, functions):
+        registry = AtomRegistry()
+        registry.infos = types.MappingProxyType(infos)
+        registry.functions = types.MappingProxyType(functions)
+        return registry
+
+    # Returns a registry with atom_classes added to (or replacing) these atoms.
+    def extend(self, atom_classes):
+        infos = {}
+        for atom_class in atom_classes:
+            info = AtomInfo(atom_class)
+            infos[info.name] = info
+        functions = dict((name, make_atomic_func(info.atom_class))
+                         for (name, info) in infos.items())
+        return AtomRegistry.derived(ChainMap(infos, self.infos),
+                                    ChainMap(functions, self.functions))
+
+    # Returns a registry with only the atoms called names.
+    def restrict(self, names):
+        for name in names:
+            if not name in self.infos:
+                raise Exception("'%s' is not a known function." % name)
+        return AtomRegistry.derived(dict((name, self.infos[name]) for name in names),
+                                    dict((name, self.functions[name]) for name in names))
+
+    def __getitem__(self, name):
+        return self.infos[name]
+
+    def __iter__(self):
+        return iter(self.infos)
+
+    def __len__(self):
+        return len(self.infos)
+
+    def __repr__(self):
+        return "AtomRegistry(%s)" % sorted(self.infos)
+
+# The atoms defined in dcp_parser.atomic.atoms.
+ATOMS = AtomRegistry()
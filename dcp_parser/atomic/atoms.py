@@ -12,6 +12,35 @@ from dcp_parser.expression.sign import Sign
 from dcp_parser.expression.curvature import Curvature
 from dcp_parser.atomic.monotonicity import Monotonicity
 from dcp_parser.expression.expression import Expression, Constant
+from dcp_parser.error_messages.dcp_violation_factory import DCPViolationFactory
+from dcp_parser.atomic.atom_registry import ATOMS, AtomSignature
+
+class AtomResult(object):
+    """
+    The analysis of one atom, computed once by Atom.evaluate():
+    its sign, signed curvature, monotonicity in each argument, curvature
+    in each argument under the composition rules, overall curvature
+    and composition errors.
+    """
+    __slots__ = ('sign', 'signed_curvature', 'monotonicity',
+                 'dcp_curvatures', 'curvature', 'errors')
+
+    def __init__(self, sign, signed_curvature, monotonicity,
+                 dcp_curvatures, curvature, errors):
+        self.sign = sign
+        self.signed_curvature = signed_curvature
+        self.monotonicity = monotonicity
+        self.dcp_curvatures = dcp_curvatures
+        self.curvature = curvature
+        self.errors = errors
+
+    def __repr__(self):
+        return "AtomResult(%s, %s, %s, %s, %s, %s)" % (self.sign,
+                                                       self.signed_curvature,
+                                                       self.monotonicity,
+                                                       self.dcp_curvatures,
+                                                       self.curvature,
+                                                       self.errors)
 
 class Atom(object):
     """ Abstract base class for all atoms. """
@@ -29,6 +58,21 @@ class Atom(object):
                             str(Sign.UNKNOWN): Monotonicity.NONMONOTONIC
                             }
 
+    # Whether a parameterized atom takes its parameter before
+    # checking its other arguments.
+    PARAMETER_FIRST = True
+
+    # Each atom class compiles its SIGNATURE, which the parser checks
+    # calls against. An atom class is parameterized if Parameterized is
+    # one of its own bases; subclasses of parameterized atoms, such as
+    # abs, fix the parameter. Every atom class defined in this module
+    # joins ATOMS. Classes defined later can be added with ATOMS.extend.
+    def __init_subclass__(cls, **kwargs):
+        super(Atom, cls).__init_subclass__(**kwargs)
+        cls.SIGNATURE = AtomSignature(cls, Parameterized in cls.__bases__)
+        if not ATOMS.frozen:
+            ATOMS.register(cls)
+
     # args are the expressions passed into the Atom constructor.
     def __init__(self, *args):
         # Throws error if args is empty.
@@ -40,6 +84,10 @@ class Atom(object):
         # but if the Atom is defined in terms of another Atom
         # self.args could be different.
         self.original_args = self.args
+        # Filled in on first use, see evaluate.
+        self.arg_curvatures = None
+        self.arg_signs = None
+        self.result = None
 
     # Returns the Atom's name as a function.
     def name(self):
@@ -50,7 +98,7 @@ class Atom(object):
     # For non-parameterized Atoms this will be the same as the function name.
     # For parameterized Atoms this will be name(..., parameter).
     def short_name(self):
-        if Parameterized in self.__class__.__bases__:
+        if self.SIGNATURE.parameter is not None:
             return "%s(..., %s)" % (self.name(), self.parameter)
         else:
             return self.name()
@@ -70,23 +118,52 @@ class Atom(object):
 
     # Determines curvature from args and sign.
     def curvature(self):
-        curvature = self.signed_curvature()
-        return Atom.dcp_curvature(curvature, self.args, self.monotonicity())
+        return self.evaluate().curvature
+
+    # Returns the curvature in each argument under the DCP composition rules.
+    def argument_dcp_curvatures(self):
+        return self.evaluate().dcp_curvatures
+
+    # Analyzes the atom, calling sign(), signed_curvature() and
+    # monotonicity() exactly once. Returns the AtomResult, which
+    # is kept for later calls.
+    def evaluate(self):
+        if self.result is None:
+            signed_curvature = self.signed_curvature()
+            monotonicity = self.monotonicity()
+            dcp_curvatures = Atom.argument_dcp_curvatures_of(signed_curvature,
+                                                             self.args,
+                                                             monotonicity)
+            errors = DCPViolationFactory.composition_error(signed_curvature,
+                                                           monotonicity,
+                                                           self.argument_curvatures(),
+                                                           self.argument_signs(),
+                                                           dcp_curvatures)
+            self.result = AtomResult(self.sign(), signed_curvature, monotonicity,
+                                     dcp_curvatures, Curvature.sum(dcp_curvatures),
+                                     errors)
+        return self.result
 
     # Returns argument curvatures as a list.
+    # The arguments do not change once the Atom is built, so the list is kept.
     def argument_curvatures(self):
-        return [arg.curvature for arg in self.args]
+        if self.arg_curvatures is None:
+            self.arg_curvatures = [arg.curvature for arg in self.args]
+        return self.arg_curvatures
 
     # Returns argument signs as a list.
     def argument_signs(self):
-        return [arg.sign for arg in self.args]
+        if self.arg_signs is None:
+            self.arg_signs = [arg.sign for arg in self.args]
+        return self.arg_signs
 
     # Converts an Atom into an expression with the same curvature and sign.
     # Used for defining atoms as compositions of atoms.
     @staticmethod
     def atom_to_expression(instance):
-        return Expression(instance.curvature(),
-                          instance.sign(),
+        result = instance.evaluate()
+        return Expression(result.curvature,
+                          result.sign,
                           Atom.GENERATED_EXPRESSION,
                           instance.arguments())
 
@@ -125,12 +202,19 @@ class Atom(object):
     """
     @staticmethod
     def dcp_curvature(curvature, args, monotonicities):
+        arg_curvatures = Atom.argument_dcp_curvatures_of(curvature, args,
+                                                         monotonicities)
+        return Curvature.sum(arg_curvatures)
+
+    # The curvature in each argument, looked up in the composition table.
+    @staticmethod
+    def argument_dcp_curvatures_of(curvature, args, monotonicities):
         if len(args) != len(monotonicities):
             raise Exception('The number of args be'
                             ' equal to the number of monotonicities.')
-        arg_curvatures = [monotonicity.dcp_curvature(curvature,arg.curvature)
-                          for arg,monotonicity in zip(args,monotonicities)]
-        return Curvature.sum(arg_curvatures)
+        table = Monotonicity.COMPOSITION_TABLE
+        return [table[monotonicity.index][curvature.index][arg.curvature.index]
+                for arg,monotonicity in zip(args,monotonicities)]
 
 class Parameterized(object):
     """
@@ -350,10 +434,12 @@ class Norm(Atom, Parameterized):
     p can be either a number greater than or equal to 1 or 'Inf'
     p defaults to 2.
     """
+    PARAMETER_DEFAULT = 2
+
     def __init__(self, *args):
         # Set parameter to last arg if last arg is not a non-Constant Expression
         # Otherwise default to parameter = 2
-        args = self.set_parameter(2, *args)
+        args = self.set_parameter(Norm.PARAMETER_DEFAULT, *args)
         super(Norm,self).__init__(*args)
 
     # Throws error if parameter is invalid.
@@ -496,8 +582,9 @@ class Huber_pos(Huber, Parameterized):
             return Sign.POSITIVE
 
     # Convex unless zero, in which case constant.
+    # Tests the argument directly, so sign() is only evaluated once.
     def signed_curvature(self):
-        if self.sign() <= Sign.ZERO:
+        if self.args[0].sign <= Sign.ZERO:
             return Curvature.CONSTANT
         else:
             return Curvature.CONVEX
@@ -512,10 +599,12 @@ class Huber_circ(Huber_pos, Parameterized):
     Huber_circ(vector, M) is equivalent to huber_pos(norm(x),M)
     Default M is 1.
     """
+    PARAMETER_DEFAULT = 1
+
     def __init__(self, *args):
         args = list(args)
         # Default to M=1 if last argument is not a number.
-        args = self.set_parameter(1, *args)
+        args = self.set_parameter(Huber_circ.PARAMETER_DEFAULT, *args)
         # Use Norm
         tmp_args = copy.copy(list(args))
         tmp_args.append(2)
@@ -675,6 +764,9 @@ class Pow(Atom, Parameterized):
 
 class Pow_abs(Pow, Parameterized):
     """ |x|^p """
+    # Builds abs(x) before taking p.
+    PARAMETER_FIRST = False
+
     def __init__(self,x,p):
         # Must have p >= 1
         abs_exp = Atom.atom_to_expression(Abs(x))
@@ -688,6 +780,9 @@ class Pow_abs(Pow, Parameterized):
 
 class Pow_pos(Pow, Parameterized):
     """ max{x,0}^p """
+    # Builds pos(x) before taking p.
+    PARAMETER_FIRST = False
+
     def __init__(self,x,p):
         # Must have p >= 1
         pos_exp = Atom.atom_to_expression(Pos(x))
@@ -837,3 +932,6 @@ class Sum_smallest(Sum_largest, Parameterized):
     # Always increasing
     def monotonicity(self):
         return [Monotonicity.INCREASING] * len(self.args)
+
+# All atoms are defined.
+ATOMS.freeze()
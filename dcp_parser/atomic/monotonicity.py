@@ -7,11 +7,14 @@ class Monotonicity(object):
     NONMONOTONIC_KEY = 'NONMONOTONIC'
 
     MONOTONICITY_SET = set([INCREASING_KEY, DECREASING_KEY, NONMONOTONIC_KEY])
+    # Index of each monotonicity in COMPOSITION_TABLE.
+    INDEX = {INCREASING_KEY: 0, DECREASING_KEY: 1, NONMONOTONIC_KEY: 2}
 
     def __init__(self,monotonicity_str):
         monotonicity_str = monotonicity_str.upper()
         if monotonicity_str in Monotonicity.MONOTONICITY_SET:
             self.monotonicity_str = monotonicity_str
+            self.index = Monotonicity.INDEX[monotonicity_str]
         else:
             raise Exception("No such monotonicity %s exists." % str(monotonicity_str))
 
@@ -37,6 +40,10 @@ class Monotonicity(object):
         Any combinations not covered by the rules result in a nonconvex expression.
     """
     def dcp_curvature(self, func_curvature, arg_curvature):
+        return Monotonicity.COMPOSITION_TABLE[self.index][func_curvature.index][arg_curvature.index]
+
+    # The composition rules above, from which COMPOSITION_TABLE is built.
+    def composition_rule(self, func_curvature, arg_curvature):
         if func_curvature == Curvature.NONCONVEX:
             return Curvature.NONCONVEX
         elif func_curvature == Curvature.CONSTANT or \
@@ -54,4 +61,14 @@ class Monotonicity(object):
 # Class constants for all monotonicity types.
 Monotonicity.INCREASING = Monotonicity(Monotonicity.INCREASING_KEY)
 Monotonicity.DECREASING = Monotonicity(Monotonicity.DECREASING_KEY)
-Monotonicity.NONMONOTONIC = Monotonicity(Monotonicity.NONMONOTONIC_KEY)
\ No newline at end of file
+Monotonicity.NONMONOTONIC = Monotonicity(Monotonicity.NONMONOTONIC_KEY)
+
+# The result of dcp_curvature for every monotonicity, function curvature
+# and argument curvature, indexed by Monotonicity.index and Curvature.index.
+Monotonicity.COMPOSITION_TABLE = tuple(
+    tuple(tuple(monotonicity.composition_rule(func_curvature, arg_curvature)
+                for arg_curvature in Curvature.CURVATURES)
+          for func_curvature in Curvature.CURVATURES)
+    for monotonicity in sorted([Monotonicity.INCREASING, Monotonicity.DECREASING,
+                                Monotonicity.NONMONOTONIC],
+                               key=lambda monotonicity: monotonicity.index))
@@ -0,0 +1,219 @@
+"""
+Analyzes a stream of texts in worker processes, for offline runs such as
+regrading the question bank. Each worker builds the parsing engine, the
+atom registry and the preamble's SymbolTable once, then analyzes chunks
+of texts. Chunks are sized from the time the last ones took, so each
+takes about TARGET_SECONDS: small enough to keep every worker busy and
+large enough that sending them costs little.
+"""
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import itertools
+import os
+import time
+import dcp_parser.atomic.atom_loader as atom_loader
+from dcp_parser.parser import Parser, SymbolTable
+from dcp_parser.bridge import encode
+from dcp_parser.classify import Classifier
+
+# The seconds a chunk should take, and the bounds on its number of texts.
+TARGET_SECONDS = 0.05
+MIN_CHUNK = 4
+MAX_CHUNK = 4096
+# Chunks waiting for a free worker, per worker.
+QUEUED_CHUNKS = 2
+
+# Returns the JSON encoding of the last statement in text (see bridge.encode).
+def encode_text(worker, text):
+    return encode(text, worker.symbols)
+
+# Returns the (code, violations) of the last statement in text
+# (see Classifier.classify).
+def classify_text(worker, text):
+    return worker.classifier.classify(text)
+
+# Maps the name of each analysis to the function that applies it to a text.
+ANALYSES = {'json': encode_text, 'classes': classify_text}
+
+
+class Worker(object):
+    """
+    What a worker process builds once: the preamble's symbols, the atoms
+    (all atoms, or only those called atom_names) and the Classifier.
+    analysis is the name of the analysis in ANALYSES.
+    """
+    def __init__(self, preamble, atom_names, analysis, backend):
+        if analysis not in ANALYSES:
+            raise Exception("Unknown analysis '%s'." % analysis)
+        self.analyze = ANALYSES[analysis]
+        # Builds the process-wide parsing engine.
+        Parser(backend=backend).grammar
+        self.symbols = SymbolTable.from_preamble(preamble, backend)
+        self.atoms = atom_loader.ATOMS
+        if atom_names is not None:
+            self.atoms = self.atoms.restrict(atom_names)
+        self.classifier = Classifier(self.symbols, self.atoms)
+
+    # Returns the (result, error) of each of texts, where error is the
+    # message of a text that fails, and the seconds they took.
+    def run(self, texts):
+        start = time.time()
+        results = []
+        for text in texts:
+            try:
+                results.append((self.analyze(self, text), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        return (results, time.time() - start)
+
+# The Worker of this process.
+WORKER = None
+
+# Builds the Worker of a new process.
+def start_worker(*args):
+    global WORKER
+    WORKER = Worker(*args)
+
+# Runs a chunk in a worker process.
+def run_chunk(texts):
+    return WORKER.run(texts)
+
+
+class BatchStats(object):
+    """
+    Throughput of a batch: the texts analyzed, those that failed, the
+    chunks they were sent in and the seconds since the batch started.
+    worker_seconds adds up the time the workers spent on the chunks.
+    """
+    def __init__(self):
+        self.texts = 0
+        self.failures = 0
+        self.chunks = 0
+        self.worker_seconds = 0.0
+        self.start = time.time()
+        self.seconds = 0.0
+
+    # Records a chunk of results that took seconds in a worker.
+    def add(self, results, seconds):
+        self.texts += len(results)
+        self.failures += sum(1 for (result, error) in results if error is not None)
+        self.chunks += 1
+        self.worker_seconds += seconds
+        self.seconds = time.time() - self.start
+
+    # Texts analyzed per second.
+    @property
+    def rate(self):
+        return self.texts / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return "BatchStats(%d texts, %d failures, %d chunks, %.2f s, %.0f texts/s)" % (
+            self.texts, self.failures, self.chunks, self.seconds, self.rate)
+
+
+class BatchAnalyzer(object):
+    """
+    Analyzes texts against preamble (text or a list of lines) in workers
+    processes, by default one per CPU. With 0 workers the chunks are
+    analyzed in this process. analysis names the result of each text:
+    'json' for the JSON encoding of its last statement, as the pages
+    get it, or 'classes' for its (code, violations) (see classify).
+    atom_names restricts the atoms; backend selects the Parser backend.
+    stats is the BatchStats of the last run.
+    """
+    def __init__(self, preamble='', workers=None, analysis='json',
+                 atom_names=None, backend='ply'):
+        if isinstance(preamble, (list, tuple)):
+            preamble = '\n'.join(preamble)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.args = (preamble, atom_names, analysis, backend)
+        # Fails early on a bad preamble or analysis.
+        self.worker = Worker(*self.args)
+        self.stats = BatchStats()
+
+    # Yields the (result, error) of each of texts (any iterable), in input
+    # order, or as (index, (result, error)) as chunks complete if not ordered.
+    # error is the message of a text that fails, and result is then None.
+    def run(self, texts, ordered=True):
+        self.stats = BatchStats()
+        self.chunk_size = MIN_CHUNK
+        texts = iter(texts)
+        if self.workers == 0:
+            for (start, results) in self.in_process(texts):
+                for (i, result) in enumerate(results):
+                    yield result if ordered else (start + i, result)
+            return
+        with ProcessPoolExecutor(self.workers, initializer=start_worker,
+                                 initargs=self.args) as executor:
+            if ordered:
+                pending = {}
+                next_index = 0
+                for (start, results) in self.in_pool(executor, texts):
+                    pending[start] = results
+                    while next_index in pending:
+                        results = pending.pop(next_index)
+                        for result in results:
+                            yield result
+                        next_index += len(results)
+            else:
+                for (start, results) in self.in_pool(executor, texts):
+                    for (i, result) in enumerate(results):
+                        yield (start + i, result)
+
+    # Returns the list of (result, error) of texts, in input order.
+    def analyze(self, texts):
+        return list(self.run(texts))
+
+    # Returns the next chunk of texts, or an empty list at the end.
+    def next_chunk(self, texts):
+        return list(itertools.islice(texts, self.chunk_size))
+
+    # Sizes the next chunks from a chunk of count texts that took seconds,
+    # changing the size by at most a factor of 2 at a time.
+    def resize(self, count, seconds):
+        size = self.chunk_size * 2
+        if seconds > 0:
+            size = min(size, int(TARGET_SECONDS * count / seconds))
+        self.chunk_size = max(MIN_CHUNK, self.chunk_size // 2, min(MAX_CHUNK, size))
+
+    # Yields (index of the first text, results) of each chunk, in order.
+    def in_process(self, texts):
+        start = 0
+        chunk = self.next_chunk(texts)
+        while chunk:
+            (results, seconds) = self.worker.run(chunk)
+            self.stats.add(results, seconds)
+            self.resize(len(chunk), seconds)
+            yield (start, results)
+            start += len(chunk)
+            chunk = self.next_chunk(texts)
+
+    # Yields (index of the first text, results) of each chunk as it
+    # completes, keeping QUEUED_CHUNKS chunks per worker submitted.
+    def in_pool(self, executor, texts):
+        futures = {}
+        start = 0
+        done = False
+        while True:
+            while not done and len(futures) < self.workers * QUEUED_CHUNKS:
+                chunk = self.next_chunk(texts)
+                if not chunk:
+                    done = True
+                    break
+                futures[executor.submit(run_chunk, chunk)] = (start, len(chunk))
+                start += len(chunk)
+            if not futures:
+                return
+            finished = wait(futures, return_when=FIRST_COMPLETED)[0]
+            for future in finished:
+                (first, count) = futures.pop(future)
+                (results, seconds) = future.result()
+                self.stats.add(results, seconds)
+                self.resize(count, seconds)
+                yield (first, results)
+
+# Returns the list of (result, error) of texts, analyzed against preamble
+# in workers processes (see BatchAnalyzer).
+def analyze(texts, preamble='', workers=None, analysis='json',
+            atom_names=None, backend='ply'):
+    return BatchAnalyzer(preamble, workers, analysis, atom_names,
+                         backend).analyze(texts)
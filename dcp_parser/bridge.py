@@ -0,0 +1,55 @@
+"""
+Entry points for pages that run the parser in Pyodide and draw the
+parse tree in JavaScript. Each returns the encoded tree exactly once:
+parse_json as a JSON string for JSON.parse, parse_dict as plain dicts
+and lists for PyProxy.toJs(dict_converter=Object.fromEntries).
+Errors are returned in the same form as {"error": message}.
+"""
+import json
+from dcp_parser.parser import Parser
+from dcp_parser.json.statement_encoder import StatementEncoder
+
+# The key of the message of a parse that failed.
+ERROR_KEY = 'error'
+# The error of a text without statements.
+NO_STATEMENT = 'No valid expression parsed'
+
+# Returns the JSON encoding of {"error": message}.
+def error_json(message):
+    return json.dumps({ERROR_KEY: str(message)})
+
+# Returns the JSON encoding of the last statement in text, parsed against
+# symbols (a SymbolTable or None) through cache (a ParseCache or None).
+# Raises the parser's error, or an Exception if text has no statements.
+def encode(text, symbols=None, cache=None):
+    if cache is not None:
+        encoded = cache.encode(text, symbols)
+    else:
+        parser = Parser(symbols=symbols)
+        parser.parse(text)
+        encoded = None
+        if parser.statements:
+            encoded = StatementEncoder().encode(parser.statements[-1])
+    if encoded is None:
+        raise Exception(NO_STATEMENT)
+    return encoded
+
+# Returns the JSON encoding of the last statement in text (see encode),
+# or of its error.
+def parse_json(text, symbols=None, cache=None):
+    try:
+        return encode(text, symbols, cache)
+    except Exception as e:
+        return error_json(e)
+
+# Returns the last statement in text, parsed against symbols, as the
+# dicts and lists StatementEncoder would encode, or its error as a dict.
+def parse_dict(text, symbols=None):
+    try:
+        parser = Parser(symbols=symbols)
+        parser.parse(text)
+        if not parser.statements:
+            raise Exception(NO_STATEMENT)
+        return StatementEncoder().default(parser.statements[-1])
+    except Exception as e:
+        return {ERROR_KEY: str(e)}
@@ -0,0 +1,44 @@
+"""
+Regenerates the LALR tables shipped with dcp_parser (parsetab.py).
+Run after changing the grammar in dcp_parser/parser.py:
+
+    python -m dcp_parser.build_tables
+
+parsetab.py records Grammar.signature(), which Grammar.load_tables
+checks on startup.
+"""
+from dcp_parser.parser import Grammar
+import os
+import warnings
+import ply.yacc
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Writes parsetab.py for the current grammar to outputdir.
+def write_tables(outputdir=PACKAGE_DIR):
+    with warnings.catch_warnings():
+        # The tables being replaced are expected to be stale.
+        warnings.simplefilter("ignore")
+        grammar = Grammar()
+    write_parsetab(grammar, outputdir)
+
+# Generates the LALR tables as ply.yacc.yacc does, but records the
+# grammar signature hash in place of PLY's raw signature string.
+def write_parsetab(grammar, outputdir):
+    pdict = dict((name, getattr(grammar, name)) for name in dir(grammar))
+    pdict['__file__'] = ply.yacc.__file__
+    pinfo = ply.yacc.ParserReflect(pdict)
+    pinfo.get_all()
+    if pinfo.error or pinfo.validate_all():
+        raise Exception("Unable to build parser tables.")
+    lalr = ply.yacc.Grammar(pinfo.tokens)
+    for term, assoc, level in pinfo.preclist:
+        lalr.set_precedence(term, assoc, level)
+    for funcname, (file, line, prodname, syms) in pinfo.grammar:
+        lalr.add_production(prodname, syms, funcname, file, line)
+    lalr.set_start(pinfo.start)
+    tables = ply.yacc.LRGeneratedTable(lalr, 'LALR')
+    tables.write_table("parsetab", outputdir, grammar.signature())
+
+if __name__ == '__main__':
+    write_tables()
@@ -0,0 +1,103 @@
+"""
+A bounded cache of encoded parses, for pages that parse the same
+expressions against the same preamble again and again.
+"""
+from dcp_parser.parser import Parser, SymbolTable
+from dcp_parser.json.statement_encoder import StatementEncoder
+from dcp_parser.lexer import tokenize
+from collections import OrderedDict
+
+# Returns the tokens of each line of text separated by single blanks,
+# which parses the same as text. Comments and blank lines are dropped,
+# but a line with only a comment, which does not parse, is kept as '#'.
+def normalize(text):
+    lines = text.split('\n')
+    tokens = [[] for line in lines]
+    for (kind, value, line, column, end) in tokenize(text):
+        tokens[line - 1].append(lines[line - 1][column:end])
+    normalized = []
+    for (line, line_tokens) in zip(lines, tokens):
+        if line_tokens:
+            normalized.append(' '.join(line_tokens))
+        elif line.strip():
+            normalized.append('#')
+    return '\n'.join(normalized)
+
+
+class ParseCache(object):
+    """
+    A least recently used cache of the JSON encoding (see StatementEncoder)
+    of the last statement of a text, parsed against a SymbolTable.
+    Entries are keyed on the digest of the table and the normalized text.
+    The cache holds at most max_entries encodings and max_bytes bytes of
+    encodings and keys, counted in UTF-8; the least recently used are
+    evicted first.
+    hits, misses and evictions count lookups and evictions since the
+    cache was created or cleared.
+    backend and atoms are passed to the Parsers of cache misses.
+    """
+    def __init__(self, max_entries=256, max_bytes=1 << 20, backend='ply', atoms=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.atoms = atoms
+        self.clear()
+
+    # Drops all entries and resets the counters.
+    def clear(self):
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Returns the encoding of the last statement in text, parsed against
+    # symbols (a SymbolTable or None), or None if text has no statements.
+    # Raises the parser's error if text does not parse; errors are not
+    # cached. A miss parses text itself, so errors quote it as given.
+    def encode(self, text, symbols=None):
+        if symbols is None:
+            symbols = EMPTY_SYMBOLS
+        try:
+            key = (symbols.digest, normalize(text))
+        except Exception:
+            # An illegal character, which the parser will report.
+            key = None
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+        self.misses += 1
+        parser = Parser(backend=self.backend, symbols=symbols, atoms=self.atoms)
+        parser.parse(text)
+        encoded = None
+        if parser.statements:
+            encoded = StatementEncoder().encode(parser.statements[-1])
+        if key is not None:
+            self.add(key, encoded)
+        return encoded
+
+    # Adds encoded under key, evicting the least recently used entries
+    # to make room. Entries larger than the cache are not added.
+    def add(self, key, encoded):
+        size = sum(len(part.encode('utf-8')) for part in key + (encoded or '',))
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+        while len(self.entries) >= self.max_entries or \
+              self.bytes + size > self.max_bytes:
+            (evicted, (value, evicted_size)) = self.entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+        self.entries[key] = (encoded, size)
+        self.bytes += size
+
+    def __repr__(self):
+        return "ParseCache(%d entries, %d bytes, %d hits, %d misses, %d evictions)" % (
+            len(self.entries), self.bytes, self.hits, self.misses, self.evictions)
+
+# The table of a cache lookup without symbols.
+EMPTY_SYMBOLS = SymbolTable()
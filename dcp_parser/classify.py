@@ -0,0 +1,384 @@
+"""
+Classifies many texts by the curvature and sign of their last statement
+without building Expressions for them. A curvature and sign pair is a
+small integer code (see code). Each text is tokenized and reduced
+straight to codes and DCP violation counts: the result of an operator,
+atom or constraint for the codes of its arguments is found once, by
+applying the operator itself to expressions with those codes, and looked
+up afterwards. Texts the reduction does not handle, such as syntax and
+name errors, are parsed by a Parser instead, so the classes and error
+messages are the ones the Parser gives.
+"""
+from array import array
+from collections import ChainMap, OrderedDict
+import operator
+import threading
+import dcp_parser.atomic.atom_loader as atom_loader
+from dcp_parser.bridge import NO_STATEMENT
+from dcp_parser.expression.expression import Expression, Constant
+from dcp_parser.expression.constraints import Constraint
+from dcp_parser.expression.curvature import Curvature
+from dcp_parser.expression.sign import Sign
+from dcp_parser.lexer import tokenize
+from dcp_parser.parser import Parser
+from dcp_parser.pratt import END, BINARY_POWER, UNARY_POWER, BINARY_OPS, COMPARISON_OPS
+
+SIGNS = len(Sign.SIGNS)
+# The number of codes.
+CODES = len(Curvature.CURVATURES) * SIGNS
+# The code of a statement without curvature and sign, or of a node that
+# cannot be analyzed.
+UNDEFINED = -1
+
+# Returns the code of curvature and sign.
+def code(curvature, sign):
+    return curvature.index * SIGNS + sign.index
+
+# Returns the curvature and sign of a code.
+def decode(code):
+    return (Curvature.CURVATURES[code // SIGNS], Sign.SIGNS[code % SIGNS])
+
+# Returns the code of a numeric constant.
+def constant_code(value):
+    if value > 0:
+        return code(Curvature.CONSTANT, Sign.POSITIVE)
+    elif value == 0:
+        return code(Curvature.CONSTANT, Sign.ZERO)
+    return code(Curvature.CONSTANT, Sign.NEGATIVE)
+
+# An expression with each code, to apply rules to.
+PROTOTYPES = [Expression(curvature, sign, 'arg') for curvature in Curvature.CURVATURES
+              for sign in Sign.SIGNS]
+
+# Atoms read a numeric parameter from a Constant or a negated Constant,
+# and fail on other constants, so an atom argument is described by its
+# code, its string (e.g. 'Inf'), or one of these (kind, value) pairs.
+CONSTANT = 'constant'
+GROUPED_CONSTANT = '(constant)'
+NEGATED_CONSTANT = '-constant'
+NEGATED = '-'
+
+# Returns an expression that an atom treats as the argument description arg.
+def stand_in(arg):
+    if isinstance(arg, int):
+        return PROTOTYPES[arg]
+    elif isinstance(arg, str):
+        return arg
+    (kind, value) = arg
+    if kind == CONSTANT:
+        return Constant(value)
+    elif kind == GROUPED_CONSTANT:
+        return Constant(value).parenthesized()
+    elif kind == NEGATED_CONSTANT:
+        return -Constant(value)
+    return -PROTOTYPES[value]
+
+# The number of results kept; the least recently used are dropped first,
+# as atom arguments that are constants are keyed by value.
+MAX_RESULTS = 1 << 16
+# Maps (function, argument descriptions) to the (code, violations) of the
+# result, or to None if the function raises an error for them, from the
+# least to the most recently used.
+RESULTS = OrderedDict()
+# Guards RESULTS, which the Classifiers of all threads share.
+RESULTS_LOCK = threading.Lock()
+
+# Returns the (code, violations) of function applied to the stand-ins of
+# args, where violations counts the DCP violations of the result node
+# itself. Raises an Exception if function does.
+def result(function, args):
+    key = (function,) + args
+    with RESULTS_LOCK:
+        found = RESULTS.get(key, False)
+        if found is not False:
+            RESULTS.move_to_end(key)
+    if found is False:
+        try:
+            statement = function(*map(stand_in, args))
+            if isinstance(statement, Constraint):
+                found = (UNDEFINED, len(statement.errors))
+            else:
+                found = (code(statement.curvature, statement.sign), len(statement.errors))
+        except Exception:
+            found = None
+        with RESULTS_LOCK:
+            RESULTS[key] = found
+            while len(RESULTS) > MAX_RESULTS:
+                RESULTS.popitem(last=False)
+    if found is None:
+        raise Exception("Cannot classify %s with these arguments." % function)
+    return found
+
+
+class Classifier(object):
+    """
+    Classifies texts against symbols (a SymbolTable or None) with atoms
+    (an AtomRegistry or None for all atoms), as a Parser with the same
+    symbols and atoms would parse them. codes maps each symbol to its code.
+    """
+    def __init__(self, symbols=None, atoms=None):
+        self.symbols = symbols
+        self.atoms = atom_loader.ATOMS if atoms is None else atoms
+        self.codes = {}
+        for (name, symbol) in (symbols or {}).items():
+            self.codes[name] = code(symbol.curvature, symbol.sign)
+        self.calls = {}
+
+    # Returns the AtomCall of the atom called name.
+    def atom_call(self, name):
+        call = self.calls.get(name)
+        if call is None:
+            call = self.calls[name] = AtomCall(name, self.atoms.functions[name])
+        return call
+
+    # Returns the (code, violations) of the last statement in text, with
+    # UNDEFINED for a constraint, where violations counts the DCP
+    # violations in its parse tree, repeated subexpressions each time.
+    # Raises the Parser's error if text does not parse.
+    def classify(self, text):
+        try:
+            return ClassifyParse(self, text).parse()
+        except Exception:
+            return self.parse(text)
+
+    # Classifies the last statement in text, parsed by a Parser.
+    def parse(self, text):
+        parser = Parser(symbols=self.symbols, atoms=self.atoms)
+        parser.parse(text)
+        if not parser.statements:
+            raise Exception(NO_STATEMENT)
+        statement = parser.statements[-1]
+        violations = 0
+        stack = [statement]
+        while stack:
+            node = stack.pop()
+            violations += len(node.errors)
+            stack.extend(node.subexpressions)
+        if isinstance(statement, Constraint):
+            return (UNDEFINED, violations)
+        return (code(statement.curvature, statement.sign), violations)
+
+    # Classifies each of texts. Returns a Classification.
+    def classify_many(self, texts):
+        classes = Classification()
+        for text in texts:
+            try:
+                (text_code, violations) = self.classify(text)
+                classes.add(text_code, violations)
+            except Exception as e:
+                classes.fail(str(e))
+        return classes
+
+
+class ClassifyParse(object):
+    """
+    The reduction of one text to codes, for the statements the grammar in
+    parser.py accepts without errors. Every other text raises an Exception.
+    Each expression is reduced to (code, violations, arg), where arg
+    describes it as an atom argument (see stand_in).
+    """
+    def __init__(self, classifier, text):
+        self.classifier = classifier
+        self.text = text
+        self.codes = classifier.codes
+
+    # Returns the (code, violations) of the last statement.
+    def parse(self):
+        last = None
+        for line in self.text.split('\n'):
+            if len(line.strip()) > 0:
+                self.tokens = list(tokenize(line))
+                self.tokens.append(END)
+                self.position = 0
+                last = self.statement() or last
+        if last is None:
+            raise Exception(NO_STATEMENT)
+        return last
+
+    # Returns the kind of the next token.
+    def peek(self):
+        return self.tokens[self.position][0]
+
+    # Consumes and returns the next token.
+    def next(self):
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    # Raises an Exception if the next token is not of kind.
+    def expect(self, kind):
+        if self.next()[0] != kind:
+            raise Exception("Expected %s." % kind)
+
+    # Returns the (code, violations) of an expression or constraint,
+    # or None for a declaration.
+    def statement(self):
+        if self.peek() in ('VARIABLE', 'PARAMETER'):
+            return self.declaration()
+        (lh_code, violations, arg) = self.expression(0)
+        if self.peek() in COMPARISON_OPS:
+            op = COMPARISON_OPS[self.next()[0]]
+            (rh_code, rh_violations, arg) = self.expression(0)
+            (lh_code, own) = result(op, (lh_code, rh_code))
+            violations += rh_violations + own
+        self.expect(END[0])
+        return (lh_code, violations)
+
+    # Adds the codes of declared variables or parameters. The codes are
+    # copied on the first declaration, so other texts do not see them.
+    def declaration(self):
+        curvature = Curvature.AFFINE if self.next()[0] == 'VARIABLE' else Curvature.CONSTANT
+        sign = Sign.UNKNOWN
+        if self.peek() == 'SIGN':
+            sign = Sign(self.next()[1])
+        ids = []
+        while self.peek() == 'ID':
+            ids.append(self.next()[1])
+        if len(ids) == 0:
+            raise Exception("Expected ID.")
+        self.expect(END[0])
+        if self.codes is self.classifier.codes:
+            self.codes = ChainMap({}, self.codes)
+        for id in ids:
+            self.codes[id] = code(curvature, sign)
+
+    # Reduces operators that bind tighter than power.
+    def expression(self, power):
+        (lh_code, violations, arg) = self.prefix()
+        while BINARY_POWER.get(self.peek(), 0) > power:
+            kind = self.next()[0]
+            (rh_code, rh_violations, arg) = self.expression(BINARY_POWER[kind])
+            (lh_code, own) = result(BINARY_OPS[kind], (lh_code, rh_code))
+            violations += rh_violations + own
+            arg = lh_code
+        return (lh_code, violations, arg)
+
+    # Unary operators, numbers, names, calls and parenthesized expressions.
+    def prefix(self):
+        (kind, value) = self.next()[:2]
+        if kind == 'PLUS':
+            return self.expression(UNARY_POWER)
+        elif kind == 'MINUS':
+            (operand, violations, arg) = self.expression(UNARY_POWER)
+            (negated, own) = result(operator.neg, (operand,))
+            violations += own
+            if isinstance(arg, tuple) and arg[0] == CONSTANT:
+                return (negated, violations, (NEGATED_CONSTANT, arg[1]))
+            return (negated, violations, (NEGATED, operand))
+        elif kind in ('INT', 'FLOAT'):
+            return (constant_code(value), 0, (CONSTANT, value))
+        elif kind == 'ID':
+            if self.peek() == 'LPAREN':
+                return self.call(value)
+            symbol = self.codes[value]
+            return (symbol, 0, symbol)
+        elif kind == 'LPAREN':
+            (group, violations, arg) = self.expression(0)
+            self.expect('RPAREN')
+            if isinstance(arg, tuple):
+                if arg[0] in (CONSTANT, GROUPED_CONSTANT):
+                    return (group, violations, (GROUPED_CONSTANT, arg[1]))
+                arg = group
+            return (group, violations, arg)
+        raise Exception("Unexpected %s." % kind)
+
+    # Atomic function. The arguments of atoms without a parameter are
+    # described by their codes alone.
+    def call(self, atom_name):
+        self.next()
+        atom = self.classifier.atom_call(atom_name)
+        parameterized = atom.function.signature.parameter is not None
+        (args, violations) = ([], 0)
+        while True:
+            kind = self.peek()
+            if kind == 'STRING_ARG':
+                args.append(self.next()[1])
+            elif kind in ('COMMA', 'RPAREN'):
+                args.append('')
+            else:
+                (arg_code, arg_violations, arg) = self.expression(0)
+                args.append(arg if parameterized else arg_code)
+                violations += arg_violations
+            kind = self.next()[0]
+            if kind == 'RPAREN':
+                break
+            elif kind != 'COMMA':
+                raise Exception("Unexpected %s." % kind)
+        (atom_code, own) = result(atom, tuple(args))
+        return (atom_code, violations + own, atom_code)
+
+
+class AtomCall(object):
+    """
+    Calls the atomic function called name, after the checks the parser
+    makes. AtomCalls of the same function are equal, so they share results.
+    """
+    __slots__ = ('name', 'function')
+
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+
+    def __call__(self, *args):
+        atom_loader.check_atom_call(self.name, self.function, args)
+        return self.function(*args)
+
+    def __eq__(self, other):
+        return isinstance(other, AtomCall) and self.function is other.function
+
+    def __hash__(self):
+        return hash(self.function)
+
+    def __repr__(self):
+        return "'%s'" % self.name
+
+
+class Classification(object):
+    """
+    The classes of a batch of texts, in parallel arrays of small integers:
+        curvature: the index in Curvature.CURVATURES of the curvature of
+            each text's last statement, or UNDEFINED for constraints and
+            texts that do not parse.
+        sign: the index in Sign.SIGNS of its sign, likewise.
+        dcp: 1 if the statement has no DCP violations, otherwise 0.
+        errors: the number of DCP violations in the statement's parse tree.
+    failures maps the index of each text that does not parse to its
+    error message.
+    """
+    def __init__(self):
+        self.curvature = array('b')
+        self.sign = array('b')
+        self.dcp = array('b')
+        self.errors = array('l')
+        self.failures = {}
+
+    def __len__(self):
+        return len(self.curvature)
+
+    # Returns the (curvature, sign, dcp, errors) of text i.
+    def __getitem__(self, i):
+        return (self.curvature[i], self.sign[i], self.dcp[i], self.errors[i])
+
+    # Adds a statement with text_code and violations.
+    def add(self, text_code, violations):
+        if text_code == UNDEFINED:
+            self.curvature.append(UNDEFINED)
+            self.sign.append(UNDEFINED)
+        else:
+            self.curvature.append(text_code // SIGNS)
+            self.sign.append(text_code % SIGNS)
+        self.dcp.append(violations == 0)
+        self.errors.append(violations)
+
+    # Adds a text that did not parse.
+    def fail(self, message):
+        self.failures[len(self)] = message
+        self.add(UNDEFINED, 0)
+        self.dcp[-1] = 0
+
+    def __repr__(self):
+        return "Classification(%d texts, %d failures)" % (len(self), len(self.failures))
+
+# Classifies each of texts against symbols (a SymbolTable or None)
+# with atoms (an AtomRegistry or None). Returns a Classification.
+def classify_many(texts, symbols=None, atoms=None):
+    return Classifier(symbols, atoms).classify_many(texts)
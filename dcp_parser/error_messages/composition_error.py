@@ -5,8 +5,11 @@ from dcp_parser.atomic.monotonicity import Monotonicity
 class CompositionError(DCPViolation):
     """ Represents a DCP violation through function composition."""
     BASE_MSG = "Illegal composition:"
+    __slots__ = ('func_curvature', 'monotonicity', 'arg_curvature', 'arg_sign', 'index')
+    INDEXED = True
 
     def __init__(self, func_curvature, monotonicity, arg_curvature, arg_sign, index):
+        self.message = None
         self.func_curvature = func_curvature
         self.monotonicity = monotonicity
         self.arg_curvature = arg_curvature
@@ -14,7 +17,7 @@ class CompositionError(DCPViolation):
         self.index = index
 
     # Core error message
-    def error_message(self):
+    def render(self):
         return " ".join([CompositionError.BASE_MSG, 
                               CompositionError.type_to_name(self.func_curvature),
                               CompositionError.type_to_name(self.monotonicity),
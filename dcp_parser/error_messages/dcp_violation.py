@@ -5,8 +5,17 @@ from dcp_parser.atomic.monotonicity import Monotonicity
 from dcp_parser.error_messages import settings
 
 class DCPViolation(object):
-    """ Abstract base class for DCP Violations. """
+    """
+    Abstract base class for DCP Violations.
+    Violations are immutable records of the operator or function and the
+    curvatures and signs that caused them, not of the expressions, so
+    equal violations can be shared (see DCPViolationFactory). The message
+    is rendered on first use and kept.
+    """
     __metaclass__ = abc.ABCMeta
+    __slots__ = ('message',)
+    # Whether violations are indexed as an argument in a function.
+    INDEXED = False
 
     # Maps curvature, monotonicity, and sign to the error message name.
     TYPE_TO_NAME = {
@@ -32,11 +41,17 @@ class DCPViolation(object):
     # Returns whether the error is indexed as an argument in a function.
     # Distinguishes OperationErrors from CompositionErrors and ConstraintErrors
     def is_indexed(self):
-        return hasattr(self, 'index')
+        return self.INDEXED
 
-    # Core error message
-    @abc.abstractmethod
+    # Core error message, rendered once.
     def error_message(self):
+        if self.message is None:
+            self.message = self.render()
+        return self.message
+
+    # Renders the core error message.
+    @abc.abstractmethod
+    def render(self):
         return NotImplemented
 
     # Error message with preamble
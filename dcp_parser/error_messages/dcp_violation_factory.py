@@ -1,40 +1,66 @@
 from dcp_parser.expression.curvature import Curvature
 from dcp_parser.expression.sign import Sign
+from dcp_parser.expression.statement import EMPTY
 from dcp_parser.atomic.monotonicity import Monotonicity
 from dcp_parser.error_messages.operation_error import OperationError
 from dcp_parser.error_messages.composition_error import CompositionError
 from dcp_parser.error_messages.constraint_error import ConstraintError
 
 class DCPViolationFactory(object):
-    """ Factory class for OperationError and CompositionError. """
+    """
+    Factory class for OperationError and CompositionError.
+    Equal violations are the same instance, so their messages are
+    rendered once and models with many errors hold one of each.
+    """
+    # Maps the class and fields of each violation created to it.
+    VIOLATIONS = {}
+
+    # Returns the violation of class cls with the given fields.
+    @staticmethod
+    def violation(cls, *fields):
+        key = (cls,) + fields
+        violation = DCPViolationFactory.VIOLATIONS.get(key)
+        if violation is None:
+            violation = DCPViolationFactory.VIOLATIONS.setdefault(key, cls(*fields))
+        return violation
 
     # Returns an OperationError if the operation resulted in 
     # a non-convex expression.
     @staticmethod
     def operation_error(op_str, lh_exp, rh_exp, result_exp):
         if result_exp.curvature == Curvature.NONCONVEX:
-            return [OperationError(op_str, lh_exp, rh_exp)]
+            return [DCPViolationFactory.violation(OperationError, op_str,
+                                                  lh_exp.curvature, lh_exp.sign,
+                                                  rh_exp.curvature, rh_exp.sign)]
         else:
-            return []
+            return EMPTY
 
     # Returns a list with a CompositionError for each argument that 
     # violates DCP composition rules, i.e. produces a non-convex composition.
+    # dcp_curvatures optionally gives the curvature in each argument,
+    # when the caller (e.g. an Atom) has already looked it up.
     @staticmethod
-    def composition_error(func_curvature, func_monotonicities, arg_curvatures, arg_signs):
+    def composition_error(func_curvature, func_monotonicities, arg_curvatures, arg_signs,
+                          dcp_curvatures=None):
         errors = []
         for i in range(len(func_monotonicities)):
             monotonicity = func_monotonicities[i]
-            curvature = monotonicity.dcp_curvature(func_curvature, arg_curvatures[i])
+            if dcp_curvatures is None:
+                curvature = monotonicity.dcp_curvature(func_curvature, arg_curvatures[i])
+            else:
+                curvature = dcp_curvatures[i]
             if curvature == Curvature.NONCONVEX:
-                err = CompositionError(func_curvature, monotonicity, arg_curvatures[i], arg_signs[i], i)
+                err = DCPViolationFactory.violation(CompositionError, func_curvature, monotonicity,
+                                                    arg_curvatures[i], arg_signs[i], i)
                 errors.append(err)
 
         if len(errors) == 0:
-            return []
+            return EMPTY
         else:
             return errors
 
     # Returns a ConstraintError using the given curvatures and constraint string.
     @staticmethod
     def constraint_error(constraint_str, lh_curvature, rh_curvature):
-        return [ConstraintError(constraint_str, lh_curvature, rh_curvature)]
\ No newline at end of file
+        return [DCPViolationFactory.violation(ConstraintError, constraint_str,
+                                              lh_curvature, rh_curvature)]
\ No newline at end of file
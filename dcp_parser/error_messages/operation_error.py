@@ -6,41 +6,48 @@ from dcp_parser.expression.sign import Sign
 class OperationError(DCPViolation):
     """ Represents a DCP violation through arithmetic operations. """
     BASE_MSG = "Illegal operation: "
+    __slots__ = ('op_str', 'lh_curvature', 'lh_sign', 'rh_curvature', 'rh_sign')
 
-    def __init__(self, op_str, lh_exp, rh_exp):
+    def __init__(self, op_str, lh_curvature, lh_sign, rh_curvature, rh_sign):
+        self.message = None
         self.op_str = op_str
-        self.lh_exp = lh_exp
-        self.rh_exp = rh_exp
+        self.lh_curvature = lh_curvature
+        self.lh_sign = lh_sign
+        self.rh_curvature = rh_curvature
+        self.rh_sign = rh_sign
 
     # Generates the appropriate error message given the curvature of the
     # lefthand and righthand expressions.
     def generate_error_str(self):
-        lh_str = OperationError.type_to_name(self.lh_exp.curvature)
-        rh_str = OperationError.type_to_name(self.rh_exp.curvature)
+        lh_str = OperationError.type_to_name(self.lh_curvature)
+        rh_str = OperationError.type_to_name(self.rh_curvature)
 
         # Sign can cause an error when a constant with unknown sign is
         # multiplied by or divides a convex or concave expression.
         # Otherwise sign does not matter.
         if self.op_str == EXP_SET.MULT:
-            if OperationError.unknown_constant_error(self.lh_exp, self.rh_exp):
+            if OperationError.unknown_constant_error(self.lh_curvature, self.lh_sign,
+                                                     self.rh_curvature):
                 lh_str = lh_str + " with unknown sign"
-            elif OperationError.unknown_constant_error(self.rh_exp, self.lh_exp):
+            elif OperationError.unknown_constant_error(self.rh_curvature, self.rh_sign,
+                                                       self.lh_curvature):
                 rh_str = rh_str + " with unknown sign"
         if self.op_str == EXP_SET.DIV and \
-            OperationError.unknown_constant_error(self.rh_exp, self.lh_exp):
+            OperationError.unknown_constant_error(self.rh_curvature, self.rh_sign,
+                                                  self.lh_curvature):
             rh_str = rh_str + " with unknown sign"
 
         return (lh_str, rh_str)
 
     # Checks if lefthand is an unknown constant and right hand is convex or concave.
     @staticmethod
-    def unknown_constant_error(const_exp, rh_exp):
-        return const_exp.curvature == Curvature.CONSTANT and \
-               const_exp.sign == Sign.UNKNOWN and \
-               (rh_exp.curvature == Curvature.CONVEX or \
-                rh_exp.curvature == Curvature.CONCAVE)
+    def unknown_constant_error(const_curvature, const_sign, rh_curvature):
+        return const_curvature == Curvature.CONSTANT and \
+               const_sign == Sign.UNKNOWN and \
+               (rh_curvature == Curvature.CONVEX or \
+                rh_curvature == Curvature.CONCAVE)
 
     # Core error message
-    def error_message(self):
+    def render(self):
         (lh_str, rh_str) = self.generate_error_str()
-        return "%s%s %s %s" % (OperationError.BASE_MSG, lh_str, self.op_str, rh_str)
\ No newline at end of file
+        return "%s%s %s %s" % (OperationError.BASE_MSG, lh_str, self.op_str, rh_str)
@@ -1,13 +1,19 @@
 from dcp_parser.expression.sign import Sign
 
 class Curvature(object):
-    """ Curvature for a convex optimization expression. """
+    """
+    Curvature for a convex optimization expression.
+    There is one instance per curvature: Curvature(curvature_str) returns
+    it. Each curvature's index is its position in CURVATURES, and the
+    arithmetic is done by lookups in tables indexed by it (and by
+    Sign.index for sign_mult), built once below.
+    """
     CONSTANT_KEY = 'CONSTANT'
     AFFINE_KEY = 'AFFINE'
     CONVEX_KEY = 'CONVEX'
     CONCAVE_KEY = 'CONCAVE'
     NONCONVEX_KEY = 'NONCONVEX'
-    
+
     """
     VEXITY_MAP for resolving curvature addition using bitwise OR:
       CONSTANT (0) | ANYTHING = ANYTHING
@@ -17,8 +23,8 @@ class Curvature(object):
     """
     VEXITY_MAP = {
                   CONSTANT_KEY: 0,
-                  AFFINE_KEY: 1, 
-                  CONVEX_KEY: 3, 
+                  AFFINE_KEY: 1,
+                  CONVEX_KEY: 3,
                   CONCAVE_KEY: 5,
                   NONCONVEX_KEY: 7
                  }
@@ -27,40 +33,53 @@ class Curvature(object):
     NEGATION_MAP = {CONVEX_KEY: CONCAVE_KEY, CONCAVE_KEY: CONVEX_KEY}
     # For multiplying curvature by unknown sign.
     UNKNOWN_MAP = {CONVEX_KEY: NONCONVEX_KEY, CONCAVE_KEY: NONCONVEX_KEY}
-    
-    def __init__(self,curvature_str):
+
+    __slots__ = ('curvature_str', 'index')
+    # Maps curvature strings to the instances.
+    INSTANCES = {}
+
+    def __new__(cls, curvature_str):
         curvature_str = curvature_str.upper()
-        if curvature_str in Curvature.VEXITY_MAP.keys():
-            self.curvature_str = curvature_str
+        if curvature_str in Curvature.INSTANCES:
+            return Curvature.INSTANCES[curvature_str]
         else:
             raise Exception("No such curvature %s exists." % str(curvature_str))
-        
+
+    # Creates the instance for curvature_str. Only used to build INSTANCES.
+    @classmethod
+    def create(cls, curvature_str, index):
+        curvature = object.__new__(cls)
+        curvature.curvature_str = curvature_str
+        curvature.index = index
+        return curvature
+
+    # Copies and pickles refer to the same instance.
+    def __reduce__(self):
+        return (Curvature, (self.curvature_str,))
+
     def __repr__(self):
         return "Curvature('%s')" % self.curvature_str
-    
+
     def __str__(self):
         return self.curvature_str
-        
+
     def __add__(self, other):
-        curvature_val = Curvature.VEXITY_MAP[self.curvature_str] | Curvature.VEXITY_MAP[other.curvature_str]
-        for key,val in Curvature.VEXITY_MAP.items():
-            if val == curvature_val:
-                return Curvature(key)
+        return Curvature.ADD_TABLE[self.index][other.index]
 
-    # Returns whether the curvature is affine, 
+    # Returns whether the curvature is affine,
     # counting constant expressions as affine.
     def is_affine(self):
-        return self == Curvature.CONSTANT or self == Curvature.AFFINE
+        return self is Curvature.CONSTANT or self is Curvature.AFFINE
 
-    # Returns whether the curvature is convex, 
+    # Returns whether the curvature is convex,
     # counting affine and constant expressions as convex.
     def is_convex(self):
-        return self.is_affine() or self == Curvature.CONVEX
+        return self.is_affine() or self is Curvature.CONVEX
 
-    # Returns whether the curvature is concave, 
+    # Returns whether the curvature is concave,
     # counting affine and constant expressions as concave.
     def is_concave(self):
-        return self.is_affine() or self == Curvature.CONCAVE
+        return self.is_affine() or self is Curvature.CONCAVE
 
     # Sums list of curvatures
     @staticmethod
@@ -69,51 +88,100 @@ class Curvature(object):
         for curvature in curvatures:
             sum_curvature = sum_curvature + curvature
         return sum_curvature
-    
+
     def __sub__(self, other):
-        return self + -other
+        return Curvature.SUB_TABLE[self.index][other.index]
 
     # Captures effect on curvature of multiplication or division by a signed constant.
     # e.g. negative constant * convex == concave
     def sign_mult(self, sign):
-        if sign == Sign.UNKNOWN:
-            curvature_str = Curvature.UNKNOWN_MAP.get(self.curvature_str, self.curvature_str)
+        return Curvature.SIGN_MULT_TABLE[self.index][sign.index]
+
+    def __mul__(self, other):
+        return Curvature.MUL_TABLE[self.index][other.index]
+
+    def __div__(self, other):
+        return Curvature.DIV_TABLE[self.index][other.index]
+
+    # Python 3 compatibility
+    __truediv__ = __div__
+
+    def __neg__(self):
+        return Curvature.NEG_TABLE[self.index]
+
+    # Curvatures are singletons, so equality is identity.
+    def __eq__(self,other):
+        return self is other
+
+    def __ne__(self,other):
+        return self is not other
+
+    __hash__ = object.__hash__
+
+    # The rules the tables are built from.
+
+    @staticmethod
+    def add_rule(lh, rh):
+        curvature_val = Curvature.VEXITY_MAP[lh.curvature_str] | \
+                        Curvature.VEXITY_MAP[rh.curvature_str]
+        for key,val in Curvature.VEXITY_MAP.items():
+            if val == curvature_val:
+                return Curvature(key)
+
+    @staticmethod
+    def sign_mult_rule(curvature, sign):
+        if sign is Sign.UNKNOWN:
+            curvature_str = Curvature.UNKNOWN_MAP.get(curvature.curvature_str,
+                                                      curvature.curvature_str)
             return Curvature(curvature_str)
-        elif sign == Sign.ZERO:
+        elif sign is Sign.ZERO:
             return Curvature.CONSTANT
-        elif sign == Sign.NEGATIVE:
-            curvature_str = Curvature.NEGATION_MAP.get(self.curvature_str, self.curvature_str)
+        elif sign is Sign.NEGATIVE:
+            curvature_str = Curvature.NEGATION_MAP.get(curvature.curvature_str,
+                                                       curvature.curvature_str)
             return Curvature(curvature_str)
         else: # Positive sign
-            return self
-       
-    def __mul__(self, other):
-        if self == Curvature.CONSTANT or other == Curvature.CONSTANT:
-            return self + other
+            return curvature
+
+    @staticmethod
+    def mul_rule(lh, rh):
+        if lh is Curvature.CONSTANT or rh is Curvature.CONSTANT:
+            return lh + rh
         else:
             return Curvature.NONCONVEX
 
-    def __div__(self, other):
-        if other == Curvature.CONSTANT:
-            return self + other
+    @staticmethod
+    def div_rule(lh, rh):
+        if rh is Curvature.CONSTANT:
+            return lh + rh
         else:
             return Curvature.NONCONVEX
-    
-    # Python 3 compatibility
-    __truediv__ = __div__
-        
-    def __neg__(self):
-        return self.sign_mult(Sign.NEGATIVE)
-        
-    def __eq__(self,other):
-        return self.curvature_str == other.curvature_str
-    
-    def __ne__(self,other):
-        return self.curvature_str != other.curvature_str
-
-# Class constants for all curvature types.
-Curvature.CONSTANT = Curvature(Curvature.CONSTANT_KEY)
-Curvature.AFFINE = Curvature(Curvature.AFFINE_KEY)
-Curvature.CONVEX = Curvature(Curvature.CONVEX_KEY)
-Curvature.CONCAVE = Curvature(Curvature.CONCAVE_KEY)
-Curvature.NONCONVEX = Curvature(Curvature.NONCONVEX_KEY)
\ No newline at end of file
+
+    # Returns a table of rule(lh, rh) for every lh in CURVATURES
+    # and every rh in values.
+    @staticmethod
+    def table(rule, values=None):
+        if values is None:
+            values = Curvature.CURVATURES
+        return tuple(tuple(rule(lh, rh) for rh in values)
+                     for lh in Curvature.CURVATURES)
+
+# Class constants for all curvature types, and the instances by index.
+Curvature.CONSTANT = Curvature.create(Curvature.CONSTANT_KEY, 0)
+Curvature.AFFINE = Curvature.create(Curvature.AFFINE_KEY, 1)
+Curvature.CONVEX = Curvature.create(Curvature.CONVEX_KEY, 2)
+Curvature.CONCAVE = Curvature.create(Curvature.CONCAVE_KEY, 3)
+Curvature.NONCONVEX = Curvature.create(Curvature.NONCONVEX_KEY, 4)
+Curvature.CURVATURES = (Curvature.CONSTANT, Curvature.AFFINE, Curvature.CONVEX,
+                        Curvature.CONCAVE, Curvature.NONCONVEX)
+Curvature.INSTANCES.update((curvature.curvature_str, curvature)
+                           for curvature in Curvature.CURVATURES)
+
+# Operation tables, indexed by Curvature.index.
+Curvature.ADD_TABLE = Curvature.table(Curvature.add_rule)
+Curvature.SIGN_MULT_TABLE = Curvature.table(Curvature.sign_mult_rule, Sign.SIGNS)
+Curvature.NEG_TABLE = tuple(Curvature.SIGN_MULT_TABLE[curvature.index][Sign.NEGATIVE.index]
+                            for curvature in Curvature.CURVATURES)
+Curvature.SUB_TABLE = Curvature.table(lambda lh, rh: lh + -rh)
+Curvature.MUL_TABLE = Curvature.table(Curvature.mul_rule)
+Curvature.DIV_TABLE = Curvature.table(Curvature.div_rule)
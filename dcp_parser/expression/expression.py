@@ -4,13 +4,14 @@
 from dcp_parser.expression import settings
 from dcp_parser.expression.sign import Sign
 from dcp_parser.expression.curvature import Curvature
+import copy
 import sys
 try:
     maxint = sys.maxint  # Python 2
 except AttributeError:
     maxint = sys.maxsize  # Python 3
 from numbers import Number
-from dcp_parser.expression.statement import Statement
+from dcp_parser.expression.statement import Statement, EMPTY
 from dcp_parser.expression.constraints import EqConstraint, GeqConstraint, LeqConstraint
 from dcp_parser.error_messages.dcp_violation_factory import DCPViolationFactory
 
@@ -26,11 +27,16 @@ class Expression(Statement):
     Errors records the DCP violations introduced by forming the expression.
     Monotonicity stores the monotonicity in each argument for atomic functions.
     short_name is the name without the subexpressions, i.e. "x + y" is "+".
+
+    name is either a string or a tuple of strings and Expressions, which is
+    rendered on first use by a single walk over the parts (see render).
+    parens counts the parentheses added around the name.
     """
+    __slots__ = ('curvature', 'sign', 'monotonicity', 'text', 'parts', 'parens')
 
     def __init__(self, curvature, sign, name, 
-                 subexpressions = [],
-                 errors = [],
+                 subexpressions = EMPTY,
+                 errors = EMPTY,
                  monotonicity = None,
                  short_name = None): 
         self.curvature = curvature
@@ -42,9 +48,53 @@ class Expression(Statement):
             short_name = self.name
         super(Expression, self).__init__(short_name, subexpressions, errors)
 
+    # The string representation, rendered on first use.
+    @property
+    def name(self):
+        if self.text is None:
+            self.text = self.render()
+            self.parts = None
+        if self.parens == 0:
+            return self.text
+        return "(" * self.parens + self.text + ")" * self.parens
+
+    @name.setter
+    def name(self, name):
+        if isinstance(name, tuple):
+            (self.text, self.parts) = (None, name)
+        else:
+            (self.text, self.parts) = (name, None)
+        self.parens = 0
+
+    # Renders the name without its parentheses. Parts that have not been
+    # rendered yet are expanded in place, so the whole name is written
+    # into one buffer without recursion.
+    def render(self):
+        buffer = []
+        stack = list(reversed(self.parts))
+        while stack:
+            part = stack.pop()
+            if isinstance(part, str):
+                buffer.append(part)
+            elif part.text is not None:
+                buffer.append(part.name)
+            else:
+                stack.append(")" * part.parens)
+                stack.extend(reversed(part.parts))
+                stack.append("(" * part.parens)
+        return "".join(buffer)
+
     # Adds parentheses around the string representation of the expression.
     def add_parens(self):
-        self.name = "(" + self.name + ")"
+        self.parens += 1
+
+    # Returns a copy with parentheses around the string representation.
+    # The parser uses this for groups, so Variables and Parameters shared
+    # through a symbol table are never renamed.
+    def parenthesized(self):
+        exp = copy.copy(self)
+        exp.add_parens()
+        return exp
 
     # Verifies that expression is a number or an expression. 
     # If it is a number, it is converted to a constant.
@@ -62,7 +112,7 @@ class Expression(Statement):
     def __add__(self, other):
         exp = Expression(self.curvature + other.curvature,
                           self.sign + other.sign,
-                          "%s %s %s" % (self.name, settings.PLUS, other.name),
+                          (self, ' %s ' % settings.PLUS, other),
                           [self,other],
                           short_name = settings.PLUS)
         exp.errors = DCPViolationFactory.operation_error(settings.PLUS, self, other, exp)
@@ -75,7 +125,7 @@ class Expression(Statement):
     def __sub__(self, other):
         exp = Expression(self.curvature - other.curvature,
                           self.sign - other.sign,
-                          "%s %s %s" % (self.name, settings.MINUS, other.name),
+                          (self, ' %s ' % settings.MINUS, other),
                           [self,other],
                           short_name = settings.MINUS)
         exp.errors = DCPViolationFactory.operation_error(settings.MINUS, self, other, exp)
@@ -103,7 +153,7 @@ class Expression(Statement):
         curvature = self.curvature * other.curvature
         exp = Expression(curvature, 
                          sign, 
-                         "%s %s %s" % (self.name, settings.MULT, other.name),
+                         (self, ' %s ' % settings.MULT, other),
                          [self,other],
                          short_name = settings.MULT)
         exp.sign_by_curvature()
@@ -119,7 +169,7 @@ class Expression(Statement):
         curvature = self.curvature / other.curvature
         exp = Expression(curvature, 
                          sign, 
-                         "%s %s %s" % (self.name, settings.DIV, other.name),
+                         (self, ' %s ' % settings.DIV, other),
                          [self,other],
                          short_name = settings.DIV)
         exp.sign_by_curvature()
@@ -140,7 +190,7 @@ class Expression(Statement):
         self = Expression.type_check(self)
         return Expression(-self.curvature,
                           -self.sign,
-                          '-' + str(self), 
+                          ('-', self),
                           [self],
                           short_name = settings.MINUS)
     
@@ -158,8 +208,8 @@ class Expression(Statement):
         return "Expression(%s, %s, %s, %s, %s, %s, %s)" % (self.curvature,
                                                            self.sign, 
                                                            self.name, 
-                                                           self.subexpressions,
-                                                           self.errors,
+                                                           list(self.subexpressions),
+                                                           list(self.errors),
                                                            self.monotonicity,
                                                            self.short_name)
     
@@ -170,6 +220,8 @@ class Expression(Statement):
 
 class Variable(Expression):
     """ A convex optimization variable. """
+    __slots__ = ()
+
     def __init__(self, name, sign=Sign.UNKNOWN):
         super(Variable, self).__init__(Curvature.AFFINE,
                                        sign,
@@ -184,6 +236,8 @@ class Variable(Expression):
         
 class Parameter(Expression):
     """ A convex optimization parameter. """
+    __slots__ = ()
+
     def __init__(self, name, sign):
         super(Parameter, self).__init__(Curvature.CONSTANT,
                                         sign,
@@ -196,6 +250,8 @@ class Parameter(Expression):
     
         
 class Constant(Expression):
+    __slots__ = ()
+
     def __init__(self, value):
         if value > 0:
             sign_str = Sign.POSITIVE_KEY
@@ -0,0 +1,56 @@
+from dcp_parser.expression.expression import Expression, Constant
+
+class NodeTable(object):
+    """
+    Hash-consing table for the Expressions built by a Parser.
+    A node is keyed on its operation (an operator function or an atom
+    name) and the identities of its children, so building a node that
+    already exists returns the existing one. Sign, curvature,
+    monotonicity and errors are then computed once per unique subtree.
+    Expressions are never modified after they are built, which makes
+    sharing them safe. The table holds on to the children of every
+    node, so their ids cannot be reused while it is alive.
+    keys maps the id of every node to its key, so the parser can find
+    how a node was built and rebuild it with a different child.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.keys = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # Returns the node built by build(*args), building it at most once.
+    def intern(self, key, build, args):
+        entry = self.nodes.get(key)
+        if entry is None:
+            entry = (build(*args), args)
+            self.nodes[key] = entry
+            self.keys[id(entry[0])] = key
+        return entry[0]
+
+    # Returns the key and arguments node was built from,
+    # or None if it was not built by this table.
+    def origin(self, node):
+        key = self.keys.get(id(node))
+        if key is None:
+            return None
+        return (key, self.nodes[key][1])
+
+    # Applies op (e.g. operator.add or Expression.parenthesized) to args.
+    def operation(self, op, *args):
+        key = (op,) + tuple(map(id, args))
+        return self.intern(key, op, args)
+
+    # Applies the atomic function atom, called name, to args.
+    # String arguments such as 'Inf' are keyed by value.
+    def atom(self, name, atom, args):
+        key = (name,) + tuple(arg if isinstance(arg, str) else id(arg)
+                              for arg in args)
+        return self.intern(key, atom, tuple(args))
+
+    # A numeric constant. 2 and 2.0 have different names, so the type
+    # is part of the key.
+    def constant(self, value):
+        key = (Constant, type(value), value)
+        return self.intern(key, Constant, (value,))
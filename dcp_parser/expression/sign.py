@@ -1,22 +1,43 @@
 class Sign(object):
-    """ Sign of convex optimization expressions. """
+    """
+    Sign of convex optimization expressions.
+    There is one instance per sign: Sign(sign_str) returns it. Each sign's
+    index is its SIGN_MAP code, and the arithmetic and comparisons are
+    lookups in tables indexed by it, built once below.
+    """
     POSITIVE_KEY = 'POSITIVE'
     NEGATIVE_KEY = 'NEGATIVE'
     UNKNOWN_KEY = 'UNKNOWN'
     ZERO_KEY = 'ZERO'
-    
+
     # SIGN_MAP for resolving sign addition using bitwise OR
     SIGN_MAP = {ZERO_KEY: 0, POSITIVE_KEY: 1, NEGATIVE_KEY: 2, UNKNOWN_KEY: 3}
     # For comparison of signs
     ORDERING = [NEGATIVE_KEY, ZERO_KEY, UNKNOWN_KEY, POSITIVE_KEY]
-    
-    def __init__(self,sign_str):
+
+    __slots__ = ('sign_str', 'index')
+    # Maps sign strings to the instances.
+    INSTANCES = {}
+
+    def __new__(cls, sign_str):
         sign_str = sign_str.upper()
-        if sign_str in Sign.SIGN_MAP.keys():
-            self.sign_str = sign_str
+        if sign_str in Sign.INSTANCES:
+            return Sign.INSTANCES[sign_str]
         else:
             raise Exception("No such sign %s exists." % str(sign_str))
 
+    # Creates the instance for sign_str. Only used to build INSTANCES.
+    @classmethod
+    def create(cls, sign_str):
+        sign = object.__new__(cls)
+        sign.sign_str = sign_str
+        sign.index = Sign.SIGN_MAP[sign_str]
+        return sign
+
+    # Copies and pickles refer to the same instance.
+    def __reduce__(self):
+        return (Sign, (self.sign_str,))
+
     # Returns whether the sign string is a valid sign type.
     @staticmethod
     def is_sign(sign_str):
@@ -29,64 +50,95 @@ class Sign(object):
         for sign in signs:
             sum_sign = sum_sign + sign
         return sum_sign
-        
+
     def __add__(self, other):
-        sign_val = Sign.SIGN_MAP[self.sign_str] | Sign.SIGN_MAP[other.sign_str]
-        for key,val in Sign.SIGN_MAP.items():
-            if val == sign_val:
-                return Sign(key)
-    
+        return Sign.ADD_TABLE[self.index][other.index]
+
     def __sub__(self, other):
-        return self + -other
-       
+        return Sign.SUB_TABLE[self.index][other.index]
+
     def __mul__(self, other):
-        if self == Sign.ZERO or other == Sign.ZERO:
-            return Sign.ZERO
-        elif self == Sign.UNKNOWN or other == Sign.UNKNOWN:
-            return Sign.UNKNOWN
-        elif self != other:
-            return Sign.NEGATIVE
-        else:
-            return Sign.POSITIVE
+        return Sign.MUL_TABLE[self.index][other.index]
 
     def __div__(self, other):
-        if other == Sign.ZERO:
+        if other is Sign.ZERO:
             raise Exception("Divide by zero error.")
         else:
-            return self * other
-    
+            return Sign.MUL_TABLE[self.index][other.index]
+
     # Python 3 compatibility
     __truediv__ = __div__
-        
+
     def __neg__(self):
-        return self * Sign.NEGATIVE
-        
+        return Sign.NEG_TABLE[self.index]
+
+    # Signs are singletons, so equality is identity.
     def __eq__(self,other):
-        return self.sign_str == other.sign_str
-    
+        return self is other
+
     def __ne__(self,other):
-        return self.sign_str != other.sign_str
+        return self is not other
 
-    def __lt__(self, other): 
-        return Sign.ORDERING.index(self.sign_str) < Sign.ORDERING.index(other.sign_str)
+    __hash__ = object.__hash__
 
-    def __gt__(self, other): 
-        return other < self
+    def __lt__(self, other):
+        return Sign.LT_TABLE[self.index][other.index]
+
+    def __gt__(self, other):
+        return Sign.LT_TABLE[other.index][self.index]
 
     def __le__(self, other):
-        return self < other or self == other
+        return self is other or Sign.LT_TABLE[self.index][other.index]
 
     def __ge__(self, other):
-        return other <= self
+        return self is other or Sign.LT_TABLE[other.index][self.index]
 
     def __repr__(self):
         return "Sign('%s')" % self.sign_str
-    
+
     def __str__(self):
         return self.sign_str
 
-# Class constants for all sign types.
-Sign.POSITIVE = Sign(Sign.POSITIVE_KEY)
-Sign.NEGATIVE = Sign(Sign.NEGATIVE_KEY)
-Sign.ZERO = Sign(Sign.ZERO_KEY)
-Sign.UNKNOWN = Sign(Sign.UNKNOWN_KEY)
\ No newline at end of file
+    # The rules the tables are built from.
+
+    @staticmethod
+    def add_rule(lh, rh):
+        return Sign.SIGNS[lh.index | rh.index]
+
+    @staticmethod
+    def mul_rule(lh, rh):
+        if lh is Sign.ZERO or rh is Sign.ZERO:
+            return Sign.ZERO
+        elif lh is Sign.UNKNOWN or rh is Sign.UNKNOWN:
+            return Sign.UNKNOWN
+        elif lh is not rh:
+            return Sign.NEGATIVE
+        else:
+            return Sign.POSITIVE
+
+    @staticmethod
+    def lt_rule(lh, rh):
+        return Sign.ORDERING.index(lh.sign_str) < Sign.ORDERING.index(rh.sign_str)
+
+    # Returns a table of rule(lh, rh) for every pair of signs.
+    @staticmethod
+    def table(rule):
+        return tuple(tuple(rule(lh, rh) for rh in Sign.SIGNS)
+                     for lh in Sign.SIGNS)
+
+# Class constants for all sign types, and the instances by index.
+Sign.POSITIVE = Sign.create(Sign.POSITIVE_KEY)
+Sign.NEGATIVE = Sign.create(Sign.NEGATIVE_KEY)
+Sign.ZERO = Sign.create(Sign.ZERO_KEY)
+Sign.UNKNOWN = Sign.create(Sign.UNKNOWN_KEY)
+Sign.SIGNS = tuple(sorted([Sign.POSITIVE, Sign.NEGATIVE, Sign.ZERO, Sign.UNKNOWN],
+                          key=lambda sign: sign.index))
+Sign.INSTANCES.update((sign.sign_str, sign) for sign in Sign.SIGNS)
+
+# Operation tables, indexed by Sign.index.
+Sign.ADD_TABLE = Sign.table(Sign.add_rule)
+Sign.MUL_TABLE = Sign.table(Sign.mul_rule)
+Sign.NEG_TABLE = tuple(Sign.MUL_TABLE[sign.index][Sign.NEGATIVE.index]
+                       for sign in Sign.SIGNS)
+Sign.SUB_TABLE = Sign.table(lambda lh, rh: lh + -rh)
+Sign.LT_TABLE = Sign.table(Sign.lt_rule)
@@ -0,0 +1,127 @@
+from array import array
+import bisect
+
+class Spans(object):
+    """
+    Source offsets of the nodes of a parsed statement. Nodes are shared
+    between statements and positions (see NodeTable), so the offsets are
+    kept here, one Spans per statement, rather than on the nodes.
+    starts and ends hold the column of each node's text in source, the
+    line the statement was parsed from, and the column just after it,
+    in preorder (the order of the encoded tree). A unary plus belongs
+    to the span of its operand, and parentheses to the span of the group.
+    Children follow their parent in the order of their text, so starts
+    is sorted and a subtree ends at the first node starting after it.
+    """
+    __slots__ = ('source', 'starts', 'ends')
+
+    def __init__(self, source, starts, ends):
+        self.source = source
+        self.starts = starts
+        self.ends = ends
+
+    # Flattens a span tree, a (start, end, children) tuple whose children
+    # are the span trees of the node's subexpressions.
+    @staticmethod
+    def from_tree(source, tree):
+        (starts, ends) = (array('l'), array('l'))
+        stack = [tree]
+        while stack:
+            (start, end, children) = stack.pop()
+            starts.append(start)
+            ends.append(end)
+            stack.extend(reversed(children))
+        return Spans(source, starts, ends)
+
+    def __len__(self):
+        return len(self.starts)
+
+    # The (start, end) offsets of the node at index.
+    def __getitem__(self, index):
+        return (self.starts[index], self.ends[index])
+
+    # Iterates over the (start, end) offsets of the nodes in preorder.
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+
+    # The index just after the subtree of the node at index.
+    def skip(self, index):
+        return bisect.bisect_left(self.starts, self.ends[index], index + 1)
+
+    # The indices of the nodes on path (a list of child indices),
+    # from the root down.
+    def indices(self, path):
+        indices = [0]
+        for child_index in path:
+            child = indices[-1] + 1
+            for i in range(child_index):
+                child = self.skip(child)
+            indices.append(child)
+        return indices
+
+    # The index of the node at path.
+    def index(self, path):
+        return self.indices(path)[-1]
+
+    # The path to the node whose text spans from start to end,
+    # or None if there is none.
+    def path_at(self, start, end):
+        (node, path) = (0, [])
+        while self[node] != (start, end):
+            (child, stop, index) = (node + 1, self.skip(node), 0)
+            while child < stop and not (self.starts[child] <= start and
+                                        end <= self.ends[child]):
+                (child, index) = (self.skip(child), index + 1)
+            if child == stop:
+                return None
+            (node, path) = (child, path + [index])
+        return path
+
+    # Returns the Spans of source with source[start:end] replaced by text
+    # and the nodes from first to stop replaced by those of inner, the
+    # Spans of text, or dropped if inner is None. The nodes containing
+    # the replaced text grow with it, or end where inner does if they
+    # ended with it, and the nodes after it move.
+    def splice(self, first, stop, start, end, text, inner=None):
+        delta = len(text) - (end - start)
+        (new_start, new_end) = (start, end + delta)
+        if inner is not None:
+            # Blanks around text are not part of its span.
+            (new_start, new_end) = (start + inner.starts[0], start + inner.ends[0])
+        starts = self.starts[:first]
+        ends = self.ends[:first]
+        # Only the ancestors of first contain the text.
+        node = 0
+        while node != first:
+            if starts[node] == start:
+                starts[node] = new_start
+            ends[node] = new_end if ends[node] == end else ends[node] + delta
+            child = node + 1
+            while self.skip(child) <= first:
+                child = self.skip(child)
+            node = child
+        if inner is not None:
+            starts.fromlist([s + start for s in inner.starts])
+            ends.fromlist([e + start for e in inner.ends])
+        if delta == 0:
+            starts.extend(self.starts[stop:])
+            ends.extend(self.ends[stop:])
+        else:
+            starts.fromlist([s + delta for s in self.starts[stop:]])
+            ends.fromlist([e + delta for e in self.ends[stop:]])
+        return Spans(self.source[:start] + text + self.source[end:], starts, ends)
+
+    def __repr__(self):
+        return "Spans(%r, %s)" % (self.source, list(self))
+
+# The span trees of the subexpressions of an atom, which are some of its
+# args in the same order, given the span trees of args.
+def atom_children(subexpressions, args, arg_spans):
+    children = []
+    i = 0
+    for sub in subexpressions:
+        while args[i] is not sub:
+            i += 1
+        children.append(arg_spans[i])
+        i += 1
+    return tuple(children)
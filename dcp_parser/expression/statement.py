@@ -1,11 +1,17 @@
 import abc
 
+# Shared subexpressions and errors of nodes that have none.
+EMPTY = ()
+
 class Statement(object):
     """ Abstract base class for Expression and Constraint """
     __metaclass__ = abc.ABCMeta
+    # Models can have millions of nodes, so attributes are slots.
+    # json_errors is only set on Statements decoded from JSON.
+    __slots__ = ('short_name', 'subexpressions', 'errors', 'json_errors')
     # Takes short_name (string representation without subexpressions), 
-    # subexpressions, and errors.
-    def __init__(self, short_name, subexpressions, errors = []):
+    # subexpressions, and errors. Empty ones are replaced by EMPTY.
+    def __init__(self, short_name, subexpressions, errors = EMPTY):
         self.short_name = short_name
-        self.subexpressions = subexpressions
-        self.errors = errors
\ No newline at end of file
+        self.subexpressions = subexpressions or EMPTY
+        self.errors = errors or EMPTY
@@ -0,0 +1,153 @@
+"""
+Incremental reparsing: replaces one subexpression of a parsed statement
+with new text, building only the new subtree and the nodes on the path
+from it to the root. Every other node is reused as is, and the spans
+of the statement are spliced rather than recomputed. Used through
+Parser.reparse.
+"""
+from dcp_parser.expression.expression import Expression
+from dcp_parser.expression.constraints import Constraint
+from dcp_parser.json.statement_encoder import StatementEncoder
+from dcp_parser.atomic.atom_loader import check_atom_call
+from collections import ChainMap
+import operator
+
+# Precedence of the operations that build nodes, as in the grammar.
+# Atoms, groups, constants and symbols bind tighter than all of them.
+PRECEDENCE = {
+              operator.add: 1,
+              operator.sub: 1,
+              operator.mul: 2,
+              operator.truediv: 2,
+              operator.neg: 3,
+             }
+PRIMARY = 4
+
+# Replaces the subexpression of statement at path, or at span, with text.
+# Returns the new statement and the changed part of its encoded tree
+# (see StatementEncoder.change_map). If the new subtree cannot simply
+# be swapped in, e.g. text would regroup with its neighbours or does not
+# parse on its own, the whole statement is reparsed with text spliced
+# into its source and the change is the whole tree. The spans of the
+# statement are updated from those of text, which must be a single
+# expression without comments or line breaks.
+def reparse(parser, statement, text, path=None, span=None):
+    if '#' in text or '\n' in text or '\r' in text:
+        raise Exception("'%s' is not a valid expression." % text)
+    occurrences = [i for i in range(len(parser.statements))
+                   if parser.statements[i] is statement]
+    if not occurrences:
+        raise Exception("'%s' was not parsed by this parser." % statement)
+    if path is None:
+        if span is None:
+            raise Exception("Either a path or a span must be given.")
+        spans = parser.spans[occurrences[0]]
+        path = spans.path_at(span[0], span[1])
+        if path is None:
+            raise Exception("No subexpression spans %d to %d in '%s'." %
+                            (span[0], span[1], spans.source))
+    path = list(path)
+    (new_statement, changed, inner) = (None, path, None)
+    if path:
+        (new_statement, changed, inner) = replace(parser, statement, path, text)
+    full = new_statement is None
+    # The statement may occur more than once, from different source.
+    for i in occurrences:
+        spans = parser.spans[i]
+        node = spans.index(path)
+        (start, end) = spans[node]
+        if full:
+            source = spans.source[:start] + text + spans.source[end:]
+            (parsed, parser.spans[i]) = parse_alone(parser, source)
+            if new_statement is None:
+                new_statement = parsed
+        else:
+            if len(changed) < len(path):
+                # The subtree the atom took as its parameter is dropped.
+                (node, inner) = (spans.index(path[:len(changed) + 1]), None)
+            parser.spans[i] = spans.splice(node, spans.skip(node), start, end,
+                                           text, inner)
+        parser.statements[i] = new_statement
+    if full:
+        changed = []
+    return (new_statement, StatementEncoder().change_map(new_statement, changed))
+
+# Parses text into a single statement without changing the statements
+# or symbols of parser. Returns the statement and its Spans.
+def parse_alone(parser, text):
+    context = parser.context(ChainMap({}, parser.symbol_table), parser.nodes)
+    parser.parse(text, context)
+    declared = len(context.symbol_table.maps[0]) > 0
+    (parsed, parsed_spans) = (context.statements, context.spans)
+    if declared or len(parsed) != 1:
+        raise Exception("'%s' is not a valid expression." % text)
+    return (parsed[0], parsed_spans[0])
+
+# Returns statement with the subexpression at path parsed from text,
+# rebuilding the nodes on the path, the path to the changed subtree and
+# the Spans of text. The changed path is a prefix of path if an atom took
+# the new subexpression as its parameter. Returns (None, path, None) if
+# the nodes cannot be rebuilt.
+def replace(parser, statement, path, text):
+    try:
+        (node, spans) = parse_alone(parser, text)
+    except Exception:
+        return (None, path, None)
+    if not isinstance(node, Expression):
+        return (None, path, None)
+    # The nodes on the path, from the root down to the parent.
+    ancestors = [statement]
+    for index in path[:-1]:
+        ancestors.append(ancestors[-1].subexpressions[index])
+    changed = len(path)
+    for depth in reversed(range(len(path))):
+        (child, index) = (node, path[depth])
+        node = rebuild(parser, ancestors[depth], index, child)
+        if node is None:
+            return (None, path, None)
+        children = node.subexpressions
+        if index >= len(children) or children[index] is not child:
+            changed = depth
+    return (node, path[:changed], spans)
+
+# Returns node with its child at index replaced by child, built the same
+# way as node, or None if node was not built by parser or child would
+# not be parsed as that child of node from their text.
+def rebuild(parser, node, index, child):
+    if isinstance(node, Constraint):
+        args = [node.lhs, node.rhs]
+        args[index] = child
+        return node.__class__(*args)
+    origin = parser.nodes.origin(node)
+    if origin is None:
+        return None
+    (key, args) = origin
+    op = key[0]
+    # Groups have the children of the expression inside them.
+    if op is Expression.parenthesized:
+        inner = rebuild(parser, args[0], index, child)
+        if inner is None:
+            return None
+        return parser.nodes.operation(op, inner)
+    args = list(args)
+    if args[index] is not node.subexpressions[index]:
+        return None
+    args[index] = child
+    if isinstance(op, str):
+        atom = parser.atom_dict[op]
+        check_atom_call(op, atom, args)
+        return parser.nodes.atom(op, atom, args)
+    if not fits(parser, op, index, child):
+        return None
+    return parser.nodes.operation(op, *args)
+
+# Returns whether child, written as argument index of op, would be
+# parsed as that argument. Operations are left associative, so the
+# right argument must bind tighter than op and the left one at least
+# as tightly.
+def fits(parser, op, index, child):
+    origin = parser.nodes.origin(child)
+    precedence = PRECEDENCE.get(origin[0][0], PRIMARY) if origin else PRIMARY
+    if op is operator.neg or index == 0:
+        return precedence >= PRECEDENCE[op]
+    return precedence > PRECEDENCE[op]
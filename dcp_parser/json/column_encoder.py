@@ -0,0 +1,199 @@
+import json
+from dcp_parser.json import settings as s
+from dcp_parser.json.stream_encoder import render_names
+from dcp_parser.expression.expression import Expression
+from dcp_parser.expression.constraints import Constraint
+
+# Characters that may be part of a name token.
+NAME_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.')
+
+# Returns the first offset of child in name at or after start, preferring
+# one where child is not part of a longer token, or -1.
+def find_child(name, child, start):
+    first = at = name.find(child, start)
+    while at >= 0:
+        end = at + len(child)
+        if (at == 0 or name[at - 1] not in NAME_CHARS or child[0] not in NAME_CHARS) and \
+           (end == len(name) or name[end] not in NAME_CHARS or child[-1] not in NAME_CHARS):
+            return at
+        at = name.find(child, at + 1)
+    return first
+
+# Returns the fragments of name around the names of its children, in
+# order, or [name] if the children's names are not all in name.
+def name_template(name, children):
+    fragments = []
+    start = 0
+    for child in children:
+        at = find_child(name, child, start)
+        if at < 0:
+            return [name]
+        fragments.append(name[start:at])
+        start = at + len(child)
+    fragments.append(name[start:])
+    return fragments
+
+class ColumnEncoder(object):
+    """
+    Encodes a statement as parallel columns with one entry per node in
+    preorder, instead of nested objects that repeat every key and the
+    text of every subtree. Strings are stored once, in a string table,
+    and referenced by index:
+        parent: the index of the node's parent, or -1 for the root.
+        class, short_name: strings. curvature, sign: strings, or -1
+            for constraints.
+        template: a template of the name, which is the template's strings
+            with the names of the children between them (or only the
+            template's string, if it does not have one more string than
+            the node has children).
+        monotonicity: a list of strings in the monotonicities table, or
+            -1 for nodes that are not atoms.
+        error_offsets: the node's errors are error_index and
+            error_message from its offset to the next node's offset.
+            error_index is -1 for unsorted errors.
+        span_starts, span_ends: the source offsets, if encoded with spans.
+    The names of classes, curvatures, signs and monotonicities are those
+    of the nested JSON (see settings.TYPE_TO_NAME).
+    spans is the optional Spans of the statement (see Parser.spans).
+    """
+    def __init__(self, spans=None):
+        self.spans = spans
+
+    # Returns the columns of obj as compact JSON.
+    def encode(self, obj):
+        return json.dumps(self.columns(obj), separators=(',', ':'))
+
+    # Returns the columns of obj as a dict of lists.
+    def columns(self, obj):
+        if not isinstance(obj, (Expression, Constraint)):
+            raise TypeError("%r is not a statement." % (obj,))
+        render_names(obj)
+        strings = {}
+        templates = {}
+        monotonicities = {}
+        # The columns of each node's own fields, by id.
+        rows = {}
+        def string(value):
+            return strings.setdefault(value, len(strings))
+        parents = []
+        error_offsets = []
+        error_index = []
+        error_message = []
+        # The row of each node, in preorder.
+        node_rows = []
+        stack = [(obj, -1)]
+        while stack:
+            (node, parent) = stack.pop()
+            index = len(parents)
+            parents.append(parent)
+            key = id(node)
+            if key not in rows:
+                rows[key] = self.row(node, string, templates, monotonicities)
+            (row, errors) = rows[key]
+            node_rows.append(row)
+            error_offsets.append(len(error_index))
+            for (error, message) in errors:
+                error_index.append(error)
+                error_message.append(message)
+            stack.extend([(sub, index) for sub in reversed(node.subexpressions)])
+        error_offsets.append(len(error_index))
+        columns = {s.PARENT_KEY: parents}
+        for (key, column) in zip([s.CLASS_KEY, s.SHORT_NAME_KEY, s.CURVATURE_KEY, s.SIGN_KEY,
+                                  s.TEMPLATE_KEY, s.MONOTONICITY_KEY], zip(*node_rows)):
+            columns[key] = list(column)
+        columns[s.ERROR_OFFSETS_KEY] = error_offsets
+        columns[s.ERROR_INDEX_KEY] = error_index
+        columns[s.ERROR_MESSAGE_KEY] = error_message
+        columns[s.STRINGS_KEY] = sorted(strings, key=strings.get)
+        columns[s.TEMPLATES_KEY] = sorted(templates, key=templates.get)
+        columns[s.MONOTONICITIES_KEY] = sorted(monotonicities, key=monotonicities.get)
+        for table in [s.TEMPLATES_KEY, s.MONOTONICITIES_KEY]:
+            columns[table] = [list(value) for value in columns[table]]
+        if self.spans is not None:
+            columns[s.SPAN_STARTS_KEY] = list(self.spans.starts)
+            columns[s.SPAN_ENDS_KEY] = list(self.spans.ends)
+        return columns
+
+    # Returns the class, short name, curvature, sign, template and
+    # monotonicity of node, and its (index, message) errors, interning
+    # strings with string and lists in the templates and monotonicities.
+    @staticmethod
+    def row(node, string, templates, monotonicities):
+        (curvature, sign, monotonicity) = (-1, -1, -1)
+        if isinstance(node, Expression):
+            curvature = string(s.TYPE_TO_NAME[str(node.curvature)])
+            sign = string(s.TYPE_TO_NAME[str(node.sign)])
+            if node.monotonicity is not None:
+                monotonicity = monotonicities.setdefault(
+                    tuple(string(s.TYPE_TO_NAME[str(tonicity)])
+                          for tonicity in node.monotonicity), len(monotonicities))
+        template = tuple(string(fragment) for fragment in
+                         name_template(str(node), [str(sub) for sub in node.subexpressions]))
+        template = templates.setdefault(template, len(templates))
+        errors = []
+        for error in node.errors:
+            index = error.index if error.is_indexed() else -1
+            errors.append((index, string(error.error_message())))
+        return ((string(s.TYPE_TO_NAME[node.__class__.__name__]), string(node.short_name),
+                 curvature, sign, template, monotonicity), errors)
+
+    # Translates columns (a dict, or its JSON) into the dicts of the root
+    # node, as json.loads reads the nested JSON of StatementEncoder.
+    @staticmethod
+    def decode(columns):
+        if isinstance(columns, str):
+            columns = json.loads(columns)
+        strings = columns[s.STRINGS_KEY]
+        parents = columns[s.PARENT_KEY]
+        templates = [[strings[fragment] for fragment in template]
+                     for template in columns[s.TEMPLATES_KEY]]
+        monotonicities = [[strings[tonicity] for tonicity in monotonicity]
+                          for monotonicity in columns[s.MONOTONICITIES_KEY]]
+        error_offsets = columns[s.ERROR_OFFSETS_KEY]
+        error_index = columns[s.ERROR_INDEX_KEY]
+        error_message = columns[s.ERROR_MESSAGE_KEY]
+        starts = columns.get(s.SPAN_STARTS_KEY)
+        ends = columns.get(s.SPAN_ENDS_KEY)
+        children = [[] for parent in parents]
+        for (index, parent) in enumerate(parents):
+            if parent >= 0:
+                children[parent].append(index)
+        nodes = [None] * len(parents)
+        # Children follow their parents, so build the nodes from the last.
+        for index in range(len(parents) - 1, -1, -1):
+            subs = [nodes[child] for child in children[index]]
+            template = templates[columns[s.TEMPLATE_KEY][index]]
+            if len(template) == len(subs) + 1:
+                parts = [template[0]]
+                for (sub, fragment) in zip(subs, template[1:]):
+                    parts.append(sub[s.NAME_KEY])
+                    parts.append(fragment)
+                name = ''.join(parts)
+            else:
+                name = ''.join(template)
+            class_name = strings[columns[s.CLASS_KEY][index]]
+            is_constraint = class_name == Constraint.__name__
+            node = {s.TYPE_KEY: s.CONSTRAINT_TYPE if is_constraint else s.EXP_TYPE,
+                    s.NAME_KEY: name,
+                    s.SHORT_NAME_KEY: strings[columns[s.SHORT_NAME_KEY][index]]}
+            if not is_constraint:
+                node[s.CURVATURE_KEY] = strings[columns[s.CURVATURE_KEY][index]]
+                node[s.SIGN_KEY] = strings[columns[s.SIGN_KEY][index]]
+            node[s.CLASS_KEY] = class_name
+            error_map = {s.UNSORTED_ERRORS_KEY: [], s.INDEXED_ERRORS_KEY: {}}
+            for error in range(error_offsets[index], error_offsets[index + 1]):
+                message = strings[error_message[error]]
+                if error_index[error] < 0:
+                    error_map[s.UNSORTED_ERRORS_KEY].append(message)
+                else:
+                    error_map[s.INDEXED_ERRORS_KEY][str(error_index[error])] = message
+            node[s.ERRORS_KEY] = error_map
+            if subs or is_constraint:
+                node[s.SUBEXP_KEY] = subs
+            monotonicity = columns[s.MONOTONICITY_KEY][index]
+            if monotonicity >= 0:
+                node[s.MONOTONICITY_KEY] = list(monotonicities[monotonicity])
+            if starts is not None:
+                node[s.SPAN_KEY] = [starts[index], ends[index]]
+            nodes[index] = node
+        return nodes[0]
@@ -5,30 +5,48 @@ from dcp_parser.json.expression_encoder import ExpressionEncoder
 # Taken from http://docs.python.org/2/library/json.html
 
 class ConstraintEncoder(json.JSONEncoder):
-    """ Encodes a constraint as JSON """
+    """
+    Encodes a constraint as JSON.
+    spans is an optional iterator over the (start, end) source offsets
+    of the nodes in preorder (see Spans), which are encoded with them.
+    """
+    def __init__(self, spans=None, **kwargs):
+        super(ConstraintEncoder, self).__init__(**kwargs)
+        self.spans = spans
+
     def default(self, obj):
         if isinstance(obj, Constraint):
-            json_map = {
-                        s.TYPE_KEY: s.CONSTRAINT_TYPE,
-                        s.NAME_KEY: str(obj),
-                        s.SHORT_NAME_KEY: obj.short_name,
-                        s.CLASS_KEY: s.TYPE_TO_NAME[obj.__class__.__name__],
-                       }
-            # Encode the error as its string representation.
-            # Save indexed errors in a map.
-            error_map = {s.UNSORTED_ERRORS_KEY: [], s.INDEXED_ERRORS_KEY: {}}
-            for error in obj.errors:
-                if error.is_indexed():
-                    error_map[s.INDEXED_ERRORS_KEY][error.index] = error.error_message()
-                else:
-                    error_map[s.UNSORTED_ERRORS_KEY].append(error.error_message())
-            json_map[s.ERRORS_KEY] = error_map
-
-            json_map[s.SUBEXP_KEY] = [ExpressionEncoder().default(sub) for sub in obj.subexpressions]
-            return json_map
+            span = None if self.spans is None else next(self.spans)
+            encoder = ExpressionEncoder(spans=self.spans)
+            return self.node_map(obj, [encoder.default(sub)
+                                       for sub in obj.subexpressions], span)
         # Let the base class default method raise the TypeError
         return json.JSONEncoder.default(self, obj)
 
+    # Encodes obj with the given encoded children, or without
+    # its children if children is None, and its span if given.
+    def node_map(self, obj, children=None, span=None):
+        json_map = {
+                    s.TYPE_KEY: s.CONSTRAINT_TYPE,
+                    s.NAME_KEY: str(obj),
+                    s.SHORT_NAME_KEY: obj.short_name,
+                    s.CLASS_KEY: s.TYPE_TO_NAME[obj.__class__.__name__],
+                   }
+        # Encode the error as its string representation.
+        # Save indexed errors in a map.
+        error_map = {s.UNSORTED_ERRORS_KEY: [], s.INDEXED_ERRORS_KEY: {}}
+        for error in obj.errors:
+            if error.is_indexed():
+                error_map[s.INDEXED_ERRORS_KEY][error.index] = error.error_message()
+            else:
+                error_map[s.UNSORTED_ERRORS_KEY].append(error.error_message())
+        json_map[s.ERRORS_KEY] = error_map
+        if children is not None:
+            json_map[s.SUBEXP_KEY] = children
+        if span is not None:
+            json_map[s.SPAN_KEY] = list(span)
+        return json_map
+
     # Translates JSON into a Constraint.
     # Used for testing. Does not preserve all information.
     @staticmethod
@@ -4,37 +4,54 @@ from dcp_parser.expression.expression import Expression
 # Taken from http://docs.python.org/2/library/json.html
 
 class ExpressionEncoder(json.JSONEncoder):
-    """ Encodes an expression as JSON """
+    """
+    Encodes an expression as JSON.
+    spans is an optional iterator over the (start, end) source offsets
+    of the nodes in preorder (see Spans), which are encoded with them.
+    """
+    def __init__(self, spans=None, **kwargs):
+        super(ExpressionEncoder, self).__init__(**kwargs)
+        self.spans = spans
+
     def default(self, obj):
         if isinstance(obj, Expression):
-            json_map = {
-                        s.TYPE_KEY: s.EXP_TYPE,
-                        s.NAME_KEY: str(obj),
-                        s.SHORT_NAME_KEY: obj.short_name,
-                        s.CURVATURE_KEY: s.TYPE_TO_NAME[str(obj.curvature)],
-                        s.SIGN_KEY: s.TYPE_TO_NAME[str(obj.sign)],
-                        s.CLASS_KEY: s.TYPE_TO_NAME[obj.__class__.__name__]
-                       }
-            # Encode the error as its string representation.
-            # Save indexed errors in a map.
-            error_map = {s.UNSORTED_ERRORS_KEY: [], s.INDEXED_ERRORS_KEY: {}}
-            for error in obj.errors:
-                if error.is_indexed():
-                    error_map[s.INDEXED_ERRORS_KEY][error.index] = error.error_message()
-                else:
-                    error_map[s.UNSORTED_ERRORS_KEY].append(error.error_message())
-            json_map[s.ERRORS_KEY] = error_map
-            # Only include subexpression attribute if non-empty
-            if len(obj.subexpressions) > 0:
-                json_map[s.SUBEXP_KEY] = [self.default(sub) for sub in obj.subexpressions]
-            # Ignore monotonicity if None (i.e. not an atomic function)
-            if obj.monotonicity is not None:
-                json_map[s.MONOTONICITY_KEY] = [s.TYPE_TO_NAME[str(tonicity)]
-                                            for tonicity in obj.monotonicity]
-            return json_map
+            span = None if self.spans is None else next(self.spans)
+            return self.node_map(obj, [self.default(sub) for sub in obj.subexpressions],
+                                 span)
         # Let the base class default method raise the TypeError
         return json.JSONEncoder.default(self, obj)
 
+    # Encodes obj with the given encoded children, or without
+    # its children if children is None, and its span if given.
+    def node_map(self, obj, children=None, span=None):
+        json_map = {
+                    s.TYPE_KEY: s.EXP_TYPE,
+                    s.NAME_KEY: str(obj),
+                    s.SHORT_NAME_KEY: obj.short_name,
+                    s.CURVATURE_KEY: s.TYPE_TO_NAME[str(obj.curvature)],
+                    s.SIGN_KEY: s.TYPE_TO_NAME[str(obj.sign)],
+                    s.CLASS_KEY: s.TYPE_TO_NAME[obj.__class__.__name__]
+                   }
+        # Encode the error as its string representation.
+        # Save indexed errors in a map.
+        error_map = {s.UNSORTED_ERRORS_KEY: [], s.INDEXED_ERRORS_KEY: {}}
+        for error in obj.errors:
+            if error.is_indexed():
+                error_map[s.INDEXED_ERRORS_KEY][error.index] = error.error_message()
+            else:
+                error_map[s.UNSORTED_ERRORS_KEY].append(error.error_message())
+        json_map[s.ERRORS_KEY] = error_map
+        # Only include subexpression attribute if non-empty
+        if children:
+            json_map[s.SUBEXP_KEY] = children
+        # Ignore monotonicity if None (i.e. not an atomic function)
+        if obj.monotonicity is not None:
+            json_map[s.MONOTONICITY_KEY] = [s.TYPE_TO_NAME[str(tonicity)]
+                                        for tonicity in obj.monotonicity]
+        if span is not None:
+            json_map[s.SPAN_KEY] = list(span)
+        return json_map
+
     # Translates JSON into an Expression.
     # Used for testing. Does not preserve all information.
     @staticmethod
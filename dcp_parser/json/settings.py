@@ -59,8 +59,28 @@ CLASS_KEY = 'class'
 
 MONOTONICITY_KEY = 'monotonicity'
 SHORT_NAME_KEY = 'short_name'
+# The [start, end] source offsets of a node, if encoded with spans.
+SPAN_KEY = 'span'
+
+# Keys for the changes made by an incremental reparse
+PATH_KEY = 'path'
+ANCESTORS_KEY = 'ancestors'
+NODE_KEY = 'node'
 
 # Error keys
 ERRORS_KEY = 'errors'
 UNSORTED_ERRORS_KEY = 'unsorted_errors'
-INDEXED_ERRORS_KEY = 'indexed_errors'
\ No newline at end of file
+INDEXED_ERRORS_KEY = 'indexed_errors'
+
+# Keys of the columnar encoding (see ColumnEncoder). Each column but the
+# tables has one entry per node, in preorder.
+STRINGS_KEY = 'strings'
+PARENT_KEY = 'parent'
+TEMPLATE_KEY = 'template'
+TEMPLATES_KEY = 'templates'
+MONOTONICITIES_KEY = 'monotonicities'
+ERROR_OFFSETS_KEY = 'error_offsets'
+ERROR_INDEX_KEY = 'error_index'
+ERROR_MESSAGE_KEY = 'error_message'
+SPAN_STARTS_KEY = 'span_starts'
+SPAN_ENDS_KEY = 'span_ends'
@@ -1,21 +1,71 @@
+import itertools
 import json
 from dcp_parser.json import settings as s
 from dcp_parser.expression.expression import Expression
 from dcp_parser.expression.constraints import Constraint
 from dcp_parser.json.constraint_encoder import ConstraintEncoder
 from dcp_parser.json.expression_encoder import ExpressionEncoder
+from dcp_parser.json.stream_encoder import StreamEncoder
 # Taken from http://docs.python.org/2/library/json.html
 
 class StatementEncoder(json.JSONEncoder):
-    """ Encodes a statement as JSON """
+    """
+    Encodes a statement as JSON.
+    spans is the optional Spans of the statement (see Parser.spans),
+    whose source offsets are then encoded with the nodes.
+    """
+    def __init__(self, spans=None, **kwargs):
+        super(StatementEncoder, self).__init__(**kwargs)
+        self.spans = spans
+
     def default(self, obj):
+        return self.tree_map(obj, 0)
+
+    # Statements encoded with the default formatting are written by a
+    # StreamEncoder, which does not recurse or build the nested dicts.
+    def encode(self, obj):
+        if isinstance(obj, (Expression, Constraint)) and self.indent is None and \
+           self.ensure_ascii and not self.sort_keys and \
+           (self.item_separator, self.key_separator) == (', ', ': '):
+            return StreamEncoder(self.spans).encode(obj)
+        return super(StatementEncoder, self).encode(obj)
+
+    # Encodes obj, the node at index in the preorder of the statement.
+    def tree_map(self, obj, index):
+        spans = None
+        if self.spans is not None:
+            spans = itertools.islice(iter(self.spans), index, None)
         if isinstance(obj, Constraint):
-            return ConstraintEncoder().default(obj)
+            return ConstraintEncoder(spans=spans).default(obj)
         elif isinstance(obj, Expression):
-            return ExpressionEncoder().default(obj)
+            return ExpressionEncoder(spans=spans).default(obj)
         # Let the base class default method raise the TypeError
         return json.JSONEncoder.default(self, obj)
 
+    # Encodes obj, the node at index, without its children.
+    def node_map(self, obj, index=0):
+        span = None if self.spans is None else self.spans[index]
+        if isinstance(obj, Constraint):
+            return ConstraintEncoder().node_map(obj, span=span)
+        return ExpressionEncoder().node_map(obj, span=span)
+
+    # Encodes the part of statement changed by replacing the subexpression
+    # at path (a list of child indices, see Parser.reparse): the nodes on
+    # the path without their children, followed by the new subexpression
+    # with its children.
+    def change_map(self, statement, path):
+        indices = [0] * (len(path) + 1)
+        if self.spans is not None:
+            indices = self.spans.indices(path)
+        ancestors = []
+        node = statement
+        for (depth, index) in enumerate(path):
+            ancestors.append(self.node_map(node, indices[depth]))
+            node = node.subexpressions[index]
+        return {s.PATH_KEY: list(path),
+                s.ANCESTORS_KEY: ancestors,
+                s.NODE_KEY: self.tree_map(node, indices[-1])}
+
     # Translates JSON into a Statement.
     # Used for testing. Does not preserve all information.
     @staticmethod
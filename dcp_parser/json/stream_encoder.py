@@ -0,0 +1,146 @@
+import json
+from json.encoder import encode_basestring_ascii
+from dcp_parser.json import settings as s
+from dcp_parser.expression.expression import Expression
+from dcp_parser.expression.constraints import Constraint
+
+# The fragment written between a node's errors and its children.
+CHILDREN = ', "%s": [' % s.SUBEXP_KEY
+# The separator between children.
+SEPARATOR = ', '
+
+# The encoded types.
+EXPRESSION = encode_basestring_ascii(s.EXP_TYPE)
+CONSTRAINT = encode_basestring_ascii(s.CONSTRAINT_TYPE)
+# The kinds of fragments memoized by StreamEncoder.memoized.
+(FIELDS, ERRORS, MONOTONICITY) = range(3)
+
+# Encodes a key and its JSON value as an object member.
+def member(key, value):
+    return ', %s: %s' % (encode_basestring_ascii(key), value)
+
+# Encodes the curvature, sign and class of node.
+def node_fields(node):
+    fields = []
+    if isinstance(node, Expression):
+        fields.append(member(s.CURVATURE_KEY,
+            encode_basestring_ascii(s.TYPE_TO_NAME[str(node.curvature)])))
+        fields.append(member(s.SIGN_KEY,
+            encode_basestring_ascii(s.TYPE_TO_NAME[str(node.sign)])))
+    fields.append(member(s.CLASS_KEY,
+        encode_basestring_ascii(s.TYPE_TO_NAME[node.__class__.__name__])))
+    return ''.join(fields)
+
+# Encodes the errors of node.
+def errors_fragment(node):
+    error_map = {s.UNSORTED_ERRORS_KEY: [], s.INDEXED_ERRORS_KEY: {}}
+    for error in node.errors:
+        if error.is_indexed():
+            error_map[s.INDEXED_ERRORS_KEY][error.index] = error.error_message()
+        else:
+            error_map[s.UNSORTED_ERRORS_KEY].append(error.error_message())
+    return member(s.ERRORS_KEY, json.dumps(error_map))
+
+# Encodes the monotonicity of node.
+def monotonicity_fragment(node):
+    return member(s.MONOTONICITY_KEY, json.dumps(
+        [s.TYPE_TO_NAME[str(tonicity)] for tonicity in node.monotonicity]))
+
+# Renders the names of the subexpressions of obj bottom up, so each
+# name is joined from the names of its children instead of walking
+# all the parts below it.
+def render_names(obj):
+    stack = [(obj, False)]
+    seen = set()
+    while stack:
+        (node, expanded) = stack.pop()
+        if expanded:
+            node.name
+        elif id(node) not in seen:
+            seen.add(id(node))
+            if isinstance(node, Expression) and node.text is None:
+                stack.append((node, True))
+            stack.extend((sub, False) for sub in node.subexpressions)
+
+class StreamEncoder(object):
+    """
+    Encodes a statement as JSON, writing fragments as it walks the tree
+    with an explicit stack instead of building nested dicts, so trees of
+    any depth can be encoded. The output is the same as that of
+    StatementEncoder().encode, with spans encoded as StatementEncoder(spans).
+    The fragments of a node shared by several parents are built once.
+    """
+    def __init__(self, spans=None):
+        self.spans = spans
+
+    # Returns the JSON encoding of obj.
+    def encode(self, obj):
+        return ''.join(self.iterencode(obj))
+
+    # Writes the JSON encoding of obj to stream, e.g. an io.StringIO.
+    def write(self, obj, stream):
+        write = stream.write
+        for fragment in self.iterencode(obj):
+            write(fragment)
+
+    # Yields the JSON encoding of obj in fragments.
+    def iterencode(self, obj):
+        if not isinstance(obj, (Expression, Constraint)):
+            raise TypeError("%r is not a statement." % (obj,))
+        render_names(obj)
+        # Fragments of fields shared by many nodes, by table and key.
+        self.memo = {}
+        spans = None if self.spans is None else iter(self.spans)
+        # The opening and closing fragments of each node, by id.
+        fragments = {}
+        stack = [obj]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+                continue
+            key = id(node)
+            if key not in fragments:
+                fragments[key] = self.node_fragments(node)
+            (head, tail) = fragments[key]
+            if spans is not None:
+                tail = '%s, "%s": [%d, %d]}' % ((tail, s.SPAN_KEY) + tuple(next(spans)))
+            else:
+                tail += '}'
+            yield head
+            subexpressions = node.subexpressions
+            if subexpressions or isinstance(node, Constraint):
+                yield CHILDREN
+                stack.append(']' + tail)
+                for index in range(len(subexpressions) - 1, 0, -1):
+                    stack.append(subexpressions[index])
+                    stack.append(SEPARATOR)
+                if subexpressions:
+                    stack.append(subexpressions[0])
+            else:
+                yield tail
+
+    # Returns the fragments of node before its children and after them,
+    # without the closing brace, in the key order of node_map in
+    # ExpressionEncoder and ConstraintEncoder.
+    def node_fragments(self, node):
+        head = '{"%s": %s%s%s%s%s' % (
+            s.TYPE_KEY, CONSTRAINT if isinstance(node, Constraint) else EXPRESSION,
+            member(s.NAME_KEY, encode_basestring_ascii(str(node))),
+            member(s.SHORT_NAME_KEY, json.dumps(node.short_name)),
+            self.memoized((FIELDS, node.__class__, getattr(node, 'curvature', None),
+                           getattr(node, 'sign', None)), node_fields, node),
+            self.memoized((ERRORS, tuple(node.errors)), errors_fragment, node))
+        tail = ''
+        if isinstance(node, Expression) and node.monotonicity is not None:
+            tail = self.memoized((MONOTONICITY, tuple(node.monotonicity)),
+                                 monotonicity_fragment, node)
+        return (head, tail)
+
+    # Returns render(node), rendering it once per encoding for all the
+    # nodes with the same key.
+    def memoized(self, key, render, node):
+        fragment = self.memo.get(key)
+        if fragment is None:
+            fragment = self.memo[key] = render(node)
+        return fragment
@@ -0,0 +1,117 @@
+from dcp_parser.expression.sign import Sign
+import re
+
+# Reserved keywords
+RESERVED = {
+   'variable' : 'VARIABLE',
+   'parameter' : 'PARAMETER',
+    str(Sign.POSITIVE).lower() : 'SIGN',
+    str(Sign.NEGATIVE).lower() : 'SIGN',
+    str(Sign.ZERO).lower() : 'SIGN',
+    str(Sign.UNKNOWN).lower() : 'SIGN',
+    'Inf' : 'STRING_ARG', # Special string arguments for atomic functions.
+}
+
+# The STRING_ARG keywords.
+STRING_ARGS = sorted(word for (word, kind) in RESERVED.items()
+                     if kind == 'STRING_ARG')
+
+TOKENS = [
+    'INT','FLOAT',
+    'PLUS','MINUS','TIMES','DIVIDE',
+    'EQUALS','GEQ','LEQ',
+    'LPAREN','RPAREN','COMMA',
+    'ID'] + sorted(set(RESERVED.values()))
+
+# Every token in one alternation, so a program is tokenized in a single
+# finditer pass. Blanks are consumed with the token that follows them.
+# Floats are tried before integers. Comments and newlines are matched
+# and dropped, and any other character falls through to the error group.
+TOKEN_REGEX = re.compile(r'''[ \t]*(?:
+    (?P<ignore>\#.*)
+  | (?P<newline>\n+)
+  | (?P<ID>[a-zA-Z_][a-zA-Z_0-9]*)
+  | (?P<FLOAT>\d*\.\d+)
+  | (?P<INT>\d+)
+  | (?P<EQUALS>==) | (?P<LEQ><=) | (?P<GEQ>>=)
+  | (?P<PLUS>\+) | (?P<MINUS>-) | (?P<TIMES>\*) | (?P<DIVIDE>/)
+  | (?P<LPAREN>\() | (?P<RPAREN>\)) | (?P<COMMA>,)
+  | (?P<error>[^ \t]))
+''', re.VERBOSE)
+
+# Yields a (type, value, line, column, end) tuple for each token in text,
+# where end is the column just after the token. Lines count from 1 and
+# columns from 0. Tokens are produced lazily,
+# so an illegal character is only reported once the parser reaches it.
+def tokenize(text):
+    line = 1
+    line_start = 0
+    for match in TOKEN_REGEX.finditer(text):
+        kind = match.lastgroup
+        if kind == 'ignore':
+            continue
+        value = match.group(kind)
+        column = match.start(kind) - line_start
+        end = match.end(kind) - line_start
+        if kind == 'newline':
+            line += len(value)
+            line_start = match.end()
+            continue
+        if kind == 'ID':
+            kind = RESERVED.get(value, 'ID') # Check for reserved words
+        elif kind == 'INT':
+            value = int(value)
+        elif kind == 'FLOAT':
+            value = float(value)
+        elif kind == 'error':
+            illegal_character(value)
+        yield (kind, value, line, column, end)
+
+def illegal_character(char):
+    if char == '=':
+        raise Exception("'=' is not valid. Did you mean '=='?")
+    elif char == '<':
+        raise Exception("'<' constraints are not valid. Consider using '<='.")
+    elif char == '>':
+        raise Exception("'>' constraints are not valid. Consider using '>='.")
+    elif char == '^':
+        raise Exception("'^' is not valid. Consider using the 'pow' function.")
+    else:
+        raise Exception("Illegal character '%s'." % char)
+
+
+class PlyToken(object):
+    """
+    A token in the form ply.yacc expects.
+    end is the column just after the token, for source spans.
+    """
+    def __init__(self, type, value, lineno, lexpos, end):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+        self.end = end
+
+    # The span tree of the token's node, which has no children.
+    @property
+    def span(self):
+        return (self.lexpos, self.end, ())
+
+    def __repr__(self):
+        return "PlyToken(%s,%r,%d,%d)" % (self.type, self.value,
+                                          self.lineno, self.lexpos)
+
+
+class PlyLexer(object):
+    """
+    Feeds tokenize() to ply.yacc in place of a ply.lex lexer.
+    lexpos is the column of the token within its line.
+    """
+    def input(self, text):
+        self.tokens = tokenize(text)
+
+    # Returns the next token, or None at the end of the input.
+    def token(self):
+        for (kind, value, line, column, end) in self.tokens:
+            return PlyToken(kind, value, line, column, end)
+        return None
@@ -1,8 +1,25 @@
 from dcp_parser.expression.statement import Statement
-from dcp_parser.expression.expression import Parameter, Variable, Constant
+from dcp_parser.expression.expression import Expression, Parameter, Variable
+from dcp_parser.expression.node_table import NodeTable
+from dcp_parser.expression.spans import Spans, atom_children
 from dcp_parser.expression.sign import Sign
+from dcp_parser.pratt import Pratt
+from dcp_parser.lexer import PlyLexer, TOKENS
 import dcp_parser.atomic.atom_loader as atom_loader
-import ply.yacc
+import dcp_parser.incremental as incremental
+from collections import ChainMap
+from collections.abc import Mapping
+import copy
+import hashlib
+import operator
+import threading
+import types
+import warnings
+try:
+    import ply.yacc
+except ImportError:
+    # PLY is only needed by the 'ply' backend.
+    ply = None
 
 class Parser(object):
     """
@@ -11,275 +28,492 @@ class Parser(object):
       variable (SIGN) x y z ...
       parameter (SIGN) a b c ...
       Any constraint or objective.
+    The lexer and LALR tables are shared by all Parsers (see Grammar),
+    so a Parser only owns its symbol table, statements and the NodeTable
+    that shares repeated subexpressions between them. spans holds the
+    source offsets of the nodes of each statement (see Spans).
+    backend selects the parsing engine: 'ply' for the LALR parser or
+    'pratt' for the PLY-free Pratt parser. Both give the same results.
+    symbols is an optional SymbolTable of predeclared variables and
+    parameters. It is shared, not copied: the Parser's own declarations
+    go into an overlay on top of it.
+    atoms is an optional AtomRegistry of the atomic functions allowed,
+    e.g. atom_loader.ATOMS.restrict(['square', 'max']). It defaults to
+    all atoms.
+    The state of parsing lives in a ParseContext. parse uses the Parser's
+    own context unless given another, so one Parser can parse in many
+    threads at once with a context per call (see context).
     """
-    def __init__(self):
+    def __init__(self, backend='ply', symbols=None, atoms=None):
+        if backend not in BACKENDS:
+            raise Exception("Unknown parser backend '%s'." % backend)
+        if backend == 'ply' and ply is None:
+            raise Exception("The 'ply' backend needs PLY; use backend='pratt'.")
+        self.backend = backend
+        self.symbols = symbols
+        self.atoms = atom_loader.ATOMS if atoms is None else atoms
         self.clear()
-        self.atom_dict = atom_loader.generate_atom_dict()
-        self.parser = self.build_parser()
 
     # Dump previous input.
     def clear(self):
-        self.symbol_table = {}
-        self.statements = []
-
-    # Evaluates statement and records the meaning.
-    def parse(self, statement):
-        self.errors = 0
+        self.state = self.context()
+
+    # Returns a new ParseContext with the Parser's atoms. symbol_table
+    # defaults to one that reads through to the Parser's symbols, as a
+    # cleared Parser has, and nodes to a new NodeTable.
+    def context(self, symbol_table=None, nodes=None):
+        if symbol_table is None:
+            symbol_table = self.overlay(self.symbols)
+        return ParseContext(symbol_table, self.atoms, nodes)
+
+    # The symbol table, statements, spans and NodeTable of the Parser's
+    # own context.
+    @property
+    def symbol_table(self):
+        return self.state.symbol_table
+
+    @symbol_table.setter
+    def symbol_table(self, symbol_table):
+        self.state.symbol_table = symbol_table
+
+    @property
+    def statements(self):
+        return self.state.statements
+
+    @statements.setter
+    def statements(self, statements):
+        self.state.statements = statements
+
+    @property
+    def spans(self):
+        return self.state.spans
+
+    @spans.setter
+    def spans(self, spans):
+        self.state.spans = spans
+
+    @property
+    def nodes(self):
+        return self.state.nodes
+
+    # A symbol table that reads through to symbols (a SymbolTable or None)
+    # and keeps new declarations to itself.
+    @staticmethod
+    def overlay(symbols):
+        if symbols is None:
+            return {}
+        return ChainMap({}, symbols)
+
+    # Returns the current symbol table, or table, as an immutable SymbolTable.
+    def snapshot(self, table=None):
+        if table is None:
+            table = self.symbol_table
+        # Nothing declared on top of an attached table.
+        if isinstance(table, ChainMap) and len(table.maps) == 2 and \
+           len(table.maps[0]) == 0 and isinstance(table.maps[1], SymbolTable):
+            return table.maps[1]
+        return SymbolTable(table)
+
+    # The shared parsing engine for this Parser's backend.
+    @property
+    def grammar(self):
+        return BACKENDS[self.backend].get()
+
+    # Maps atomic function names to functions that build Expressions.
+    @property
+    def atom_dict(self):
+        return self.atoms.functions
+
+    # Evaluates statement and records the meaning in context, by default
+    # the Parser's own. Returns the context.
+    def parse(self, statement, context=None):
+        if context is None:
+            context = self.state
+        grammar = self.grammar
+        context.errors = 0
         lines = statement.split('\n')
         for line in lines:
             # Ignore empty input.
             if len(line.strip()) > 0:
-                self.parser.parse(line)
-            if self.errors > 0:
+                context.line = line
+                grammar.parse(line, context)
+            if context.errors > 0:
                 raise Exception("'%s' is not a valid expression." % line)
+        return context
+
+    # Replaces the subexpression of statement at path (a list of child
+    # indices, as in the encoded tree) or at span (the (start, end) offsets
+    # of its text in the line it was parsed from) with text. Only the new
+    # subtree and the nodes on its path to the root are analyzed again.
+    # statement must have been parsed by this Parser; it is replaced in
+    # statements and its spans are updated.
+    # Returns the new statement and the changed part of its encoded tree.
+    def reparse(self, statement, text, path=None, span=None):
+        return incremental.reparse(self, statement, text, path, span)
+
+    # Parses each of texts independently against the Parser's symbol table
+    # and the symbols declared by preamble (text or a list of lines), which
+    # is only parsed once. Returns a (statements, error) pair per text,
+    # where error is the Exception the text raised or None. A bad text does
+    # not stop the batch. The Parser's own context is not changed, and the
+    # texts share a NodeTable of their own, which is dropped with the
+    # results, so a long-lived Parser does not grow with its batches.
+    def parse_many(self, texts, preamble=''):
+        if isinstance(preamble, (list, tuple)):
+            preamble = '\n'.join(preamble)
+        context = self.context(ChainMap({}, self.symbol_table))
+        symbols = self.snapshot(self.parse(preamble, context).symbol_table)
+        nodes = NodeTable()
+        results = []
+        for text in texts:
+            context = self.context(self.overlay(symbols), nodes)
+            try:
+                self.parse(text, context)
+                error = None
+            except Exception as e:
+                error = e
+            results.append((context.statements, error))
+        return results
+
 
+class ParseContext(object):
     """
-    Constructs at lex/yacc parser for convex optimization expressions.
-    Based on http://www.dabeaz.com/ply/example.html
+    The state of parsing on behalf of a Parser: the symbol table, the
+    statements parsed with their spans, the NodeTable that shares their
+    subexpressions, and the line being parsed with its syntax errors.
+    The parsing engines only change the context they are given, so
+    parses in different contexts can run at the same time.
+    atoms is the AtomRegistry of the atomic functions allowed. nodes is
+    a NodeTable to share with other contexts, or None for a new one.
     """
-    def build_parser(self):
-        # Lexer definition
-
-        # Reserved keywords
-        reserved = {
-           'variable' : 'VARIABLE',
-           'parameter' : 'PARAMETER',
-            str(Sign.POSITIVE).lower() : 'SIGN',
-            str(Sign.NEGATIVE).lower() : 'SIGN',
-            str(Sign.ZERO).lower() : 'SIGN',
-            str(Sign.UNKNOWN).lower() : 'SIGN',
-            'Inf' : 'STRING_ARG', # Special string arguments for atomic functions.
-        }
-
-        tokens = [
-            'INT','FLOAT',
-            'PLUS','MINUS','TIMES','DIVIDE',
-            'EQUALS','GEQ','LEQ',
-            'LPAREN','RPAREN','COMMA',
-            'ID'] + list(set(reserved.values()))
-
-        # Tokens
-        t_PLUS    = r'\+'
-        t_MINUS   = r'-'
-        t_TIMES   = r'\*'
-        t_DIVIDE  = r'/'
-        t_EQUALS  = r'=='
-        t_LEQ     = r'<='
-        t_GEQ     = r'>='
-        t_LPAREN  = r'\('
-        t_RPAREN  = r'\)'
-        t_COMMA   = r','
-
-        # Convert IDs to reserved words.
-        def t_ID(t):
-            r'[a-zA-Z_][a-zA-Z_0-9]*'
-            t.type = reserved.get(t.value,'ID') # Check for reserved words
-            return t
-
-        # Convert float string to value.
-        def t_FLOAT(t):
-            r'\d*\.\d+'
-            t.value = float(t.value)
-            return t
-
-        # Convert integer string to value.
-        def t_INT(t):
-            r'\d+'
-            t.value = int(t.value) 
-            return t
-
-        # Ignore whitespace and comments.
-        t_ignore_COMMENT = r'\#.*'
-        t_ignore = " \t"
-
-        def t_newline(t):
-            r'\n+'
-            t.lexer.lineno += t.value.count("\n")
-            
-        def t_error(t):
-            if t.value[0] == '=':
-                raise Exception("'=' is not valid. Did you mean '=='?")
-            elif t.value[0] == '<':
-                raise Exception("'<' constraints are not valid. Consider using '<='.")
-            elif t.value[0] == '>':
-                raise Exception("'>' constraints are not valid. Consider using '>='.")
-            elif t.value[0] == '^':
-                raise Exception("'^' is not valid. Consider using the 'pow' function.")
-            else:
-                raise Exception("Illegal character '%s'." % t.value[0])
-            
-        # Build the lexer
-        import ply.lex as lex
-        lex.lex()
-
-        # Parser definition
-        precedence = (
-            ('nonassoc', 'EQUALS', 'LEQ', 'GEQ'),
-            ('left','PLUS','MINUS'),
-            ('left','TIMES','DIVIDE'),
-            ('right','UMINUS', 'UPLUS'),
-            )
-
-        # Add variables to the symbol table.
-        # No sign given, defaults to UNKNOWN
-        def p_statement_variables(t):
-            '''statement : VARIABLE id_list'''
-            add_variables(t[2], Sign.UNKNOWN)
-
-        # Sign given
-        def p_statement_variables_sign(t):
-            '''statement : VARIABLE SIGN id_list'''
-            add_variables(t[3], Sign(t[2]))
-
-        # Helper to add variables to the symbol table.
-        def add_variables(variables, sign):
-            for id in variables:
-                self.symbol_table[id] = Variable(id, sign)
-
-        # Add parameters to the symbol table.
-        # No sign given, defaults to UNKNOWN
-        def p_statement_parameters(t):
-            '''statement : PARAMETER id_list'''
-            add_parameters(t[2], Sign.UNKNOWN)
-
-        # Sign given
-        def p_statement_parameters_sign(t):
-            '''statement : PARAMETER SIGN id_list'''
-            add_parameters(t[3], Sign(t[2]))
-
-        # Helper to add parameters to the symbol table.
-        def add_parameters(parameters, sign):
-            for id in parameters:
-                self.symbol_table[id] = Parameter(id, sign)
-
-        # List of ids.
-        def p_id_list(t):
-            '''id_list : ID
-                       | id_list ID '''
-            if len(t) == 2: # Single id.
-                t[0] = [t[1]]
-            else: # Concatenated ids.
-                t[1].append(t[2])
-                t[0] = t[1]
-
-        # Evaluate an expression.
-        def p_statement_expr(t):
-            '''statement : expression
-                         | constraint'''
-            self.statements.append(t[1])
-
-        # Top level error catching.
-        def p_statement_error(t):
-            '''statement : expression error
-                         | constraint error'''
-            raise Exception("Invalid syntax after '%s'." % str(t[1]))
-
-        # Binary arithmetic and boolean operators.
-        def p_expression_arith_binop(t):
-            '''expression : expression PLUS expression
-                          | expression MINUS expression
-                          | expression TIMES expression
-                          | expression DIVIDE expression'''
-            if t[2]   == '+': t[0] = t[1] + t[3]
-            elif t[2] == '-': t[0] = t[1] - t[3]
-            elif t[2] == '*': t[0] = t[1] * t[3]
-            elif t[2] == '/': t[0] = t[1] / t[3]
-
-        def p_expression_bool_binop(t):
-            '''constraint : expression EQUALS expression
-                          | expression LEQ expression
-                          | expression GEQ expression'''
-            if t[2]   == '==': t[0] = t[1].__eq__(t[3])
-            elif t[2] == '<=': t[0] = t[1].__le__(t[3])
-            elif t[2] == '>=': t[0] = t[1].__ge__(t[3])
-
-        # Raise error for multiple constraints.
-        def p_expression_bool_binop_errors(t):
-            '''constraint : constraint EQUALS expression
-                          | constraint LEQ expression
-                          | constraint GEQ expression'''
-            raise Exception("An expression can only contain one constraint.")
-
-        # Utility function to convert an atom and expression list to a string.
-        # Returns the function call as a string and whether there are missing
-        # arguments.
-        def get_atom_string(atom, expression_list):
-            args = [str(arg) for arg in expression_list]
-            missing_args = '' in args
-            return (atom + "(" + ", ".join(args) + ")", missing_args)
-
-        # Atomic function.
-        def p_expression_atom(t):
-            'expression : ID LPAREN expression_list RPAREN'
-            if not t[1] in self.atom_dict:
-                raise Exception("'%s' is not a known function." % t[1])
-            atom = self.atom_dict[t[1]]
-            # Check if missing arguments.
-            (atom_str, missing_args) = get_atom_string(t[1], t[3])
-            if missing_args:
-                raise Exception("Missing arguments in '%s'." % atom_str)
-            try:
-                t[0] = atom(*t[3])
-            except TypeError:
-                raise Exception("Incorrect number of arguments in '%s'." % atom_str)
-
-        # Catch all error for atomic function.
-        def p_expression_atom_error(t):
-            '''expression : ID LPAREN error RPAREN'''
-            raise Exception("Syntax error in call to '%s'." % t[1])
-
-        # List of expressions.
-        # Single expression or STRING_ARG.
-        def p_expression_list_single(t):
-            '''expression_list : expression_or_empty
-                               | STRING_ARG'''
-            t[0] = [t[1]]
+    def __init__(self, symbol_table, atoms, nodes=None):
+        self.symbol_table = symbol_table
+        self.atoms = atoms
+        self.statements = []
+        self.spans = []
+        self.nodes = NodeTable() if nodes is None else nodes
+        self.line = None
+        self.errors = 0
 
-        # Concatenated expressions or STRING_ARGs.
-        def p_expression_list_multi(t):
-            '''expression_list : expression_list COMMA expression_or_empty
-                               | expression_list COMMA STRING_ARG'''
-            t[1].append(t[3])
-            t[0] = t[1]
+    # Maps atomic function names to functions that build Expressions.
+    @property
+    def atom_dict(self):
+        return self.atoms.functions
 
-        # Error productions for expression lists with missing arguments.
-        def p_expression_or_empty(t):
-            '''expression_or_empty :
-                                   | expression '''
-            t[0] = '' if len(t) == 1 else t[1]
-
-        # Unary plus and minus.
-        def p_expression_uplus(t):
-            'expression : PLUS expression %prec UPLUS'
-            t[0] = t[2]
-
-        def p_expression_uminus(t):
-            'expression : MINUS expression %prec UMINUS'
-            t[0] = -t[2]
-
-        # Parenthesized expression.
-        def p_expression_group(t):
-            'expression : LPAREN expression RPAREN'
-            t[2].add_parens()
-            t[0] = t[2]
-
-        # Raw number.
-        def p_expression_number(t):
-            '''expression : INT
-                          | FLOAT'''
-            t[0] = Constant(t[1])
-
-        # Variable or parameter.
-        def p_expression_id(t):
-            'expression : ID'
-            try:
-                t[0] = self.symbol_table[t[1]]
-            except LookupError:
-                raise Exception("'%s' is not a known variable or parameter." % t[1])
+    # Records statement, parsed from the current line, and the span tree
+    # of its nodes (see Spans.from_tree).
+    def add_statement(self, statement, span):
+        self.statements.append(statement)
+        self.spans.append(Spans.from_tree(self.line, span))
 
+    # Records a syntax error reported by the parsing engine.
+    def syntax_error(self, t):
+        self.errors += 1
 
-        def p_error(t):
-            self.errors += 1
+    # Helper to add variables to the symbol table.
+    def add_variables(self, variables, sign):
+        for id in variables:
+            self.symbol_table[id] = Variable(id, sign)
+
+    # Helper to add parameters to the symbol table.
+    def add_parameters(self, parameters, sign):
+        for id in parameters:
+            self.symbol_table[id] = Parameter(id, sign)
+
+
+class SymbolTable(Mapping):
+    """
+    An immutable snapshot of declared variables and parameters, backed
+    by a read-only mapping. Build one from preamble text once and attach
+    it to any number of Parsers with Parser(symbols=...).
+    """
+    def __init__(self, symbols=()):
+        self._symbols = types.MappingProxyType(dict(symbols))
+        self._digest = None
+
+    # A hash of the declarations, the same for equal tables.
+    # Computed on first use.
+    @property
+    def digest(self):
+        if self._digest is None:
+            declarations = sorted("%s %s %s" % (symbol.__class__.__name__, name,
+                                                symbol.sign)
+                                  for (name, symbol) in self._symbols.items())
+            self._digest = hashlib.sha1('\n'.join(declarations).encode('utf-8')).hexdigest()
+        return self._digest
+
+    # Parses preamble (text or a list of lines) into a SymbolTable.
+    @classmethod
+    def from_preamble(cls, preamble, backend='ply'):
+        if isinstance(preamble, (list, tuple)):
+            preamble = '\n'.join(preamble)
+        parser = Parser(backend=backend)
+        parser.parse(preamble)
+        return parser.snapshot()
+
+    def __getitem__(self, name):
+        return self._symbols[name]
+
+    def __iter__(self):
+        return iter(self._symbols)
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __repr__(self):
+        return "SymbolTable(%s)" % repr(dict(self._symbols))
+
+
+class Grammar(object):
+    """
+    Constructs a yacc parser for convex optimization expressions.
+    Based on http://www.dabeaz.com/ply/example.html
+    Tokens come from dcp_parser.lexer rather than ply.lex.
+    Building the LALR tables is expensive, so a single Grammar
+    is built per process (see Grammar.get) and shared by all Parsers.
+    Productions reach the ParseContext of the current parse through
+    t.parser.owner; the Grammar itself holds no per-parse state.
+    Every expression symbol carries the span tree of its node as span
+    (see Spans.from_tree); a token's span is its own.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    # Returns the process-wide Grammar, building it on first use.
+    # Threads that ask for it at the same time get the same Grammar.
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.atom_dict = atom_loader.ATOMS.functions
+        self.parser = self.load_tables()
+        if self.parser is None:
+            warnings.warn("dcp_parser tables are missing or stale; "
+                          "run 'python -m dcp_parser.build_tables'.")
+            self.parser = self.build_tables()
+
+    # Hash of everything the LALR tables are generated from.
+    # build_tables records it in parsetab.py, so tables left over from
+    # an older grammar are rejected instead of silently misparsing.
+    def signature(self):
+        parts = [repr(self.tokens), repr(self.precedence)]
+        for (name, rule) in sorted(self.rules().items()):
+            parts.append(name + ':' + (rule.__doc__ or ''))
+        return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    # Maps production function names to the bound productions.
+    def rules(self):
+        return dict((name, getattr(self, name)) for name in dir(self)
+                    if name.startswith('p_'))
+
+    # Loads the shipped parsetab.py without reflecting over the grammar.
+    # Returns None if it is missing or stale.
+    def load_tables(self):
+        try:
+            from dcp_parser import parsetab
+        except ImportError:
+            return None
+        if getattr(parsetab, '_lr_signature', None) != self.signature():
+            return None
+        lr = ply.yacc.LRTable()
+        lr.read_table(parsetab)
+        lr.bind_callables(self.rules())
+        return ply.yacc.LRParser(lr, self.p_error)
+
+    # Generates the LALR tables in memory, without writing files.
+    def build_tables(self):
+        return ply.yacc.yacc(module=self, debug=False, write_tables=False,
+                             tabmodule="dcp_parser.parsetab")
+
+    # Parses a single line on behalf of owner, a ParseContext.
+    # The LR parser is a cheap shallow copy of the shared one and the
+    # lexer is created per parse, so concurrent parses never see each
+    # other's stacks. PLY's only module-level parse state backs its
+    # deprecated global errok(), which the grammar does not use.
+    def parse(self, line, owner):
+        parser = copy.copy(self.parser)
+        parser.owner = owner
+        # PLY passes None at the end of input, so the error handler
+        # is bound to the owner rather than found through the token.
+        parser.errorfunc = owner.syntax_error
+        return parser.parse(line, lexer=PlyLexer())
+
+    # Token types produced by dcp_parser.lexer.
+    tokens = TOKENS
+
+    # Parser definition
+    precedence = (
+        ('nonassoc', 'EQUALS', 'LEQ', 'GEQ'),
+        ('left','PLUS','MINUS'),
+        ('left','TIMES','DIVIDE'),
+        ('right','UMINUS', 'UPLUS'),
+        )
+
+    # Add variables to the symbol table.
+    # No sign given, defaults to UNKNOWN
+    def p_statement_variables(self, t):
+        '''statement : VARIABLE id_list'''
+        t.parser.owner.add_variables(t[2], Sign.UNKNOWN)
+
+    # Sign given
+    def p_statement_variables_sign(self, t):
+        '''statement : VARIABLE SIGN id_list'''
+        t.parser.owner.add_variables(t[3], Sign(t[2]))
+
+    # Add parameters to the symbol table.
+    # No sign given, defaults to UNKNOWN
+    def p_statement_parameters(self, t):
+        '''statement : PARAMETER id_list'''
+        t.parser.owner.add_parameters(t[2], Sign.UNKNOWN)
+
+    # Sign given
+    def p_statement_parameters_sign(self, t):
+        '''statement : PARAMETER SIGN id_list'''
+        t.parser.owner.add_parameters(t[3], Sign(t[2]))
+
+    # List of ids.
+    def p_id_list(self, t):
+        '''id_list : ID
+                   | id_list ID '''
+        if len(t) == 2: # Single id.
+            t[0] = [t[1]]
+        else: # Concatenated ids.
+            t[1].append(t[2])
+            t[0] = t[1]
 
-        # Build the parser, tabmodule set so it loads parsetab.py
-        return ply.yacc.yacc(tabmodule="dcp_parser.parsetab")
+    # Evaluate an expression.
+    def p_statement_expr(self, t):
+        '''statement : expression
+                     | constraint'''
+        t.parser.owner.add_statement(t[1], t.slice[1].span)
+
+    # Top level error catching.
+    def p_statement_error(self, t):
+        '''statement : expression error
+                     | constraint error'''
+        raise Exception("Invalid syntax after '%s'." % str(t[1]))
+
+    # Binary arithmetic and boolean operators.
+    def p_expression_arith_binop(self, t):
+        '''expression : expression PLUS expression
+                      | expression MINUS expression
+                      | expression TIMES expression
+                      | expression DIVIDE expression'''
+        nodes = t.parser.owner.nodes
+        if t[2]   == '+': t[0] = nodes.operation(operator.add, t[1], t[3])
+        elif t[2] == '-': t[0] = nodes.operation(operator.sub, t[1], t[3])
+        elif t[2] == '*': t[0] = nodes.operation(operator.mul, t[1], t[3])
+        elif t[2] == '/': t[0] = nodes.operation(operator.truediv, t[1], t[3])
+        Grammar.binary_span(t)
+
+    def p_expression_bool_binop(self, t):
+        '''constraint : expression EQUALS expression
+                      | expression LEQ expression
+                      | expression GEQ expression'''
+        if t[2]   == '==': t[0] = t[1].__eq__(t[3])
+        elif t[2] == '<=': t[0] = t[1].__le__(t[3])
+        elif t[2] == '>=': t[0] = t[1].__ge__(t[3])
+        Grammar.binary_span(t)
+
+    # The span tree of a binary operation or constraint.
+    @staticmethod
+    def binary_span(t):
+        (lh_span, rh_span) = (t.slice[1].span, t.slice[3].span)
+        t.slice[0].span = (lh_span[0], rh_span[1], (lh_span, rh_span))
+
+    # Raise error for multiple constraints.
+    def p_expression_bool_binop_errors(self, t):
+        '''constraint : constraint EQUALS expression
+                      | constraint LEQ expression
+                      | constraint GEQ expression'''
+        raise Exception("An expression can only contain one constraint.")
+
+    # Atomic function.
+    def p_expression_atom(self, t):
+        'expression : ID LPAREN expression_list RPAREN'
+        atom_dict = t.parser.owner.atom_dict
+        if not t[1] in atom_dict:
+            raise Exception("'%s' is not a known function." % t[1])
+        atom = atom_dict[t[1]]
+        atom_loader.check_atom_call(t[1], atom, t[3])
+        t[0] = t.parser.owner.nodes.atom(t[1], atom, t[3])
+        t.slice[0].span = (t.slice[1].lexpos, t.slice[4].end,
+                           atom_children(t[0].subexpressions, t[3], t.slice[3].span))
+
+    # Catch all error for atomic function.
+    def p_expression_atom_error(self, t):
+        '''expression : ID LPAREN error RPAREN'''
+        raise Exception("Syntax error in call to '%s'." % t[1])
+
+    # List of expressions.
+    # Single expression or STRING_ARG.
+    def p_expression_list_single(self, t):
+        '''expression_list : expression_or_empty
+                           | STRING_ARG'''
+        t[0] = [t[1]]
+        t.slice[0].span = [t.slice[1].span]
+
+    # Concatenated expressions or STRING_ARGs.
+    def p_expression_list_multi(self, t):
+        '''expression_list : expression_list COMMA expression_or_empty
+                           | expression_list COMMA STRING_ARG'''
+        t[1].append(t[3])
+        t[0] = t[1]
+        t.slice[1].span.append(t.slice[3].span)
+        t.slice[0].span = t.slice[1].span
+
+    # Error productions for expression lists with missing arguments.
+    def p_expression_or_empty(self, t):
+        '''expression_or_empty :
+                               | expression '''
+        t[0] = '' if len(t) == 1 else t[1]
+        t.slice[0].span = None if len(t) == 1 else t.slice[1].span
+
+    # Unary plus and minus.
+    def p_expression_uplus(self, t):
+        'expression : PLUS expression %prec UPLUS'
+        t[0] = t[2]
+        span = t.slice[2].span
+        t.slice[0].span = (t.slice[1].lexpos, span[1], span[2])
+
+    def p_expression_uminus(self, t):
+        'expression : MINUS expression %prec UMINUS'
+        t[0] = t.parser.owner.nodes.operation(operator.neg, t[2])
+        span = t.slice[2].span
+        t.slice[0].span = (t.slice[1].lexpos, span[1], (span,))
+
+    # Parenthesized expression.
+    def p_expression_group(self, t):
+        'expression : LPAREN expression RPAREN'
+        t[0] = t.parser.owner.nodes.operation(Expression.parenthesized, t[2])
+        # The group has the children of the expression inside it.
+        t.slice[0].span = (t.slice[1].lexpos, t.slice[3].end, t.slice[2].span[2])
+
+    # Raw number.
+    def p_expression_number(self, t):
+        '''expression : INT
+                      | FLOAT'''
+        t[0] = t.parser.owner.nodes.constant(t[1])
+        t.slice[0].span = t.slice[1].span
+
+    # Variable or parameter.
+    def p_expression_id(self, t):
+        'expression : ID'
+        try:
+            t[0] = t.parser.owner.symbol_table[t[1]]
+        except LookupError:
+            raise Exception("'%s' is not a known variable or parameter." % t[1])
+        t.slice[0].span = t.slice[1].span
+
+    # PLY requires an error handler when building the tables;
+    # Grammar.parse replaces it with the owner's for every parse.
+    def p_error(self, t):
+        pass
+
+# Parsing engines selectable through Parser(backend=...).
+BACKENDS = {'ply': Grammar, 'pratt': Pratt}
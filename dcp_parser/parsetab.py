@@ -0,0 +1,64 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'f6ca17d334c1a6fbbc364d7b77dee07c1aebed31'
+    
+_lr_action_items = {'VARIABLE':([0,],[2,]),'PARAMETER':([0,],[3,]),'ID':([0,2,3,6,7,9,12,13,14,15,16,18,19,20,21,22,23,24,26,27,28,31,33,34,35,53,],[8,14,14,8,8,8,33,14,-5,33,14,8,8,8,8,8,8,8,8,8,8,8,-6,33,33,8,]),'PLUS':([0,4,6,7,8,9,10,11,18,19,20,21,22,23,24,26,27,28,29,30,31,32,36,37,38,39,40,41,42,43,44,45,50,51,52,53,54,],[6,18,6,6,-34,6,-32,-33,6,6,6,6,6,6,6,6,6,6,-29,-30,6,18,-11,-12,-13,-14,18,18,18,18,18,18,18,-31,-21,6,-22,]),'MINUS':([0,4,6,7,8,9,10,11,18,19,20,21,22,23,24,26,27,28,29,30,31,32,36,37,38,39,40,41,42,43,44,45,50,51,52,53,54,],[7,19,7,7,-34,7,-32,-33,7,7,7,7,7,7,7,7,7,7,-29,-30,7,19,-11,-12,-13,-14,19,19,19,19,19,19,19,-31,-21,7,-22,]),'LPAREN':([0,6,7,8,9,18,19,20,21,22,23,24,26,27,28,31,53,],[9,9,9,31,9,9,9,9,9,9,9,9,9,9,9,9,9,]),'INT':([0,6,7,9,18,19,20,21,22,23,24,26,27,28,31,53,],[10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,]),'FLOAT':([0,6,7,9,18,19,20,21,22,23,24,26,27,28,31,53,],[11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,]),'$end':([1,4,5,8,10,11,12,14,15,17,25,29,30,33,34,35,36,37,38,39,40,41,42,43,44,45,51,52,54,],[0,-7,-8,-34,-32,-33,-1,-5,-3,-9,-10,-29,-30,-6,-2,-4,-11,-12,-13,-14,-15,-16,-17,-18,-19,-20,-31,-21,-22,]),'SIGN':([2,3,],[13,16,]),'error':([4,5,8,10,11,29,30,31,36,37,38,39,40,41,42,43,44,45,51,52,54,],[17,25,-34,-32,-33,-29,-30,47,-11,-12,-13,-14,-15,-16,-17,-18,-19,-20,-31,-21,-22,]),'TIMES':([4,8,10,11,29,30,32,36,37,38,39,40,41,42,43,44,45,50,51,52,54,],[20,-34,-32,-33,-29,-30,20,20,20,-13,-14,20,20,20,20,20,20,20,-31,-21,-22,]),'DIVIDE':([4,8,10,11,29,30,32,36,37,38,39,40,41,42,43,44,45,50,51,52,54,],[21,-34,-32,-33,-29,-30,21,21,21,-13,-14,21,21,21,21,21,21,21,-31,-21,-22,]),'EQUALS':([4,5,8,10,11,29,30,36,37,38,39,40,41,42,43,44,45,51,52,54,],[22,26,-34,-32,-33,-29,-30,-11,-12,-13,-14,-15,-16,-17,-18,-19,-20,-31,-21,-22,]),'LEQ':([4,5,8,10,11,29,30,36,37,38,39,40,41,42,43,44,45,51,52,54,],[23,27,-34,-32,-33,-29,-30,-11,-12,-13,-14,-15,-16,-17,-18,-19,-20,-31,-21,-22,]),'GEQ':([4,5,8,10,11,29,30,36,37,38,39,40,41,42,43,44,45,51,52,54,],[24,28,-34,-32,-33,-29,-30,-11,-12,-13,-14,-15,-16,-17,-18,-19,-20,-31,-21,-22,]),'RPAREN':([8,10,11,29,30,31,32,36,37,38,39,46,47,48,49,50,51,52,53,54,55,56,],[-34,-32,-33,-29,-30,-27,51,-11,-12,-13,-14,52,54,-23,-24,-28,-31,-21,-27,-22,-25,-26,]),'COMMA':([8,10,11,29,30,31,36,37,38,39,46,48,49,50,51,52,53,54,55,56,],[-34,-32,-33,-29,-30,-27,-11,-12,-13,-14,53,-23,-24,-28,-31,-21,-27,-22,-25,-26,]),'STRING_ARG':([31,53,],[49,56,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'statement':([0,],[1,]),'expression':([0,6,7,9,18,19,20,21,22,23,24,26,27,28,31,53,],[4,29,30,32,36,37,38,39,40,41,42,43,44,45,50,50,]),'constraint':([0,],[5,]),'id_list':([2,3,13,16,],[12,15,34,35,]),'expression_list':([31,],[46,]),'expression_or_empty':([31,53,],[48,55,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> statement","S'",1,None,None,None),
+  ('statement -> VARIABLE id_list','statement',2,'p_statement_variables','parser.py',162),
+  ('statement -> VARIABLE SIGN id_list','statement',3,'p_statement_variables_sign','parser.py',167),
+  ('statement -> PARAMETER id_list','statement',2,'p_statement_parameters','parser.py',173),
+  ('statement -> PARAMETER SIGN id_list','statement',3,'p_statement_parameters_sign','parser.py',178),
+  ('id_list -> ID','id_list',1,'p_id_list','parser.py',183),
+  ('id_list -> id_list ID','id_list',2,'p_id_list','parser.py',184),
+  ('statement -> expression','statement',1,'p_statement_expr','parser.py',193),
+  ('statement -> constraint','statement',1,'p_statement_expr','parser.py',194),
+  ('statement -> expression error','statement',2,'p_statement_error','parser.py',199),
+  ('statement -> constraint error','statement',2,'p_statement_error','parser.py',200),
+  ('expression -> expression PLUS expression','expression',3,'p_expression_arith_binop','parser.py',205),
+  ('expression -> expression MINUS expression','expression',3,'p_expression_arith_binop','parser.py',206),
+  ('expression -> expression TIMES expression','expression',3,'p_expression_arith_binop','parser.py',207),
+  ('expression -> expression DIVIDE expression','expression',3,'p_expression_arith_binop','parser.py',208),
+  ('constraint -> expression EQUALS expression','constraint',3,'p_expression_bool_binop','parser.py',215),
+  ('constraint -> expression LEQ expression','constraint',3,'p_expression_bool_binop','parser.py',216),
+  ('constraint -> expression GEQ expression','constraint',3,'p_expression_bool_binop','parser.py',217),
+  ('constraint -> constraint EQUALS expression','constraint',3,'p_expression_bool_binop_errors','parser.py',224),
+  ('constraint -> constraint LEQ expression','constraint',3,'p_expression_bool_binop_errors','parser.py',225),
+  ('constraint -> constraint GEQ expression','constraint',3,'p_expression_bool_binop_errors','parser.py',226),
+  ('expression -> ID LPAREN expression_list RPAREN','expression',4,'p_expression_atom','parser.py',240),
+  ('expression -> ID LPAREN error RPAREN','expression',4,'p_expression_atom_error','parser.py',255),
+  ('expression_list -> expression_or_empty','expression_list',1,'p_expression_list_single','parser.py',261),
+  ('expression_list -> STRING_ARG','expression_list',1,'p_expression_list_single','parser.py',262),
+  ('expression_list -> expression_list COMMA expression_or_empty','expression_list',3,'p_expression_list_multi','parser.py',267),
+  ('expression_list -> expression_list COMMA STRING_ARG','expression_list',3,'p_expression_list_multi','parser.py',268),
+  ('expression_or_empty -> <empty>','expression_or_empty',0,'p_expression_or_empty','parser.py',274),
+  ('expression_or_empty -> expression','expression_or_empty',1,'p_expression_or_empty','parser.py',275),
+  ('expression -> PLUS expression','expression',2,'p_expression_uplus','parser.py',280),
+  ('expression -> MINUS expression','expression',2,'p_expression_uminus','parser.py',284),
+  ('expression -> LPAREN expression RPAREN','expression',3,'p_expression_group','parser.py',289),
+  ('expression -> INT','expression',1,'p_expression_number','parser.py',295),
+  ('expression -> FLOAT','expression',1,'p_expression_number','parser.py',296),
+  ('expression -> ID','expression',1,'p_expression_id','parser.py',301),
+]
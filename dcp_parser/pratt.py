@@ -0,0 +1,315 @@
+from dcp_parser.expression.expression import Expression
+from dcp_parser.expression.sign import Sign
+from dcp_parser.expression.spans import atom_children
+from dcp_parser.lexer import tokenize
+import dcp_parser.atomic.atom_loader as atom_loader
+import functools
+import operator
+import threading
+
+END = ('$end', None, None, None, None)
+
+# Binding power of the binary arithmetic operators.
+# Unary plus and minus bind tighter than all of them.
+BINARY_POWER = {'PLUS': 10, 'MINUS': 10, 'TIMES': 20, 'DIVIDE': 20}
+UNARY_POWER = 30
+
+BINARY_OPS = {
+    'PLUS': operator.add,
+    'MINUS': operator.sub,
+    'TIMES': operator.mul,
+    'DIVIDE': operator.truediv,
+}
+
+COMPARISON_OPS = {
+    'EQUALS': lambda lh, rh: lh.__eq__(rh),
+    'LEQ': lambda lh, rh: lh.__le__(rh),
+    'GEQ': lambda lh, rh: lh.__ge__(rh),
+}
+
+
+class Pratt(object):
+    """
+    Recursive descent parser for the grammar in parser.py, using a
+    Pratt loop for the binary operators. It does not need PLY, and
+    builds the same Expressions, Constraints and error messages as
+    the LALR parser, including its recovery from syntax errors.
+    Like the LALR parser, it keeps its stack in a list (see
+    PrattParse.run), so nesting is not limited by Python's recursion.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    # Returns the process-wide Pratt parser, building it on first use.
+    @classmethod
+    def get(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.atom_dict = atom_loader.ATOMS.functions
+
+    # Parses a single line on behalf of owner, a ParseContext.
+    def parse(self, line, owner):
+        PrattParse(self, line, owner).parse()
+
+
+class PrattSyntaxError(Exception):
+    """
+    A token the grammar does not allow. Unwinds to the nearest call or
+    to the statement, which recover as PLY does. value is the complete
+    expression PLY's error recovery would reduce to, if any.
+    """
+    def __init__(self, token, value=None):
+        self.token = token
+        self.value = value
+        super(PrattSyntaxError, self).__init__(token)
+
+    # Records what an operator whose right operand failed reduces to.
+    # A complete operand is still combined, otherwise only the left
+    # operand remains. At the end of input PLY reduces nothing.
+    def reduce(self, combine, left):
+        if self.token is not END:
+            if self.value is None:
+                self.value = left
+            else:
+                self.value = combine(left, self.value)
+
+
+class PrattParse(object):
+    """
+    The state of parsing one line: the token stream and one
+    token of lookahead. span is the span tree (see Spans.from_tree)
+    of the expression parsed last.
+    The rules that nest are generators. Instead of calling a nested
+    rule, a rule yields the generator of the call and is sent its
+    result, or has its exception thrown into it, by run.
+    """
+    def __init__(self, grammar, line, owner):
+        self.grammar = grammar
+        self.owner = owner
+        self.tokens = tokenize(line)
+        self.lookahead = None
+        self.span = None
+
+    # Returns the next token without consuming it.
+    def peek(self):
+        if self.lookahead is None:
+            self.lookahead = next(self.tokens, END)
+        return self.lookahead
+
+    # Consumes and returns the next token.
+    def next(self):
+        token = self.peek()
+        if token is not END:
+            self.lookahead = None
+        return token
+
+    # Runs the rule generator routine and the rules it calls on an
+    # explicit stack. Returns the result of routine or raises its error.
+    @staticmethod
+    def run(routine):
+        stack = [routine]
+        (value, error) = (None, None)
+        while True:
+            routine = stack[-1]
+            try:
+                if error is None:
+                    call = routine.send(value)
+                else:
+                    (call, error) = (routine.throw(error), None)
+            except StopIteration as e:
+                stack.pop()
+                if not stack:
+                    return e.value
+                value = e.value
+                continue
+            except Exception as e:
+                stack.pop()
+                if not stack:
+                    raise
+                error = e
+                continue
+            stack.append(call)
+            value = None
+
+    # Parses statements until one reaches the end of the line.
+    # As with PLY, a syntax error that leaves no complete expression
+    # discards the offending token and starts a new statement.
+    def parse(self):
+        while True:
+            try:
+                return self.run(self.statement())
+            except PrattSyntaxError as e:
+                self.owner.syntax_error(e.token)
+                if e.token is END:
+                    return
+                if e.value is not None:
+                    raise Exception("Invalid syntax after '%s'." % str(e.value))
+                self.next()
+
+    def statement(self):
+        if self.peek()[0] in ('VARIABLE', 'PARAMETER'):
+            return self.declaration()
+        result = yield self.expression(0)
+        span = self.span
+        constraint = False
+        while self.peek()[0] in COMPARISON_OPS:
+            op = COMPARISON_OPS[self.next()[0]]
+            if constraint:
+                op = self.extra_constraint
+            try:
+                rh_exp = yield self.expression(0)
+            except PrattSyntaxError as e:
+                e.reduce(op, result)
+                raise
+            result = op(result, rh_exp)
+            span = (span[0], self.span[1], (span, self.span))
+            constraint = True
+        if self.peek() is not END:
+            raise PrattSyntaxError(self.peek(), result)
+        self.owner.add_statement(result, span)
+
+    # Raise error for multiple constraints.
+    @staticmethod
+    def extra_constraint(lh_exp, rh_exp):
+        raise Exception("An expression can only contain one constraint.")
+
+    # Add variables or parameters to the symbol table.
+    def declaration(self):
+        kind = self.next()[0]
+        sign = Sign.UNKNOWN
+        if self.peek()[0] == 'SIGN':
+            sign = Sign(self.next()[1])
+        ids = []
+        while self.peek()[0] == 'ID':
+            ids.append(self.next()[1])
+        if len(ids) == 0 or self.peek() is not END:
+            raise PrattSyntaxError(self.peek())
+        if kind == 'VARIABLE':
+            self.owner.add_variables(ids, sign)
+        else:
+            self.owner.add_parameters(ids, sign)
+
+    # Parses operators that bind tighter than power.
+    def expression(self, power):
+        result = yield self.prefix()
+        span = self.span
+        while BINARY_POWER.get(self.peek()[0], 0) > power:
+            kind = self.next()[0]
+            op = functools.partial(self.owner.nodes.operation, BINARY_OPS[kind])
+            try:
+                rh_exp = yield self.expression(BINARY_POWER[kind])
+            except PrattSyntaxError as e:
+                e.reduce(op, result)
+                raise
+            result = op(result, rh_exp)
+            span = (span[0], self.span[1], (span, self.span))
+        self.span = span
+        return result
+
+    # Unary operators, numbers, names, calls and parenthesized expressions.
+    # Every reduction peeks at the following token first, as PLY does.
+    def prefix(self):
+        token = self.peek()
+        (kind, value) = token[:2]
+        if kind in ('PLUS', 'MINUS'):
+            self.next()
+            try:
+                operand = yield self.expression(UNARY_POWER)
+            except PrattSyntaxError as e:
+                if kind == 'MINUS' and e.value is not None:
+                    e.value = self.owner.nodes.operation(operator.neg, e.value)
+                raise
+            span = self.span
+            if kind == 'PLUS':
+                self.span = (token[3], span[1], span[2])
+                return operand
+            self.span = (token[3], span[1], (span,))
+            return self.owner.nodes.operation(operator.neg, operand)
+        elif kind in ('INT', 'FLOAT'):
+            self.next()
+            self.peek()
+            self.span = (token[3], token[4], ())
+            return self.owner.nodes.constant(value)
+        elif kind == 'ID':
+            self.next()
+            if self.peek()[0] == 'LPAREN':
+                return (yield self.call(value, token[3]))
+            try:
+                result = self.owner.symbol_table[value]
+            except LookupError:
+                raise Exception("'%s' is not a known variable or parameter." % value)
+            self.span = (token[3], token[4], ())
+            return result
+        elif kind == 'LPAREN':
+            self.next()
+            try:
+                result = yield self.expression(0)
+                if self.peek()[0] != 'RPAREN':
+                    raise PrattSyntaxError(self.peek())
+            except PrattSyntaxError as e:
+                # PLY abandons an unclosed group.
+                e.value = None
+                raise
+            end = self.next()[4]
+            self.peek()
+            # The group has the children of the expression inside it.
+            self.span = (token[3], end, self.span[2])
+            return self.owner.nodes.operation(Expression.parenthesized, result)
+        raise PrattSyntaxError(self.peek())
+
+    # Atomic function. A syntax error in the arguments skips to the next
+    # closing parenthesis before being reported, as PLY's error rule does.
+    # start is the column of atom_name.
+    def call(self, atom_name, start):
+        self.next()
+        try:
+            (args, arg_spans, end) = yield self.arguments()
+        except PrattSyntaxError as e:
+            if e.token is END:
+                raise
+            token = self.next()
+            while token[0] != 'RPAREN':
+                if token is END:
+                    raise PrattSyntaxError(END)
+                token = self.next()
+            self.peek()
+            raise Exception("Syntax error in call to '%s'." % atom_name)
+        self.peek()
+        atom_dict = self.owner.atom_dict
+        if not atom_name in atom_dict:
+            raise Exception("'%s' is not a known function." % atom_name)
+        atom = atom_dict[atom_name]
+        atom_loader.check_atom_call(atom_name, atom, args)
+        result = self.owner.nodes.atom(atom_name, atom, args)
+        self.span = (start, end, atom_children(result.subexpressions, args, arg_spans))
+        return result
+
+    # Comma separated expressions, STRING_ARGs or empty arguments,
+    # up to and including the closing parenthesis. Returns the arguments,
+    # their span trees (None for those that are not expressions) and the
+    # column after the closing parenthesis.
+    def arguments(self):
+        (args, spans) = ([], [])
+        while True:
+            (kind, value) = self.peek()[:2]
+            if kind == 'STRING_ARG':
+                self.next()
+                args.append(value)
+                spans.append(None)
+            elif kind in ('COMMA', 'RPAREN'):
+                args.append('')
+                spans.append(None)
+            else:
+                args.append((yield self.expression(0)))
+                spans.append(self.span)
+            kind = self.peek()[0]
+            if kind == 'RPAREN':
+                return (args, spans, self.next()[4])
+            elif kind != 'COMMA':
+                raise PrattSyntaxError(self.peek())
+            self.next()
@@ -0,0 +1,45 @@
+import ast
+import os
+
+# Returns the statements each test in test_parser.py parses, in order,
+# as a list of lists. Used to run the same inputs through every backend.
+def parser_corpus():
+    path = os.path.join(os.path.dirname(__file__), 'test_parser.py')
+    with open(path) as source:
+        tree = ast.parse(source.read())
+    corpus = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name.startswith('test_'):
+            statements = test_statements(node)
+            if len(statements) > 0:
+                corpus.append(statements)
+    return corpus
+
+# The strings passed to parser.parse in one test, resolving names
+# to the string last assigned to them. Computed strings are skipped.
+def test_statements(test):
+    nodes = sorted((n for n in ast.walk(test) if isinstance(n, (ast.Assign, ast.Call))),
+                   key=lambda n: (n.lineno, n.col_offset))
+    names = {}
+    statements = []
+    for node in nodes:
+        if isinstance(node, ast.Assign):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                continue
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    names[target.id] = value
+        elif isinstance(node.func, ast.Attribute) and node.func.attr == 'parse':
+            arg = node.args[0]
+            if isinstance(arg, ast.Name):
+                if arg.id in names:
+                    statements.append(names[arg.id])
+            else:
+                try:
+                    statements.append(ast.literal_eval(arg))
+                except ValueError:
+                    # Computed, e.g. by a loop.
+                    pass
+    return statements
@@ -24,5 +24,45 @@ class TestAtomLoader(object):
     # Test creation of atom dict
     def test_generate_atom_dict(self):
         atom_dict = generate_atom_dict()
-        assert_equals(len(atom_dict), len(get_subclasses(Atom)))
-        assert('square' in atom_dict)
\ No newline at end of file
+        assert_equals(sorted(atom_dict), sorted(ATOMS))
+        for name in atom_dict:
+            assert ATOMS[name].atom_class in get_subclasses(Atom)
+        assert('square' in atom_dict)
+    # Test that every atom built by an atomic function, including the
+    # atoms it is defined in terms of, is analyzed exactly once.
+    def test_single_evaluation(self):
+        counts = {}
+        # Keeps the atoms alive, so their ids are not reused.
+        instances = []
+        def counted(method, original):
+            def wrapper(self, *args):
+                instances.append(self)
+                key = (id(self), method)
+                counts[key] = counts.get(key, 0) + 1
+                return original(self, *args)
+            return wrapper
+        methods = ['sign', 'signed_curvature', 'monotonicity']
+        patched = []
+        for cls in [Atom] + get_subclasses(Atom):
+            for method in methods:
+                if method in cls.__dict__:
+                    patched.append((cls, method, cls.__dict__[method]))
+                    setattr(cls, method, counted(method, cls.__dict__[method]))
+        try:
+            atom_dict = generate_atom_dict()
+            x = Variable('x')
+            y = Variable('y', Sign.NEGATIVE)
+            calls = [('huber_circ', [x, y, Constant(2)]), ('sum_square_abs', [x, y]),
+                     ('pow_pos', [x, Constant(3)]), ('norm', [x, y, 'Inf']),
+                     ('max', [x, y, self.cvx_pos]), ('square', [x - y])]
+            for (name, args) in calls:
+                counts.clear()
+                atom_dict[name](*args)
+                atoms = set(key[0] for key in counts)
+                assert len(atoms) >= 1
+                for atom in atoms:
+                    for method in methods:
+                        assert_equals(counts[(atom, method)], 1)
+        finally:
+            for (cls, method, original) in patched:
+                setattr(cls, method, original)
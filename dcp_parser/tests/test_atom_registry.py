@@ -0,0 +1,174 @@
+from dcp_parser.atomic.atom_registry import AtomRegistry, AtomInfo, AtomSignature
+from dcp_parser.atomic.atom_loader import ATOMS
+from dcp_parser.atomic.atoms import Atom
+from dcp_parser.atomic.monotonicity import Monotonicity
+from dcp_parser.expression.curvature import Curvature
+from dcp_parser.expression.sign import Sign
+from dcp_parser.parser import Parser
+from nose.tools import assert_equals
+
+class Double(Atom):
+    """ 2x, a custom atom for the tests. """
+    def __init__(self, x):
+        super(Double, self).__init__(x)
+
+    def sign(self):
+        return self.args[0].sign
+
+    def signed_curvature(self):
+        return Curvature.AFFINE
+
+    def monotonicity(self):
+        return [Monotonicity.INCREASING]
+
+class Counted(Atom):
+    """ x, counting its instances. sign raises a TypeError for zero x. """
+    instances = []
+
+    def __init__(self, x):
+        Counted.instances.append(self)
+        super(Counted, self).__init__(x)
+
+    def sign(self):
+        if self.args[0].sign == Sign.ZERO:
+            raise TypeError("Zero argument.")
+        return self.args[0].sign
+
+    def signed_curvature(self):
+        return Curvature.AFFINE
+
+    def monotonicity(self):
+        return [Monotonicity.INCREASING]
+
+class TestAtomRegistry(object):
+    """ Unit tests for the atomic/atom_registry module. """
+    # Test the metadata read from the atom classes.
+    def test_metadata(self):
+        assert ATOMS.frozen
+        norm = ATOMS['norm']
+        assert norm.variadic
+        assert_equals((norm.min_args, norm.max_args), (1, None))
+        assert_equals(norm.defaults, {'parameter': 2})
+        huber = ATOMS['huber']
+        assert not huber.variadic
+        assert huber.parameterized
+        assert_equals((huber.min_args, huber.max_args), (1, 2))
+        assert_equals(huber.defaults, {'M': 1})
+        assert_equals((ATOMS['kl_div'].min_args, ATOMS['kl_div'].max_args), (2, 2))
+        assert not ATOMS['square'].parameterized
+        # Subclasses of parameterized atoms fix the parameter.
+        for name in ['abs', 'norm1', 'norm2', 'norm_inf', 'square_abs', 'square_pos']:
+            assert not ATOMS[name].parameterized
+            assert_equals(ATOMS[name].signature.parameter, None)
+        # Classes defined after import are not registered.
+        assert not 'double' in ATOMS
+
+    # Test that the registry cannot change after import.
+    def test_frozen(self):
+        try:
+            ATOMS.register(Double)
+            assert False
+        except Exception as e:
+            assert_equals(str(e), "Cannot register 'double'; the atom registry is frozen.")
+        try:
+            ATOMS.functions['double'] = None
+            assert False
+        except TypeError:
+            pass
+
+    # Test parsers with extended and restricted atom sets.
+    def test_custom_atoms(self):
+        extended = ATOMS.extend([Double])
+        assert_equals(len(extended), len(ATOMS) + 1)
+        assert extended.functions['square'] is ATOMS.functions['square']
+        restricted = ATOMS.restrict(['square'])
+        assert_equals(list(restricted), ['square'])
+        try:
+            ATOMS.restrict(['cube'])
+            assert False
+        except Exception as e:
+            assert_equals(str(e), "'cube' is not a known function.")
+
+        for backend in ['ply', 'pratt']:
+            parser = Parser(backend=backend, atoms=extended)
+            parser.parse('variable positive x')
+            parser.parse('square(double(x))')
+            exp = parser.statements[0]
+            assert_equals(str(exp), 'square(double(x))')
+            assert_equals(exp.curvature, Curvature.CONVEX)
+            assert_equals(exp.subexpressions[0].sign, Sign.POSITIVE)
+
+            parser = Parser(backend=backend, atoms=restricted)
+            parser.parse('variable x')
+            parser.parse('square(x)')
+            try:
+                parser.parse('max(x)')
+                assert False
+            except Exception as e:
+                assert_equals(str(e), "'max' is not a known function.")
+            # Other parsers keep every atom and not the custom ones.
+            parser = Parser(backend=backend)
+            assert parser.atom_dict is ATOMS.functions
+            parser.parse('variable x')
+            try:
+                parser.parse('double(x)')
+                assert False
+            except Exception as e:
+                assert_equals(str(e), "'double' is not a known function.")
+
+    # Test the compiled signatures.
+    def test_signatures(self):
+        norm = ATOMS['norm'].signature
+        assert norm is ATOMS['norm'].atom_class.SIGNATURE
+        assert_equals(norm.parameter, AtomSignature.TRAILING)
+        assert_equals(norm.default, 2)
+        assert_equals(norm.string_args, frozenset(['Inf']))
+        assert_equals(ATOMS['sum_largest'].signature.string_args, frozenset())
+        huber = ATOMS['huber'].signature
+        assert_equals((huber.parameter, huber.default), (1, 1))
+        assert huber.parameter_first
+        assert not ATOMS['pow_abs'].signature.parameter_first
+        assert_equals(ATOMS['norm1'].signature.parameter, None)
+        assert_equals((Double.SIGNATURE.min_args, Double.SIGNATURE.max_args), (1, 1))
+
+        parser = Parser()
+        parser.parse('variable x')
+        x = parser.symbol_table['x']
+        assert ATOMS['log'].signature.accepts([x])
+        assert not ATOMS['log'].signature.accepts([x, x])
+        assert not ATOMS['log'].signature.accepts(['Inf'])
+        assert norm.accepts([x, 'Inf'])
+        assert not norm.accepts(['Inf'])
+        # The parameter is checked first, so its error comes first.
+        try:
+            norm.accepts(['Inf', parser.nodes.constant(0.5)])
+            assert False
+        except Exception as e:
+            assert_equals(str(e), "Invalid value '0.5' for p in norm(..., p).")
+
+    # Test that calls are checked before the atoms are built.
+    def test_call_checks(self):
+        atoms = ATOMS.extend([Counted])
+        for backend in ['ply', 'pratt']:
+            parser = Parser(backend=backend, atoms=atoms)
+            parser.parse('variable x')
+            del Counted.instances[:]
+            for (text, error) in [
+                ('counted(x, x)', "Incorrect number of arguments in 'counted(x, x)'."),
+                ('counted(Inf)', "Incorrect number of arguments in 'counted(Inf)'."),
+                ('counted(x, )', "Missing arguments in 'counted(x, )'."),
+            ]:
+                try:
+                    parser.parse(text)
+                    assert False
+                except Exception as e:
+                    assert_equals(str(e), error)
+            assert_equals(Counted.instances, [])
+            # Errors raised by atoms are not mistaken for argument errors.
+            try:
+                parser.parse('counted(0)')
+                assert False
+            except TypeError as e:
+                assert_equals(str(e), "Zero argument.")
+            parser.parse('counted(x)')
+            assert_equals(len(Counted.instances), 2)
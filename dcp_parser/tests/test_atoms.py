@@ -52,6 +52,32 @@ class TestAtoms(object):
         args = [self.cvx_exp, self.aff_exp, self.aff_exp]
         assert_equals(Atom.dcp_curvature(Curvature.CONCAVE, args, monotonicities), Curvature.NONCONVEX)
 
+    # Test that atoms look up each argument's composition once, with the
+    # same curvature and errors as applying the composition rules.
+    def test_shared_composition(self):
+        from dcp_parser.error_messages.dcp_violation_factory import DCPViolationFactory
+        leaves = [Expression(curvature, sign, 'leaf') for curvature in Curvature.CURVATURES
+                  for sign in [Sign.POSITIVE, Sign.NEGATIVE, Sign.ZERO, Sign.UNKNOWN]]
+        for atom in [Max, Min, Sum, Log_sum_exp, Geo_mean, Kl_div]:
+            for (lh, rh) in zip(leaves, reversed(leaves)):
+                try:
+                    instance = atom(lh, rh)
+                except Exception:
+                    continue
+                curvature = instance.signed_curvature()
+                expected = [monotonicity.composition_rule(curvature, arg.curvature)
+                            for (arg, monotonicity) in zip(instance.args, instance.monotonicity())]
+                assert_equals(instance.curvature(), Curvature.sum(expected))
+                assert instance.argument_dcp_curvatures() is instance.argument_dcp_curvatures()
+                errors = DCPViolationFactory.composition_error(curvature,
+                    instance.monotonicity(), instance.argument_curvatures(),
+                    instance.argument_signs(), instance.argument_dcp_curvatures())
+                unshared = DCPViolationFactory.composition_error(curvature,
+                    instance.monotonicity(), instance.argument_curvatures(),
+                    instance.argument_signs())
+                assert_equals([str(error) for error in errors],
+                              [str(error) for error in unshared])
+
     # Test short names for atoms
     def test_short_names(self):
         atom_dict = atom_loader.generate_atom_dict()
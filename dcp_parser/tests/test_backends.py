@@ -0,0 +1,55 @@
+from dcp_parser.parser import Parser
+from dcp_parser.json.statement_encoder import StatementEncoder
+from dcp_parser.tests.parser_corpus import parser_corpus
+from nose.tools import assert_equals
+
+class TestBackends(object):
+      """ Differential tests of the PLY and Pratt parser backends. """
+
+      # Parses text and returns the error message, encoded statements
+      # and symbol table.
+      @staticmethod
+      def outcome(parser, text):
+          try:
+               parser.parse(text)
+               error = None
+          except Exception as e:
+               error = str(e)
+          statements = [StatementEncoder().encode(s) for s in parser.statements]
+          symbols = sorted((name, str(value), str(value.sign))
+                           for (name, value) in parser.symbol_table.items())
+          return (error, statements, symbols)
+
+      # Test that both backends agree on every statement in test_parser.py
+      def test_parser_corpus(self):
+          for statements in parser_corpus():
+               ply_parser = Parser(backend='ply')
+               pratt_parser = Parser(backend='pratt')
+               for text in statements:
+                    assert_equals(self.outcome(ply_parser, text),
+                                  self.outcome(pratt_parser, text))
+
+      # Test that both backends recover from syntax errors alike
+      def test_error_recovery(self):
+          preamble = ['variable x y', 'parameter positive a']
+          texts = ['x y', 'x + y x', '(x y', '(x y) + a', '-(x + ) a',
+                   'x + (y a', 'x * y + (a y', 'a + x * (y a', 'x == (y a',
+                   'x == y a', 'max(x y (a)) + x', 'max(x y', 'max(+)',
+                   ') x', 'variable z 1', 'variable z 1 z', '(x == y)',
+                   'x / 0 y', 'square((x a))', 'variable', 'Inf', '# x']
+          for text in texts:
+               ply_parser = Parser(backend='ply')
+               pratt_parser = Parser(backend='pratt')
+               for line in preamble:
+                    ply_parser.parse(line)
+                    pratt_parser.parse(line)
+               assert_equals(self.outcome(ply_parser, text),
+                             self.outcome(pratt_parser, text))
+
+      # Test that unknown backends are rejected
+      def test_unknown_backend(self):
+          try:
+               Parser(backend='yacc')
+               assert False
+          except Exception as e:
+               assert_equals(str(e), "Unknown parser backend 'yacc'.")
@@ -0,0 +1,50 @@
+from dcp_parser.batch import BatchAnalyzer, analyze, MIN_CHUNK, MAX_CHUNK
+from dcp_parser.bridge import parse_json
+from dcp_parser.classify import Classifier
+from dcp_parser.parser import SymbolTable
+from nose.tools import assert_equals
+import json
+
+PREAMBLE = ['variable x y z', 'parameter positive a']
+TEXTS = ['square(x) + a*y', 'sqrt(q)', 'max(x, y) <= z', 'sqrt(square(x))', ''] * 40
+
+class TestBatch(object):
+    """ Unit tests for the multiprocessing batch analyzer. """
+    def setup(self):
+        self.symbols = SymbolTable.from_preamble(PREAMBLE)
+
+    # Test that workers give the results of parsing in this process.
+    def test_analyze(self):
+        expected = []
+        for text in TEXTS:
+            encoded = parse_json(text, self.symbols)
+            error = json.loads(encoded).get('error')
+            expected.append((None, error) if error else (encoded, None))
+        for workers in [0, 2]:
+            batch = BatchAnalyzer(PREAMBLE, workers)
+            assert_equals(batch.analyze(TEXTS), expected)
+            assert_equals(batch.stats.texts, len(TEXTS))
+            assert_equals(batch.stats.failures, 80)
+            assert MIN_CHUNK <= batch.chunk_size <= MAX_CHUNK
+        # Generators, and results as they complete.
+        batch = BatchAnalyzer(PREAMBLE, 2, 'classes')
+        results = sorted(batch.run((text for text in TEXTS), ordered=False))
+        assert_equals([index for (index, result) in results], list(range(len(TEXTS))))
+        classifier = Classifier(self.symbols)
+        assert_equals(results[0][1], (classifier.classify(TEXTS[0]), None))
+        assert_equals(analyze(TEXTS[:2], PREAMBLE, 0, 'classes'), [r for (i, r) in results[:2]])
+        # Restricted atoms and another backend.
+        results = analyze(['sqrt(x)', 'square(x)'], PREAMBLE, 0, 'classes',
+                          atom_names=['square'], backend='pratt')
+        assert_equals(results[0], (None, "'sqrt' is not a known function."))
+        assert_equals(results[1], (classifier.classify('square(x)'), None))
+
+    # Test that bad arguments fail before any work is sent.
+    def test_errors(self):
+        for (args, message) in [((PREAMBLE, 0, 'trees'), "Unknown analysis 'trees'."),
+                                (('variable',), "'variable' is not a valid expression.")]:
+            try:
+                BatchAnalyzer(*args)
+                assert False
+            except Exception as e:
+                assert_equals(str(e), message)
@@ -0,0 +1,42 @@
+from dcp_parser.bridge import encode, parse_json, parse_dict
+from dcp_parser.cache import ParseCache
+from dcp_parser.parser import Parser, SymbolTable
+from dcp_parser.json.statement_encoder import StatementEncoder
+from nose.tools import assert_equals
+import json
+
+PREAMBLE = ['variable x y z', 'parameter positive a']
+
+class TestBridge(object):
+    """ Unit tests for the Pyodide entry points. """
+    def setup(self):
+        self.symbols = SymbolTable.from_preamble(PREAMBLE)
+
+    # Test that every entry point returns the same tree.
+    def test_trees(self):
+        parser = Parser(symbols=self.symbols)
+        parser.parse('max(square(x), a*y) <= sqrt(z)')
+        expected = StatementEncoder().encode(parser.statements[0])
+        cache = ParseCache()
+        for i in range(2):
+            assert_equals(parse_json('max(square(x), a*y) <= sqrt(z)', self.symbols, cache),
+                          expected)
+        assert_equals(cache.hits, 1)
+        assert_equals(parse_json('max(square(x), a*y) <= sqrt(z)', self.symbols), expected)
+        assert_equals(parse_dict('max(square(x), a*y) <= sqrt(z)', self.symbols),
+                      json.loads(expected))
+
+    # Test that errors are returned, not raised, except by encode.
+    def test_errors(self):
+        message = "'q' is not a known variable or parameter."
+        assert_equals(json.loads(parse_json('square(q)', self.symbols)), {'error': message})
+        assert_equals(parse_dict('square(q)', self.symbols), {'error': message})
+        for text in ['', 'variable q']:
+            assert_equals(json.loads(parse_json(text, self.symbols, ParseCache())),
+                          {'error': 'No valid expression parsed'})
+            assert_equals(parse_dict(text), {'error': 'No valid expression parsed'})
+        try:
+            encode('square(q)', self.symbols)
+            assert False
+        except Exception as e:
+            assert_equals(str(e), message)
@@ -0,0 +1,66 @@
+from dcp_parser.cache import ParseCache, normalize
+from dcp_parser.parser import Parser, SymbolTable
+from dcp_parser.json.statement_encoder import StatementEncoder
+from nose.tools import assert_equals
+
+PREAMBLE = ['variable x y z', 'parameter positive a']
+
+class TestParseCache(object):
+    """ Unit tests for the parse cache. """
+    def setup(self):
+        self.symbols = SymbolTable.from_preamble(PREAMBLE)
+        self.cache = ParseCache(max_entries=2)
+
+    # Test that hits return the encoding of the first parse.
+    def test_hits(self):
+        parser = Parser(symbols=self.symbols)
+        parser.parse('square(x) + a * y <= 1')
+        expected = StatementEncoder().encode(parser.statements[0])
+        encoded = self.cache.encode('square(x) + a * y <= 1', self.symbols)
+        assert_equals(encoded, expected)
+        assert_equals((self.cache.hits, self.cache.misses), (0, 1))
+        # Blanks and comments are normalized away.
+        assert self.cache.encode(' square(x)+a *  y<=1\t', self.symbols) is encoded
+        assert_equals((self.cache.hits, self.cache.misses), (1, 1))
+        assert_equals(normalize(' variable\tx \n\n x+y<=2.50 # z \n# w'),
+                      'variable x\nx + y <= 2.50\n#')
+        # Equal tables share entries, other tables do not.
+        other = SymbolTable.from_preamble(['parameter positive a', 'variable z y x'])
+        assert_equals(other.digest, self.symbols.digest)
+        self.cache.encode('square(x) + a * y <= 1', other)
+        assert_equals(self.cache.hits, 2)
+        negative = SymbolTable.from_preamble(['variable x y z', 'parameter negative a'])
+        assert self.cache.encode('square(x) + a * y <= 1', negative) != encoded
+        assert_equals((self.cache.hits, self.cache.misses, len(self.cache)), (2, 2, 2))
+        # Errors are raised every time and not cached.
+        for i in range(2):
+            try:
+                self.cache.encode('square(q)', self.symbols)
+                assert False
+            except Exception as e:
+                assert_equals(str(e), "'q' is not a known variable or parameter.")
+        assert_equals((self.cache.misses, len(self.cache)), (4, 2))
+        assert_equals(self.cache.encode('variable q', self.symbols), None)
+
+    # Test eviction of the least recently used entries.
+    def test_eviction(self):
+        for text in ['x', 'y', 'x', 'z']:
+            self.cache.encode(text, self.symbols)
+        assert_equals((self.cache.hits, self.cache.misses, self.cache.evictions), (1, 3, 1))
+        assert_equals([key[1] for key in self.cache.entries], ['x', 'z'])
+        size = self.cache.bytes
+        # By size.
+        cache = ParseCache(max_bytes=size)
+        cache.encode('x', self.symbols)
+        cache.encode('z', self.symbols)
+        assert_equals((len(cache), cache.bytes, cache.evictions), (2, size, 0))
+        cache.encode('y', self.symbols)
+        assert_equals((len(cache), cache.evictions), (2, 1))
+        # Entries larger than the cache are not kept.
+        cache.encode('square(x) + square(y) + square(z)', self.symbols)
+        assert_equals((len(cache), cache.evictions), (2, 1))
+        cache.clear()
+        assert_equals((len(cache), cache.bytes, cache.hits, cache.misses), (0, 0, 0, 0))
+        # Sizes are counted in bytes, not characters.
+        cache.add(('digest', '\u00e9'), None)
+        assert_equals(cache.bytes, len('digest') + 2)
@@ -0,0 +1,117 @@
+from dcp_parser.classify import Classifier, ClassifyParse, classify_many, UNDEFINED
+import dcp_parser.classify as classify
+import sys
+import threading
+from dcp_parser.parser import SymbolTable
+from dcp_parser.expression.curvature import Curvature
+from dcp_parser.expression.sign import Sign
+from nose.tools import assert_equals
+
+PREAMBLE = ['variable x y z', 'parameter a', 'parameter positive b']
+
+TEXTS = ['square(x) + b * y',
+         'sqrt(square(x)) - 2',
+         'max(x, y) <= norm(z, 2)',
+         'pow(x, 3) + pow(y, -1) + huber(x, 2) + norm(x, y, Inf)',
+         '-(-3) * log(x)',
+         'variable positive q\nsqrt(q)',
+         'q + x',
+         'pow(x, (3))',
+         'square(x',
+         'x <= y <= z',
+         'geo_mean(x, )',
+         '']
+
+class TestClassify(object):
+    """ Unit tests for classification without Expressions. """
+    def setup(self):
+        self.symbols = SymbolTable.from_preamble(PREAMBLE)
+
+    # Test that the classes and errors are the parser's.
+    def test_classify_many(self):
+        classifier = Classifier(self.symbols)
+        classes = classify_many(TEXTS, self.symbols)
+        assert_equals(len(classes), len(TEXTS))
+        for (i, text) in enumerate(TEXTS):
+            try:
+                (code, violations) = classifier.parse(text)
+                assert_equals(classifier.classify(text), (code, violations))
+            except Exception as e:
+                assert_equals(classes.failures[i], str(e))
+                assert_equals(classes[i], (UNDEFINED, UNDEFINED, 0, 0))
+                continue
+            (curvature, sign, dcp, errors) = classes[i]
+            assert i not in classes.failures
+            assert_equals(errors, violations)
+            assert_equals(dcp, violations == 0)
+            if code != UNDEFINED:
+                assert_equals(curvature * len(Sign.SIGNS) + sign, code)
+        assert_equals(classes[0], (Curvature.CONVEX.index, Sign.UNKNOWN.index, 1, 0))
+        assert_equals(classes[1], (Curvature.NONCONVEX.index, Sign.UNKNOWN.index, 0, 2))
+        assert_equals(classes[2][:2], (UNDEFINED, UNDEFINED))
+        assert_equals(classes[4], (Curvature.CONCAVE.index, Sign.UNKNOWN.index, 1, 0))
+        # Declarations in one text are not seen by the next.
+        assert_equals(classes[5][:2], (Curvature.CONCAVE.index, Sign.POSITIVE.index))
+        assert_equals(classes.failures[6], "'q' is not a known variable or parameter.")
+        assert_equals(classes.failures[7], "could not convert string to float: '(3)'")
+        assert_equals(classes.failures[11], 'No valid expression parsed')
+
+    # Test that the reduction handles valid texts itself.
+    def test_reduction(self):
+        classifier = Classifier(self.symbols)
+        for text in TEXTS[:6]:
+            assert_equals(ClassifyParse(classifier, text).parse(), classifier.parse(text))
+        for text in TEXTS[6:]:
+            try:
+                ClassifyParse(classifier, text).parse()
+                assert False
+            except Exception as e:
+                pass
+
+    # Test that only the least recently used results are dropped.
+    def test_results(self):
+        classifier = Classifier(self.symbols)
+        max_results = classify.MAX_RESULTS
+        classify.MAX_RESULTS = 4
+        try:
+            classify.RESULTS.clear()
+            classifier.classify('square(x)')
+            key = list(classify.RESULTS)[-1]
+            for text in ['pow(x, %d)' % i for i in range(2, 10)]:
+                classifier.classify(text)
+                assert len(classify.RESULTS) <= 4
+                assert key in classify.RESULTS
+                classifier.classify('square(x)')
+            assert_equals(classifier.classify('pow(x, 2)'), classifier.parse('pow(x, 2)'))
+        finally:
+            classify.MAX_RESULTS = max_results
+
+    # Test classifying in many threads while results are being dropped.
+    def test_threads(self):
+        classifier = Classifier(self.symbols)
+        texts = ['pow(x, %d) + square(y)' % (i % 40 + 2) for i in range(2000)]
+        expected = [classifier.parse(text) for text in texts]
+        threads = 8
+        results = [None] * len(texts)
+        barrier = threading.Barrier(threads)
+        def run(first):
+            barrier.wait()
+            for i in range(first, len(texts), threads):
+                try:
+                    results[i] = classifier.classify(texts[i])
+                except Exception as e:
+                    results[i] = e
+        (max_results, interval) = (classify.MAX_RESULTS, sys.getswitchinterval())
+        classify.MAX_RESULTS = 1
+        sys.setswitchinterval(1e-6)
+        try:
+            workers = [threading.Thread(target=run, args=(first,))
+                       for first in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            classify.MAX_RESULTS = max_results
+            sys.setswitchinterval(interval)
+        assert_equals(results, expected)
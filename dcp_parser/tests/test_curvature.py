@@ -62,4 +62,13 @@ class TestCurvature(object):
         assert Curvature.AFFINE.is_concave()
         assert not Curvature.CONVEX.is_concave()
         assert Curvature.CONCAVE.is_concave()
-        assert not Curvature.NONCONVEX.is_concave()
\ No newline at end of file
+        assert not Curvature.NONCONVEX.is_concave()
+    # Test that curvatures are singletons, also through copies and pickles
+    def test_singletons(self):
+        import copy, pickle
+        assert Curvature('convex') is Curvature.CONVEX
+        assert copy.deepcopy(Curvature.AFFINE) is Curvature.AFFINE
+        assert pickle.loads(pickle.dumps(Curvature.CONCAVE)) is Curvature.CONCAVE
+        for curvature in Curvature.CURVATURES:
+            assert Curvature.CURVATURES[curvature.index] is curvature
+        assert Curvature.CONVEX - Curvature.CONVEX is Curvature.NONCONVEX
@@ -69,4 +69,19 @@ class TestErrorMsg(object):
 
           error_str = "Illegal composition: convex non-decreasing with non-convex argument"
           assert_equals(str(exp.errors[1]),self.dcp_violation + error_str)
-          assert_equals(exp.errors[1].index,1)
\ No newline at end of file
+          assert_equals(exp.errors[1].index,1)
+      # Test that violations are shared records with cached messages.
+      def test_records(self):
+          first = (self.aff_exp*self.aff_exp).errors[0]
+          other = Expression(Curvature.AFFINE, Sign.UNKNOWN, 'other_aff')
+          second = (other*self.aff_exp).errors[0]
+          assert first is second
+          assert not hasattr(first, '__dict__')
+          assert_equals((first.lh_curvature, first.lh_sign), (Curvature.AFFINE, Sign.UNKNOWN))
+          assert first.error_message() is first.error_message()
+          # Signs are part of the record.
+          exp = self.conc_exp * self.const_exp
+          assert_equals(exp.errors[0].error_message(),
+                        "Illegal operation: concave * constant with unknown sign")
+          const_pos = Expression(Curvature.CONSTANT, Sign.POSITIVE, 'const_pos')
+          assert_equals(len((self.conc_exp * const_pos).errors), 0)
@@ -71,3 +71,43 @@ class TestExpression(object):
         assert_equals((-a).short_name, '-')
 
 
+
+    # Tests that nodes are slotted and leaves share EMPTY.
+    def test_slots(self):
+        from dcp_parser.expression.statement import EMPTY
+        x = Variable('x')
+        a = Parameter('a', Sign.POSITIVE)
+        two = Constant(2)
+        exp = x + two
+        for node in [x, a, two, exp, self.aff_exp]:
+            assert not hasattr(node, '__dict__')
+        for leaf in [x, a, two]:
+            assert leaf.subexpressions is EMPTY
+            assert leaf.errors is EMPTY
+        assert exp.errors is EMPTY
+        assert_equals(exp.subexpressions, [x, two])
+        assert_equals(len((x * x).errors), 1)
+        # Copies keep every attribute.
+        group = exp.parenthesized()
+        assert_equals(str(group), '(x + 2)')
+        assert_equals(str(exp), 'x + 2')
+        assert group.subexpressions is exp.subexpressions
+        assert_equals(group.short_name, '+')
+
+    # Tests that names are rendered lazily and without recursion.
+    def test_lazy_name(self):
+        x = Variable('x')
+        y = Variable('y')
+        exp = -(x - y) * x
+        assert exp.text is None
+        group = (x - y).parenthesized().parenthesized()
+        assert_equals(str(group + x), '((x - y)) + x')
+        assert_equals(str(exp), '-x - y * x')
+        assert_equals(exp.name, '-x - y * x')
+        assert exp.parts is None
+        total = x
+        for i in range(5000):
+            total = total + y
+        assert_equals(len(total.name), 1 + 4 * 5000)
+        total.name = 'sum'
+        assert_equals(str(total.parenthesized()), '(sum)')
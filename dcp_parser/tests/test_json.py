@@ -6,6 +6,10 @@ import dcp_parser.atomic.atom_loader as atom_loader
 import json
 import dcp_parser.json.settings as settings
 from dcp_parser.json.statement_encoder import StatementEncoder
+from dcp_parser.json.stream_encoder import StreamEncoder
+from dcp_parser.json.column_encoder import ColumnEncoder
+from dcp_parser.parser import Parser
+import io
 from nose.tools import assert_equals
 
 class TestJson(object):
@@ -60,4 +64,63 @@ class TestJson(object):
             if error.is_indexed():
                 assert_equals(result.json_errors['indexed_errors'][str(error.index)], error.error_message())
             else:
-                assert error.error_message() in result.json_errors['unsorted_errors']
\ No newline at end of file
+                assert error.error_message() in result.json_errors['unsorted_errors']
+
+    # Tests that the stream encoder writes what the dict encoders build.
+    def test_stream_encoder(self):
+        parser = Parser()
+        parser.parse('variable x y')
+        parser.parse('parameter positive a')
+        parser.parse('max(square(x), a*y, -2) + sqrt(x) >= log_sum_exp(x, x) - 1')
+        parser.parse('(x + y) + (x + y) == square(x)')
+        parser.parse('huber(x, 2)')
+        for (statement, spans) in zip(parser.statements, parser.spans):
+            for spans in [None, spans]:
+                expected = json.dumps(StatementEncoder(spans).default(statement))
+                assert_equals(StreamEncoder(spans).encode(statement), expected)
+                assert_equals(StatementEncoder(spans).encode(statement), expected)
+                stream = io.StringIO()
+                StreamEncoder(spans).write(statement, stream)
+                assert_equals(stream.getvalue(), expected)
+        # Formatting options fall back to the dict encoders.
+        assert_equals(StatementEncoder(indent=1).encode(parser.statements[0]),
+                      json.dumps(StatementEncoder().default(parser.statements[0]), indent=1))
+        # Deeper than the recursion limit, which json.loads cannot read back.
+        parser.parse(' + '.join(['x'] * 3000) + ' <= 1')
+        encoded = StatementEncoder().encode(parser.statements[-1])
+        assert_equals(encoded.count('"children": ['), 3000)
+        assert encoded.endswith('{}}}]}, {"type": "Expression", "name": "1", '
+                                '"short_name": "1", "curvature": "constant", "sign": "positive", '
+                                '"class": "Constant", "errors": {"unsorted_errors": [], '
+                                '"indexed_errors": {}}}]}')
+
+    # Tests that columns decode to the nested JSON.
+    def test_column_encoder(self):
+        parser = Parser()
+        parser.parse('variable x y')
+        parser.parse('parameter positive a')
+        parser.parse('max(square(x), a*y, -2) + sqrt(x) >= log_sum_exp(x, x) - 1')
+        parser.parse('(x + y) + (x + y) == square(x)')
+        parser.parse('exp(x) + exp(x)')
+        for (statement, spans) in zip(parser.statements, parser.spans):
+            for spans in [None, spans]:
+                expected = json.loads(StatementEncoder(spans).encode(statement))
+                encoded = ColumnEncoder(spans).encode(statement)
+                assert_equals(ColumnEncoder.decode(encoded), expected)
+                assert_equals(ColumnEncoder.decode(json.loads(encoded)), expected)
+        columns = ColumnEncoder().columns(parser.statements[-1])
+        assert_equals(columns['parent'], [-1, 0, 1, 0, 3])
+        assert_equals([columns['strings'][i] for i in columns['short_name']],
+                      ['+', 'exp', 'x', 'exp', 'x'])
+        # Shared nodes share their template and strings.
+        assert_equals(columns['templates'][columns['template'][1]],
+                      [columns['strings'].index(fragment) for fragment in ['exp(', ')']])
+        assert_equals(columns['template'][1], columns['template'][3])
+        # Names without their children's names are stored whole.
+        exp = Expression(Curvature.CONVEX, Sign.UNKNOWN, 'f', [self.aff_exp], [], [])
+        assert_equals(ColumnEncoder.decode(ColumnEncoder().encode(exp)),
+                      json.loads(StatementEncoder().encode(exp)))
+        # Names are not repeated in every node.
+        parser.parse(' + '.join(['square(x)'] * 1000))
+        assert len(ColumnEncoder().encode(parser.statements[-1])) * 50 < \
+               len(StatementEncoder().encode(parser.statements[-1]))
@@ -0,0 +1,57 @@
+from dcp_parser.lexer import tokenize, PlyLexer
+from nose.tools import assert_equals
+
+class TestLexer(object):
+    """ Unit tests for the lexer module. """
+
+    # Test token types, values and reserved words.
+    def test_tokens(self):
+        tokens = [token[:2] for token in tokenize('parameter positive a\tb # c')]
+        assert_equals(tokens, [('PARAMETER', 'parameter'), ('SIGN', 'positive'),
+                               ('ID', 'a'), ('ID', 'b')])
+        tokens = [token[:2] for token in tokenize('norm(x1, Inf)*.5-2.0/3 >= 0')]
+        assert_equals(tokens, [('ID', 'norm'), ('LPAREN', '('), ('ID', 'x1'),
+                               ('COMMA', ','), ('STRING_ARG', 'Inf'),
+                               ('RPAREN', ')'), ('TIMES', '*'), ('FLOAT', 0.5),
+                               ('MINUS', '-'), ('FLOAT', 2.0), ('DIVIDE', '/'),
+                               ('INT', 3), ('GEQ', '>='), ('INT', 0)])
+        for sign in ['positive', 'negative', 'zero', 'unknown']:
+            assert_equals(list(tokenize(sign))[0][0], 'SIGN')
+
+    # Test line and column positions in a multi-line program.
+    def test_positions(self):
+        tokens = list(tokenize('variable x\n\n  x + 1  # sum\n'))
+        assert_equals(tokens, [('VARIABLE', 'variable', 1, 0, 8), ('ID', 'x', 1, 9, 10),
+                               ('ID', 'x', 3, 2, 3), ('PLUS', '+', 3, 4, 5),
+                               ('INT', 1, 3, 6, 7)])
+        assert_equals(list(tokenize('2.50 <= x1'))[0][3:], (0, 4))
+
+    # Test the illegal character messages.
+    def test_errors(self):
+        messages = {
+            'x = 1': "'=' is not valid. Did you mean '=='?",
+            'x < 1': "'<' constraints are not valid. Consider using '<='.",
+            'x > 1': "'>' constraints are not valid. Consider using '>='.",
+            'x^2': "'^' is not valid. Consider using the 'pow' function.",
+            'x $': "Illegal character '$'.",
+        }
+        for (text, message) in messages.items():
+            try:
+                list(tokenize(text))
+                assert False
+            except Exception as e:
+                assert_equals(str(e), message)
+        # Tokens before an illegal character are still produced.
+        tokens = tokenize('x ^')
+        assert_equals(next(tokens)[:2], ('ID', 'x'))
+
+    # Test the adapter for ply.yacc.
+    def test_ply_lexer(self):
+        lexer = PlyLexer()
+        lexer.input('f(1)')
+        token = lexer.token()
+        assert_equals((token.type, token.value, token.lineno, token.lexpos),
+                      ('ID', 'f', 1, 0))
+        assert_equals([lexer.token().type for i in range(3)],
+                      ['LPAREN', 'INT', 'RPAREN'])
+        assert_equals(lexer.token(), None)
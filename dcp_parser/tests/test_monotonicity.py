@@ -23,4 +23,37 @@ class TestMonotonicity(object):
         assert_equals(Monotonicity.INCREASING.dcp_curvature(Curvature.CONCAVE, Curvature.CONVEX), Curvature.NONCONVEX)
         assert_equals(Monotonicity.NONMONOTONIC.dcp_curvature(Curvature.CONCAVE, Curvature.AFFINE), Curvature.CONCAVE)
 
-        assert_equals(Monotonicity.NONMONOTONIC.dcp_curvature(Curvature.CONSTANT, Curvature.NONCONVEX), Curvature.CONSTANT)
\ No newline at end of file
+        assert_equals(Monotonicity.NONMONOTONIC.dcp_curvature(Curvature.CONSTANT, Curvature.NONCONVEX), Curvature.CONSTANT)
+
+    # Test the composition table against the DCP composition rules,
+    # written out for every monotonicity and pair of curvatures.
+    def test_composition_table(self):
+        (K, A, X, V, N) = (Curvature.CONSTANT, Curvature.AFFINE, Curvature.CONVEX,
+                           Curvature.CONCAVE, Curvature.NONCONVEX)
+        # Rows are function curvatures and columns argument curvatures,
+        # both in the order constant, affine, convex, concave, nonconvex.
+        expected = [
+            (Monotonicity.INCREASING, [[K, K, K, K, K],
+                                       [K, A, X, V, N],
+                                       [K, X, X, N, N],
+                                       [K, V, N, V, N],
+                                       [N, N, N, N, N]]),
+            (Monotonicity.DECREASING, [[K, K, K, K, K],
+                                       [K, A, V, X, N],
+                                       [K, X, N, X, N],
+                                       [K, V, V, N, N],
+                                       [N, N, N, N, N]]),
+            (Monotonicity.NONMONOTONIC, [[K, K, K, K, K],
+                                         [K, A, N, N, N],
+                                         [K, X, N, N, N],
+                                         [K, V, N, N, N],
+                                         [N, N, N, N, N]]),
+        ]
+        assert_equals(len(Monotonicity.COMPOSITION_TABLE), 3)
+        for (monotonicity, rows) in expected:
+            for (func_curvature, row) in zip(Curvature.CURVATURES, rows):
+                for (arg_curvature, curvature) in zip(Curvature.CURVATURES, row):
+                    assert_equals(monotonicity.dcp_curvature(func_curvature, arg_curvature),
+                                  curvature)
+        assert_equals(Monotonicity('decreasing').dcp_curvature(Curvature.AFFINE, Curvature.CONVEX),
+                      Curvature.CONCAVE)
@@ -1,8 +1,11 @@
-from dcp_parser.parser import Parser
+from dcp_parser.parser import Parser, Grammar, SymbolTable
 from dcp_parser.expression.curvature import Curvature
 from dcp_parser.expression.sign import Sign
 from dcp_parser.expression.expression import *
+from dcp_parser.json.statement_encoder import StatementEncoder
 from nose.tools import assert_equals
+import sys
+import threading
 
 class TestParser(object):
       """ Unit tests for the parser/parser class. """
@@ -325,4 +328,325 @@ class TestParser(object):
           result = self.parser.statements[last]
           assert_equals(expression, str(result))
           assert_equals(len(result.subexpressions), 2)
-          assert_equals(len(result.errors), 1) 
+          assert_equals(len(result.errors), 1)
+
+      # Test that parsers share one grammar but keep separate symbol tables
+      def test_shared_grammar(self):
+          other = Parser(backend=self.parser.backend)
+          self.parser.parse('variable x')
+          other.parse('parameter x')
+          assert self.parser.grammar is other.grammar
+          assert_equals(self.parser.symbol_table['x'].curvature, Curvature.AFFINE)
+          assert_equals(other.symbol_table['x'].curvature, Curvature.CONSTANT)
+          assert_equals(self.parser.atom_dict, other.atom_dict)
+
+          self.parser.parse('square(x)')
+          assert_equals(len(self.parser.statements), 1)
+          assert_equals(len(other.statements), 0)
+
+      # Test that the shipped tables match the grammar and stale ones are rejected
+      def test_table_signature(self):
+          import dcp_parser.parsetab as parsetab
+          grammar = Grammar.get()
+          assert_equals(parsetab._lr_signature, grammar.signature())
+          assert grammar.load_tables() is not None
+
+          signature = parsetab._lr_signature
+          parsetab._lr_signature = 'stale'
+          try:
+               assert grammar.load_tables() is None
+          finally:
+               parsetab._lr_signature = signature
+
+      # Test that without PLY only the Pratt backend can be used
+      def test_missing_ply(self):
+          import dcp_parser.parser as parser_module
+          ply = parser_module.ply
+          parser_module.ply = None
+          try:
+               try:
+                    Parser()
+                    assert False
+               except Exception as e:
+                    assert_equals(str(e), "The 'ply' backend needs PLY; use backend='pratt'.")
+               parser = Parser(backend='pratt')
+               parser.parse('variable x\nsquare(x)')
+               assert_equals(str(parser.statements[0]), 'square(x)')
+          finally:
+               parser_module.ply = ply
+
+      # Test batch parsing against a shared preamble
+      def test_parse_many(self):
+          preamble = ['variable x y', 'parameter positive a']
+          texts = ['a * square(x)', 'x ^ 2', 'variable z\nz + y', 'z', 'log(x) == y']
+          nodes = len(self.parser.nodes.nodes)
+          results = self.parser.parse_many(texts, preamble=preamble)
+          assert_equals(len(results), 5)
+
+          (statements, error) = results[0]
+          assert_equals(error, None)
+          assert_equals(str(statements[0]), 'a * square(x)')
+          assert_equals(statements[0].curvature, Curvature.CONVEX)
+
+          (statements, error) = results[1]
+          assert_equals(statements, [])
+          assert_equals(str(error), "'^' is not valid. Consider using the 'pow' function.")
+
+          # Declarations only last for their own text.
+          assert_equals(str(results[2][0][0]), 'z + y')
+          assert_equals(str(results[3][1]), "'z' is not a known variable or parameter.")
+          assert_equals(str(results[4][0][0]), 'log(x) == y')
+
+          # The Parser's own context is not changed.
+          assert_equals(list(self.parser.symbol_table.keys()), [])
+          assert_equals(self.parser.statements, [])
+          assert_equals(len(self.parser.nodes.nodes), nodes)
+
+      # Test that consecutive batches only see their own preambles
+      def test_parse_many_batches(self):
+          self.parser.parse('parameter b')
+          results = self.parser.parse_many(['x + y + b'], preamble=['variable x y', 'x + y'])
+          assert_equals(str(results[0][0][0]), 'x + y + b')
+          (statements, error) = self.parser.parse_many(['x', 'z + b'], preamble='variable z')[1]
+          assert_equals(str(statements[0]), 'z + b')
+          (statements, error) = self.parser.parse_many(['x'])[0]
+          assert_equals(str(error), "'x' is not a known variable or parameter.")
+          # The preamble statement and declarations are not kept.
+          assert_equals(self.parser.statements, [])
+          assert_equals(list(self.parser.symbol_table.keys()), ['b'])
+
+      # Test sharing a frozen preamble between parsers
+      def test_symbol_table(self):
+          backend = self.parser.backend
+          symbols = SymbolTable.from_preamble(['variable x y', 'parameter positive a'],
+                                              backend=backend)
+          assert_equals(sorted(symbols.keys()), ['a', 'x', 'y'])
+          assert_equals(symbols['a'].sign, Sign.POSITIVE)
+          try:
+               symbols['z'] = symbols['x']
+               assert False
+          except TypeError:
+               pass
+
+          first = Parser(backend=backend, symbols=symbols)
+          second = Parser(backend=backend, symbols=symbols)
+          first.parse('variable z\nz + (x)')
+          second.parse('x + a')
+          assert first.symbol_table['x'] is second.symbol_table['x']
+          assert 'z' in first.symbol_table
+          assert not 'z' in second.symbol_table
+          assert not 'z' in symbols
+          # Groups do not rename the shared variables.
+          assert_equals(str(symbols['x']), 'x')
+          assert_equals(str(second.statements[0]), 'x + a')
+
+          assert second.snapshot() is symbols
+          assert_equals(sorted(first.snapshot().keys()), ['a', 'x', 'y', 'z'])
+          first.clear()
+          assert_equals(sorted(first.symbol_table.keys()), ['a', 'x', 'y'])
+
+      # Test that repeated subexpressions are built once
+      def test_hash_consing(self):
+          self.parser.parse('variable x y')
+          self.parser.parse('parameter a')
+          self.parser.parse('square(x - a) + square(x - a) + 2 * (x - a)')
+          exp = self.parser.statements[0]
+          assert_equals(str(exp), 'square(x - a) + square(x - a) + 2 * (x - a)')
+          (lh_exp, rh_exp) = exp.subexpressions
+          assert lh_exp.subexpressions[0] is lh_exp.subexpressions[1]
+          difference = lh_exp.subexpressions[0].subexpressions[0]
+          # The group is a distinct node over the same difference.
+          group = rh_exp.subexpressions[1]
+          assert_equals(str(group), '(x - a)')
+          assert group.subexpressions is difference.subexpressions
+          assert_equals(str(difference), 'x - a')
+          # Nodes are shared across statements, but not across kinds
+          # of constant.
+          size = len(self.parser.nodes)
+          self.parser.parse('square(x - a) >= 2')
+          self.parser.parse('square(x - a) <= 2.0')
+          (first, second) = self.parser.statements[1:]
+          assert first.subexpressions[0] is lh_exp.subexpressions[0]
+          assert first.subexpressions[1] is rh_exp.subexpressions[0]
+          assert_equals(str(second.subexpressions[1]), '2.0')
+          assert_equals(len(self.parser.nodes), size + 1)
+          self.parser.clear()
+          assert_equals(len(self.parser.nodes), 0)
+
+      # Test replacing one subexpression of a parsed statement
+      def test_reparse(self):
+          self.parser.parse('variable x y')
+          self.parser.parse('parameter positive a')
+          self.parser.parse('square(x + y) + max(x, -y) <= a * log(x)')
+          constraint = self.parser.statements[0]
+          (lhs, rhs) = constraint.subexpressions
+          (exp, change) = self.parser.reparse(constraint, 'sqrt(y)', path=[1, 1])
+          assert_equals(str(exp), 'square(x + y) + max(x, -y) <= a * sqrt(y)')
+          assert self.parser.statements[0] is exp
+          # Only the path to the new subtree is rebuilt.
+          assert exp.subexpressions[0] is lhs
+          assert exp.subexpressions[1].subexpressions[0] is rhs.subexpressions[0]
+          assert_equals(change['path'], [1, 1])
+          assert_equals([node['name'] for node in change['ancestors']],
+                        [str(exp), 'a * sqrt(y)'])
+          assert not 'children' in change['ancestors'][0]
+          assert_equals(change['node'], StatementEncoder().default(exp.rhs.subexpressions[1]))
+          assert_equals(exp.errors, ())
+          # The result is the same as parsing the new text.
+          self.parser.parse('square(x + y) + max(x, -y) <= a * sqrt(y)')
+          assert_equals(StatementEncoder().encode(self.parser.statements[1]),
+                        StatementEncoder().encode(exp))
+          assert self.parser.statements[1].subexpressions[1] is exp.subexpressions[1]
+
+          # By the span of the text to replace.
+          text = str(exp)
+          start = text.index('max')
+          (exp, change) = self.parser.reparse(exp, 'min(x, y)',
+                                              span=(start, start + len('max(x, -y)')))
+          assert_equals(str(exp), 'square(x + y) + min(x, y) <= a * sqrt(y)')
+          assert_equals(change['path'], [0, 1])
+          assert_equals(exp.subexpressions[0].curvature, Curvature.NONCONVEX)
+
+          # Text that would regroup with its neighbours is reparsed in full.
+          (exp, change) = self.parser.reparse(exp, 'x + y', path=[1, 0])
+          assert_equals(str(exp), 'square(x + y) + min(x, y) <= x + y * sqrt(y)')
+          assert_equals(change['path'], [])
+          assert_equals(change['node'], StatementEncoder().default(exp))
+          # An atom can take the new text as its parameter.
+          self.parser.parse('norm(x, y)')
+          (norm, change) = self.parser.reparse(self.parser.statements[-1], '3', path=[1])
+          assert_equals(norm.short_name, 'norm(..., 3)')
+          assert_equals(change['path'], [])
+          # Errors are the same as for the whole text.
+          for (path, text, error) in [
+              ([0, 1], 'max(', "Syntax error in call to 'max'."),
+              ([0, 1], 'z', "'z' is not a known variable or parameter."),
+              ([0, 0, 0], 'Inf', "Incorrect number of arguments in 'square(Inf)'."),
+              # Comments and line breaks would not stay within the subexpression.
+              ([0, 1], 'x # c', "'x # c' is not a valid expression."),
+              ([0, 1], 'x\ny', "'x\ny' is not a valid expression."),
+          ]:
+              try:
+                  self.parser.reparse(exp, text, path=path)
+                  assert False
+              except Exception as e:
+                  assert_equals(str(e), error)
+          try:
+              self.parser.reparse(exp, 'x', span=(1, 3))
+              assert False
+          except Exception as e:
+              assert_equals(str(e), "No subexpression spans 1 to 3 in '%s'." % exp)
+
+      # Test the source offsets of the nodes of each statement
+      def test_spans(self):
+          self.parser.parse('variable x y')
+          self.parser.parse('parameter positive a')
+          self.parser.parse(' square(x+y) + max(x, -y,  2)<= a*(+log( x )) # c')
+          constraint = self.parser.statements[0]
+          spans = self.parser.spans[0]
+          assert_equals(len(spans), 15)
+          assert_equals([spans.source[start:end] for (start, end) in spans],
+                        ['square(x+y) + max(x, -y,  2)<= a*(+log( x ))',
+                         'square(x+y) + max(x, -y,  2)', 'square(x+y)', 'x+y',
+                         'x', 'y', 'max(x, -y,  2)', 'x', '-y', 'y', '2',
+                         'a*(+log( x ))', 'a', '(+log( x ))', 'x'])
+          # The group has the children of log.
+          assert_equals(spans.index([1, 1]), 13)
+          assert_equals(spans.index([1, 1, 0]), 14)
+          assert_equals(spans.path_at(22, 24), [0, 1, 1])
+          assert_equals(spans.path_at(22, 25), None)
+          # The offsets can be encoded with the nodes.
+          encoded = StatementEncoder(spans=spans).default(constraint)
+          assert_equals(encoded['span'], [1, 45])
+          assert_equals(encoded['children'][1]['children'][1]['span'], [34, 45])
+          assert not 'span' in StatementEncoder().default(constraint)
+          # Reparsing splices them.
+          (exp, change) = self.parser.reparse(constraint, ' min(x,y) ', path=[0, 1])
+          spans = self.parser.spans[0]
+          assert_equals(spans.source, ' square(x+y) +  min(x,y) <= a*(+log( x )) # c')
+          assert_equals(spans[0], (1, 41))
+          assert_equals(spans[spans.index([0, 1])], (16, 24))
+          assert_equals(spans[spans.index([1, 1])], (30, 41))
+          assert_equals(change['node']['name'], 'min(x, y)')
+          self.parser.parse(' square(x+y) +  min(x,y) <= a*(+log( x )) # c')
+          assert_equals(list(self.parser.spans[1]), list(spans))
+
+      # Test one Parser parsing in many threads at once, each call
+      # with its own context
+      def test_threads(self):
+          backend = self.parser.backend
+          symbols = SymbolTable.from_preamble(['variable x y', 'parameter positive a'],
+                                              backend=backend)
+          shared = Parser(backend=backend, symbols=symbols)
+          templates = ['square(x + %(i)d) + max(y, a * %(i)d) <= %(i)d', 'sqrt(x) * %(i)d - y',
+                       'variable q%(i)d\nlog_sum_exp(q%(i)d, x) >= a - %(i)d', 'x + (y %(i)d',
+                       'max(x, y, %(i)d) + huber(x, %(i)d) == square(q%(i)d)']
+          texts = [templates[i % len(templates)] % {'i': i} for i in range(200)]
+          # Each text parsed alone.
+          expected = []
+          for text in texts:
+               parser = Parser(backend=backend, symbols=symbols)
+               try:
+                    parser.parse(text)
+                    expected.append([StatementEncoder().encode(s) for s in parser.statements])
+               except Exception as e:
+                    expected.append(str(e))
+          results = [None] * len(texts)
+          threads = 8
+          barrier = threading.Barrier(threads)
+          def run(first):
+               barrier.wait()
+               for i in range(first, len(texts), threads):
+                    context = shared.context()
+                    try:
+                         shared.parse(texts[i], context)
+                         results[i] = [StatementEncoder().encode(s)
+                                       for s in context.statements]
+                    except Exception as e:
+                         results[i] = str(e)
+          interval = sys.getswitchinterval()
+          sys.setswitchinterval(1e-6)
+          try:
+               workers = [threading.Thread(target=run, args=(first,))
+                          for first in range(threads)]
+               for worker in workers:
+                    worker.start()
+               for worker in workers:
+                    worker.join()
+          finally:
+               sys.setswitchinterval(interval)
+          for (text, result, expect) in zip(texts, results, expected):
+               assert_equals(result, expect)
+          assert_equals(results[4], "'q4' is not a known variable or parameter.")
+          # The Parser's own context is untouched.
+          assert_equals(shared.statements, [])
+          assert_equals(sorted(shared.symbol_table.keys()), ['a', 'x', 'y'])
+
+class TestPrattParser(TestParser):
+      """ Runs the parser unit tests against the Pratt backend. """
+      def setup(self):
+          self.parser = Parser(backend='pratt')
+
+      # Test that nesting deeper than Python's recursion limit parses as with PLY
+      def test_deep_nesting(self):
+          depth = max(2000, sys.getrecursionlimit() + 100)
+          texts = ['exp(' * depth + 'x' + ')' * depth,
+                   '(' * depth + 'x' + ')' * depth,
+                   '-' * depth + 'x',
+                   '-(x + ' * depth + 'x' + ')' * depth + ' <= 1',
+                   'max(' * depth + 'x, ' + 'x), ' * (depth - 1) + 'x)',
+                   'exp(' * depth + 'x',
+                   '(' * depth + 'x +',
+                   'exp(' * depth + 'x,, )' + ')' * (depth - 1)]
+          for text in texts:
+               outcomes = []
+               for backend in ['ply', 'pratt']:
+                    parser = Parser(backend=backend)
+                    parser.parse('variable x')
+                    try:
+                         parser.parse(text)
+                         outcomes.append([(str(s), getattr(s, 'curvature', None))
+                                          for s in parser.statements])
+                    except Exception as e:
+                         outcomes.append(str(e))
+               assert_equals(outcomes[0], outcomes[1])
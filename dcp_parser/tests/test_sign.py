@@ -50,4 +50,17 @@ class TestSign(object):
      assert Sign.NEGATIVE <= Sign.ZERO
      assert Sign.ZERO <= Sign.UNKNOWN
      assert not Sign.UNKNOWN <= Sign.ZERO
-     assert not Sign.POSITIVE <= Sign.ZERO
\ No newline at end of file
+     assert not Sign.POSITIVE <= Sign.ZERO
+  # Test that signs are singletons, also through copies and pickles
+  def test_singletons(self):
+     import copy, pickle
+     assert Sign('positive') is Sign.POSITIVE
+     assert Sign(str(Sign.ZERO)) is Sign.ZERO
+     assert copy.deepcopy(Sign.UNKNOWN) is Sign.UNKNOWN
+     assert pickle.loads(pickle.dumps(Sign.NEGATIVE)) is Sign.NEGATIVE
+     for sign in Sign.SIGNS:
+         assert Sign.SIGNS[sign.index] is sign
+
+  @raises(Exception)
+  def test_unknown_sign(self):
+      Sign('bogus')
@@ -0,0 +1,63 @@
+from dcp_parser.parser import Parser
+from dcp_parser.expression.curvature import Curvature
+from dcp_parser.expression.sign import Sign
+from dcp_parser.expression.constraints import Constraint
+from nose.plugins.skip import SkipTest
+from nose.tools import assert_equals
+try:
+    import numpy
+    from dcp_parser.vectorized import FlatTree, code, decode
+except ImportError:
+    numpy = None
+
+STATEMENTS = ['max(square(x), a*y, -2) + sqrt(x) >= log_sum_exp(x, y, z) - 1',
+              '(x + y) * a + (x + y) / b == norm(x, y, Inf) + huber(x, 2)',
+              'pow(x, 3) + inv_pos(y) * b - abs(-a) <= geo_mean(x, y, z)',
+              'kl_div(x, y) + quad_over_lin(x - y, b) + berhu(z, 0.5)']
+
+class TestVectorized(object):
+    """ Unit tests for the vectorized analysis. """
+    @classmethod
+    def setup_class(self):
+        if numpy is None:
+            raise SkipTest("numpy is not installed.")
+
+    # Parses the statements after preamble.
+    def parse(self, preamble):
+        parser = Parser()
+        for line in preamble + STATEMENTS:
+            parser.parse(line)
+        return parser.statements
+
+    # Test that the analysis matches the expressions.
+    def test_analyze(self):
+        assert_equals(decode(code(Curvature.CONCAVE, Sign.NEGATIVE)),
+                      (Curvature.CONCAVE, Sign.NEGATIVE))
+        first = self.parse(['variable x y z', 'parameter a', 'parameter positive b'])
+        second = self.parse(['variable positive x', 'variable negative y z',
+                             'parameter negative a b'])
+        for (statement, other) in zip(first, second):
+            flat = FlatTree(statement)
+            assert (flat.analyze() == flat.node_codes()).all()
+            # Both sides of a constraint, and shared nodes once.
+            tops = [statement]
+            if isinstance(statement, Constraint):
+                tops = list(statement.subexpressions)
+            assert_equals([flat.nodes[root] for root in flat.roots], tops)
+            assert_equals(len(set(map(id, flat.nodes))), len(flat))
+            # The leaves of another preamble give that preamble's analysis.
+            other_flat = FlatTree(other)
+            assert (flat.analyze(other_flat.leaf_codes) == other_flat.node_codes()).all()
+        flat = FlatTree(first[0])
+        assert_equals(flat.heights[flat.roots[0]], 3)
+        leaf = flat.index(first[0].lhs.subexpressions[1].subexpressions[0])
+        assert_equals(flat.nodes[leaf].name, 'x')
+        # Rules that raise an error, here for division by zero.
+        flat = FlatTree(first[1])
+        codes = flat.leaf_codes.copy()
+        codes[[node.name for node in flat.nodes].index('b')] = code(Curvature.CONSTANT, Sign.ZERO)
+        try:
+            flat.analyze(codes)
+            assert False
+        except Exception as e:
+            assert_equals(str(e), "Cannot analyze '(x + y) / b' with these arguments.")
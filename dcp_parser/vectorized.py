@@ -0,0 +1,238 @@
+"""
+Bottom-up DCP analysis of a statement flattened into arrays, with NumPy.
+Each curvature and sign pair is a small integer code, and the rule of
+each operator and atom is a table of the code of its result for the
+codes of its arguments, built once by applying the rule itself to
+expressions with those codes. The codes of all the nodes of a height
+are then looked up at once, so the analysis matches the Expressions
+exactly. Requires numpy.
+"""
+import operator
+import numpy
+import dcp_parser.atomic.atom_loader as atom_loader
+import dcp_parser.expression.settings as settings
+from dcp_parser.expression.constraints import Constraint
+from dcp_parser.classify import SIGNS, CODES, UNDEFINED, PROTOTYPES, code, decode
+
+# The operator of each short name and number of arguments.
+OPERATORS = {(settings.PLUS, 2): operator.add,
+             (settings.MINUS, 2): operator.sub,
+             (settings.MULT, 2): operator.mul,
+             (settings.DIV, 2): operator.truediv,
+             (settings.MINUS, 1): operator.neg}
+
+class Rule(object):
+    """
+    How a kind of node gets its curvature and sign from its arguments:
+    function (an operator or atomic function) applied to the arguments,
+    followed by parameters (the parameter of a parameterized atom).
+    Rules are shared through Rule.get, and a rule of one or two arguments
+    keeps a table of its result codes, indexed by the argument codes.
+    """
+    # Maps each function, its parameters and arity to its Rule.
+    RULES = {}
+
+    def __init__(self, function, parameters, arity):
+        self.function = function
+        self.parameters = parameters
+        self.arity = arity
+        self.table = None
+        # Result codes of calls with more than two arguments, by their codes.
+        self.memo = {}
+
+    # Returns the shared rule. Parameters are keyed by type, since
+    # e.g. 2 and 2.0 are named differently.
+    @staticmethod
+    def get(function, parameters, arity):
+        key = (function, tuple((type(p), p) for p in parameters), arity)
+        rule = Rule.RULES.get(key)
+        if rule is None:
+            rule = Rule.RULES[key] = Rule(function, list(parameters), arity)
+        return rule
+
+    # Returns the code of the rule applied to arguments with codes,
+    # or UNDEFINED if the rule raises an error for them.
+    def apply(self, codes):
+        args = [PROTOTYPES[c] for c in codes] + self.parameters
+        try:
+            result = self.function(*args)
+        except Exception:
+            return UNDEFINED
+        return code(result.curvature, result.sign)
+
+    # Returns the table of codes, building it on first use.
+    def codes(self):
+        if self.table is None:
+            shape = (CODES,) * self.arity
+            table = numpy.empty(shape, dtype=numpy.int8)
+            for index in numpy.ndindex(*shape):
+                table[index] = self.apply(index)
+            self.table = table
+        return self.table
+
+    # Returns the code for arguments with codes, for any arity.
+    def lookup(self, codes):
+        codes = tuple(codes)
+        result = self.memo.get(codes)
+        if result is None:
+            result = self.memo[codes] = self.apply(codes)
+        return result
+
+    def __repr__(self):
+        return "Rule(%s, %s, %d)" % (getattr(self.function, '__name__', self.function),
+                                     self.parameters, self.arity)
+
+# Returns the parameter of a parameterized atom as the parser passes it,
+# from the text in its short name "name(..., parameter)".
+def parameter_value(text):
+    for number in [int, float]:
+        try:
+            return number(text)
+        except ValueError:
+            pass
+    return text
+
+# Returns the Rule of an inner node, with atoms (an AtomRegistry).
+def node_rule(node, atoms):
+    arity = len(node.subexpressions)
+    if node.monotonicity is None:
+        function = OPERATORS.get((node.short_name, arity))
+        if function is None:
+            raise Exception("No rule for '%s'." % node.short_name)
+        return Rule.get(function, [], arity)
+    name = node.short_name.split('(')[0]
+    parameters = []
+    if name != node.short_name:
+        parameters.append(parameter_value(node.short_name[len(name) + len('(..., '):-1]))
+    return Rule.get(atoms.functions[name], parameters, arity)
+
+class FlatTree(object):
+    """
+    A statement flattened into arrays, with each distinct node once and
+    the children of a node before it:
+        nodes: the Expressions.
+        roots: the indices of the statement, or of both sides of a constraint.
+        rules: the Rule of each kind of inner node.
+        kinds: the index in rules of each node's Rule, or -1 for leaves.
+        offsets, children: the children of node i are
+            children[offsets[i]:offsets[i + 1]].
+        leaf_codes: the code of each leaf, and UNDEFINED for inner nodes.
+        heights: 0 for leaves, and one more than the highest child otherwise.
+    atoms is the AtomRegistry the statement was parsed with.
+    """
+    def __init__(self, statement, atoms=None):
+        if atoms is None:
+            atoms = atom_loader.ATOMS
+        if isinstance(statement, Constraint):
+            tops = list(statement.subexpressions)
+        else:
+            tops = [statement]
+        self.nodes = []
+        self.rules = []
+        indices = {}
+        rule_indices = {}
+        kinds = []
+        offsets = [0]
+        children = []
+        leaf_codes = []
+        heights = []
+        stack = [(top, False) for top in reversed(tops)]
+        while stack:
+            (node, expanded) = stack.pop()
+            if id(node) in indices:
+                continue
+            subexpressions = node.subexpressions
+            if subexpressions and not expanded:
+                stack.append((node, True))
+                stack.extend((sub, False) for sub in reversed(subexpressions))
+                continue
+            indices[id(node)] = len(self.nodes)
+            self.nodes.append(node)
+            if subexpressions:
+                rule = node_rule(node, atoms)
+                if rule not in rule_indices:
+                    rule_indices[rule] = len(self.rules)
+                    self.rules.append(rule)
+                kinds.append(rule_indices[rule])
+                child_indices = [indices[id(sub)] for sub in subexpressions]
+                children.extend(child_indices)
+                leaf_codes.append(UNDEFINED)
+                heights.append(1 + max(heights[child] for child in child_indices))
+            else:
+                kinds.append(-1)
+                leaf_codes.append(code(node.curvature, node.sign))
+                heights.append(0)
+            offsets.append(len(children))
+        # The index of each node by id. nodes keeps the ids from being reused.
+        self.indices = indices
+        self.roots = [indices[id(top)] for top in tops]
+        self.kinds = numpy.array(kinds, dtype=numpy.int32)
+        self.offsets = numpy.array(offsets, dtype=numpy.int64)
+        self.children = numpy.array(children, dtype=numpy.int64)
+        self.leaf_codes = numpy.array(leaf_codes, dtype=numpy.int8)
+        self.heights = numpy.array(heights, dtype=numpy.int32)
+        self.passes = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    # Returns the index of node, which must be in the tree.
+    def index(self, node):
+        if id(node) not in self.indices:
+            raise Exception("'%s' is not in the tree." % node)
+        return self.indices[id(node)]
+
+    # Returns the codes of the nodes as built, to compare analyses with.
+    def node_codes(self):
+        return numpy.array([code(node.curvature, node.sign) for node in self.nodes],
+                           dtype=numpy.int8)
+
+    # Groups the inner nodes by height and number of children, once.
+    # Each pass is (indices, kind, argument indices) for the nodes of one
+    # height and rule arity: kind is the index of each node's rule table
+    # in the stacked tables of that arity, or the rules of nodes with more
+    # than two children.
+    def build_passes(self):
+        order = numpy.argsort(self.heights, kind='stable')
+        bounds = numpy.searchsorted(self.heights[order],
+                                    numpy.arange(1, self.heights.max(initial=0) + 2))
+        arity = self.offsets[1:] - self.offsets[:-1]
+        tables = {}
+        slots = numpy.full(len(self.rules), -1, dtype=numpy.int64)
+        for (kind, rule) in enumerate(self.rules):
+            if rule.arity <= 2:
+                same = tables.setdefault(rule.arity, [])
+                slots[kind] = len(same)
+                same.append(rule.codes())
+        self.tables = dict((n, numpy.stack(same)) for (n, same) in tables.items())
+        self.passes = []
+        for height in range(len(bounds) - 1):
+            level = order[bounds[height]:bounds[height + 1]]
+            for n in [1, 2]:
+                nodes = level[arity[level] == n]
+                if len(nodes) > 0:
+                    args = [self.children[self.offsets[nodes] + i] for i in range(n)]
+                    self.passes.append((n, nodes, slots[self.kinds[nodes]], args))
+            nodes = level[arity[level] > 2]
+            if len(nodes) > 0:
+                self.passes.append((None, nodes, [self.rules[k] for k in self.kinds[nodes]],
+                                    [self.children[self.offsets[i]:self.offsets[i + 1]]
+                                     for i in nodes]))
+
+    # Returns the code of every node, computed bottom up from leaf_codes
+    # (by default the leaves' own codes) one height at a time.
+    # Raises an error if a rule does not apply to its arguments' codes.
+    def analyze(self, leaf_codes=None):
+        if self.passes is None:
+            self.build_passes()
+        codes = numpy.array(self.leaf_codes if leaf_codes is None else leaf_codes,
+                            dtype=numpy.int8)
+        for (arity, nodes, kinds, args) in self.passes:
+            if arity is not None:
+                codes[nodes] = self.tables[arity][(kinds,) + tuple(codes[a] for a in args)]
+            else:
+                codes[nodes] = [rule.lookup(codes[a]) for (rule, a) in zip(kinds, args)]
+            if (codes[nodes] == UNDEFINED).any():
+                bad = nodes[codes[nodes] == UNDEFINED][0]
+                raise Exception("Cannot analyze '%s' with these arguments." % self.nodes[bad])
+        return codes
@@ -44,14 +44,7 @@ TreeConstructor.parseObjective = function(objective, success_func, error_func) {
  */
 TreeConstructor.createParseTree = function(objective, id, success_func) {
     function drawTree(root) {
-        TreeDisplay.errorState = false;
-        // Clean up alerts and input boxes.
-        $('#inputDiv').remove();
-        $('.alert').alert('close');
-        TreeConstructor.deactivatePrompt();
-        TreeConstructor.setLeafLegendText(root);
-        TreeConstructor.processParseTree(root);
-        if (success_func) success_func();
+        TreeConstructor.drawParseTree(root, success_func);
     }
 
     function handleError(jqXHR, textStatus, errorThrown) {
@@ -68,6 +61,67 @@ TreeConstructor.createParseTree = function(objective, id, success_func) {
     TreeConstructor.parseObjective(objective, drawTree, handleError);
 }
 
+/**
+ * Replaces the current tree visualization with the given parse tree.
+ * root - the parse tree from the parser.
+ * success_func - an optional function to execute afterwards.
+ */
+TreeConstructor.drawParseTree = function(root, success_func) {
+    TreeDisplay.errorState = false;
+    // Clean up alerts and input boxes.
+    $('#inputDiv').remove();
+    $('.alert').alert('close');
+    TreeConstructor.deactivatePrompt();
+    TreeConstructor.setLeafLegendText(root);
+    TreeConstructor.processParseTree(root);
+    if (success_func) success_func();
+}
+
+/**
+ * Returns the path of child indices from the root of the parse tree
+ * to the node with the given id, or null for short_name nodes.
+ * Uses the tagToNode map stored as an attribute of TreeConstructor.
+ */
+TreeConstructor.getNodePath = function(id) {
+    var tagToNode = TreeConstructor.tagToNode;
+    var node = tagToNode[id];
+    if (!node || node.isShortNameNode || node.isPrompt) return null;
+    var path = [];
+    var tag = parseInt(id);
+    while (node.parentTag != undefined) {
+        var shortNameNode = tagToNode[node.parentTag];
+        path.unshift(shortNameNode.childTags.indexOf(tag));
+        tag = shortNameNode.parentTag;
+        node = tagToNode[tag];
+    }
+    return path;
+}
+
+/**
+ * Applies a change from an incremental reparse to a parse tree and
+ * returns the new tree. The change holds the path to the new subtree,
+ * the new nodes on that path without their children, and the subtree.
+ */
+TreeConstructor.applyChange = function(root, change) {
+    if (change.path.length == 0) return change.node;
+    var node = root;
+    for (var i = 0; i < change.path.length; i++) {
+        var ancestor = change.ancestors[i];
+        for (var key in node) {
+            if (key != 'children' && !(key in ancestor)) delete node[key];
+        }
+        for (var key in ancestor) {
+            node[key] = ancestor[key];
+        }
+        if (i == change.path.length - 1) {
+            node.children[change.path[i]] = change.node;
+        } else {
+            node = node.children[change.path[i]];
+        }
+    }
+    return root;
+}
+
 /**
  * Show error message from the parser.
  * http://stackoverflow.com/questions/10082330/dynamically-create-bootstrap-alerts-box-through-javascript